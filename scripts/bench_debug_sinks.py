@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Receiver CPU With and Without the Debug Sinks
+
+Runs the receiver flowgraph (flowgraphs/rds_rx.py) on the synthetic band and
+measures the CPU time of the process per second of wall-clock time with no
+qtgui sink attached (Home page), with each Debug plot attached on its own
+(the Debug tab showing it) and with all of them attached (the flowgraph as
+generated). The window is shown and the Qt event loop runs, so redraws are
+counted too.
+
+Needs GNU Radio and PyQt5. Set QT_QPA_PLATFORM=offscreen to run it without a
+display.
+
+Usage:
+    python scripts/bench_debug_sinks.py [--seconds 5] [--source synth]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "fm_receiver"))
+
+
+def cpu_load(app, seconds):
+    """CPU seconds used by the process per wall-clock second, while serving Qt events"""
+    cpu, wall = time.process_time(), time.perf_counter()
+    while time.perf_counter() - wall < seconds:
+        app.processEvents()
+        time.sleep(0.01)
+    return (time.process_time() - cpu) / (time.perf_counter() - wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receiver CPU with and without the debug sinks")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--settle", type=float, default=1.0)
+    parser.add_argument("--source", default="synth")
+    args = parser.parse_args()
+
+    from PyQt5 import Qt
+
+    from flowgraphs.rds_rx import rds_rx
+
+    app = Qt.QApplication(sys.argv)
+    tb = rds_rx(device_arguments=args.source)
+    tb.set_mode(1)
+    tb.set_mute(True)
+    tb.show()
+    tb.start()
+
+    names = sorted(tb.debug_sinks)
+    cases = [("none (Home page)", ())] + [(name, (name,)) for name in names] + [("all (as generated)", names)]
+    print(f"{'attached sinks':>20} {'CPU (cores)':>12}")
+    loads = {}
+    for label, attached in cases:
+        tb.set_debug_sinks(attached)
+        cpu_load(app, args.settle)
+        loads[label] = cpu_load(app, args.seconds)
+        print(f"{label:>20} {loads[label]:12.2f}")
+
+    tb.stop()
+    tb.wait()
+    print(f"debug sinks cost {loads[cases[-1][0]] - loads[cases[0][0]]:.2f} cores when all attached")
+
+
+if __name__ == "__main__":
+    main()
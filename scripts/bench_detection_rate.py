@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Scanner Detection Rate vs Dwell
+
+Synthesises IQ windows of a crowded FM band with core/band_synth.py (one very
+strong station next to several weak ones, stereo multiplex, complex Gaussian
+noise), runs them through the scanner's front end (Blackman-Harris FFT,
+magnitude squared, squared and summed per bin) and reports, for each dwell
+time, how often each decision rule in core/station_detector.py finds each
+station, its false detections per crowded window and per noise-only window.
+
+The last table gives the shortest dwell at which each rule finds each
+station in at least --target of the trials, which is the dwell a scan needs
+for a station of that SNR. It also prints the measured spread of the
+statistic on noise, against core.station_detector.STATISTIC_CV.
+
+Usage:
+    python scripts/bench_detection_rate.py [--trials 40] [--target 0.9]
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "fm_receiver"))
+
+from core.band_synth import BandSynth, Carrier  # noqa: E402
+from core.station_detector import (CFAR, CHANNEL_STEP,  # noqa: E402
+                                   DEFAULT_THRESHOLDS, MINMAX, STATISTIC_CV,
+                                   PowerAccumulator, detect_stations,
+                                   psd_frames, window_setup)
+
+# (offset from the window centre in Hz, SNR in dB within 200 kHz)
+STATIONS = [(-700e3, 40.0), (-300e3, 6.0), (200e3, 4.0), (600e3, 10.0)]
+
+DWELLS = [0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05]
+
+
+def synthetic_window(freq, samp_rate, seconds, stations, seed):
+    """One capture of the synthetic band, with fresh noise and modulation phase per seed"""
+    rng = np.random.default_rng(seed)
+    carriers = [
+        Carrier(freq + offset, snr_db, left_tone=rng.uniform(300, 3000), right_tone=rng.uniform(300, 3000))
+        for offset, snr_db in stations
+    ]
+    synth = BandSynth(carriers, samp_rate=samp_rate, centre_freq=freq, noise_level=1.0, seed=seed)
+    # Skip a random stretch so every trial starts at another point of the audio
+    synth.generate(int(rng.integers(0, samp_rate // 100)))
+    return synth.generate(int(samp_rate * seconds))
+
+
+def scanner_statistic(iq, fft_size):
+    """Per-bin sum of squared |FFT|^2, as integrate_ff delivers it, and the frames in it"""
+    accumulator = PowerAccumulator(fft_size)
+    accumulator.add(psd_frames(iq, fft_size))
+    return accumulator.bin_power, accumulator.frames
+
+
+def found(detections, station):
+    """A station counts as found within +/- one raster point"""
+    return any(abs(f - station) <= CHANNEL_STEP + 1 for f in detections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scanner detection rate vs dwell")
+    parser.add_argument("--samp-rate", type=float, default=2.4e6)
+    parser.add_argument("--fft-size", type=int, default=2**7)
+    parser.add_argument("--trials", type=int, default=40)
+    parser.add_argument("--target", type=float, default=0.9, help="Detection rate a dwell has to reach")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLDS[MINMAX])
+    parser.add_argument("--threshold-cfar", type=float, default=DEFAULT_THRESHOLDS[CFAR])
+    parser.add_argument("--dwells", type=float, nargs="+", default=DWELLS)
+    args = parser.parse_args()
+
+    freq = 98e6
+    seed = 0
+    candidate_freqs, _, mask = window_setup(freq, args.samp_rate, args.fft_size)
+    bins = mask.sum(axis=1)
+    truth = [freq + offset for offset, _ in STATIONS]
+    rules = [(MINMAX, args.threshold), (CFAR, args.threshold_cfar)]
+
+    print(f"{len(STATIONS)} stations, SNR {[snr for _, snr in STATIONS]} dB, {args.trials} trials per dwell, "
+          f"thresholds {args.threshold} (minmax), {args.threshold_cfar} sigma (cfar)")
+    header = " ".join(f"{snr:5.0f}dB" for _, snr in STATIONS)
+    print(f"{'dwell (ms)':>10} {'rule':>7} {header} {'false':>6} {'noise':>6}")
+
+    rates = {name: [] for name, _ in rules}
+    spread = []
+    for dwell in args.dwells:
+        hits = {name: np.zeros(len(truth)) for name, _ in rules}
+        false = {name: 0 for name, _ in rules}
+        noise_false = {name: 0 for name, _ in rules}
+        noise_power = []
+        for _ in range(args.trials):
+            seed += 1
+            bin_power, frames = scanner_statistic(
+                synthetic_window(freq, args.samp_rate, dwell, STATIONS, seed), args.fft_size)
+            noise_bins, _ = scanner_statistic(
+                synthetic_window(freq, args.samp_rate, dwell, [], seed + 10**6), args.fft_size)
+            noise_power.append(mask @ noise_bins)
+            for name, threshold in rules:
+                detections = detect_stations(mask @ bin_power, candidate_freqs, threshold, name, frames, bins)
+                hits[name] += [found(detections, t) for t in truth]
+                false[name] += sum(not found(truth, f) for f in detections)
+                noise_false[name] += len(detect_stations(mask @ noise_bins, candidate_freqs, threshold, name,
+                                                         frames, bins))
+
+        noise_power = np.array(noise_power)
+        spread.append((dwell, frames, np.mean(noise_power.std(axis=0) / noise_power.mean(axis=0))))
+        for name, _ in rules:
+            rates[name].append(hits[name] / args.trials)
+            row = " ".join(f"{rate:7.2f}" for rate in rates[name][-1])
+            print(f"{dwell * 1e3:10.1f} {name:>7} {row} {false[name] / args.trials:6.2f} "
+                  f"{noise_false[name] / args.trials:6.2f}")
+
+    print(f"shortest dwell (ms) with a detection rate of at least {args.target}")
+    print(f"{'rule':>18} {header}")
+    for name, _ in rules:
+        table = np.array(rates[name])
+        cells = []
+        for column in table.T:
+            reached = np.flatnonzero(column >= args.target)
+            cells.append(f"{args.dwells[reached[0]] * 1e3:7.1f}" if reached.size else f"{'never':>7}")
+        print(f"{name:>18} {' '.join(cells)}")
+
+    print(f"spread of the statistic on noise, cv * sqrt(frames * bins) (STATISTIC_CV = {STATISTIC_CV})")
+    for dwell, frames, cv in spread:
+        print(f"  {dwell * 1e3:6.1f} ms, {frames:5d} frames: {cv * np.sqrt(frames * bins.mean()):.2f}")
+
+
+if __name__ == "__main__":
+    main()
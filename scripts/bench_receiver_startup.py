@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Receiver Startup Time and Memory, GUI vs Headless
+
+Builds the receiver flowgraph in a fresh process, either the Qt one
+(flowgraphs/rds_rx.py, with a QApplication) or the widget-free one
+(flowgraphs/rds_rx_headless.py), and reports the time to import and
+construct it and the peak resident memory of the process. Both run on the
+synthetic band with the sound card disabled where possible, so no hardware
+is needed.
+
+Needs GNU Radio (and PyQt5 for the GUI receiver). Set QT_QPA_PLATFORM=offscreen
+to run the GUI case without a display.
+
+Usage:
+    python scripts/bench_receiver_startup.py [--runs 3] [--source synth]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "fm_receiver")
+
+CHILD = r"""
+import json, resource, sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+if {gui!r}:
+    from PyQt5 import Qt
+    app = Qt.QApplication([])
+    from flowgraphs.rds_rx import rds_rx
+    tb = rds_rx(device_arguments={source!r})
+else:
+    from flowgraphs.rds_rx_headless import rds_rx_headless
+    tb = rds_rx_headless(device_arguments={source!r}, audio_device=None)
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}}))
+"""
+
+
+def measure(gui, source):
+    """Startup seconds and peak RSS in MB of one fresh process"""
+    out = subprocess.run([sys.executable, "-c", CHILD.format(src=SRC, gui=gui, source=source)],
+                         check=True, capture_output=True, text=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Receiver startup time and memory, GUI vs headless")
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--source", default="synth")
+    args = parser.parse_args()
+
+    print(f"{'receiver':>10} {'startup (s)':>12} {'peak RSS (MB)':>14}")
+    for name, gui in (("rds_rx", True), ("headless", False)):
+        runs = [measure(gui, args.source) for _ in range(args.runs)]
+        seconds = min(run["seconds"] for run in runs)
+        rss = min(run["rss_mb"] for run in runs)
+        print(f"{name:>10} {seconds:12.2f} {rss:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
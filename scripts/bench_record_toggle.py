@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Audio Interruption When a Recording Starts or Stops
+
+Runs the widget-free receiver (flowgraphs/rds_rx_headless.py) on the
+synthetic band and toggles a recording of another station, repeatedly, in
+three ways:
+
+- stop/start: stop the top block, connect or disconnect a MultipleRecorder
+  and start it again (what MainWindow used to do);
+- lock/unlock: connect or disconnect it on the running top block
+  (RecorderPool without free slots);
+- slot: enable or disable a pre-connected recorder's valve and open or close
+  its file (RecorderPool);
+- channel slot: the same for a recorder on a channelizer of the capture,
+  whose selector also picks the station's channel (RecorderPool with
+  channel_slots). The headless receiver has no channelizer, so the bench
+  connects one to selector output 1 as rds_rx does.
+
+A probe on the audio output records when each buffer of audio arrives. The
+interruption is the longest gap between buffers around a toggle, against
+the longest gap while nothing is toggled.
+
+Needs GNU Radio, and has not been run where GNU Radio is missing. The
+tests in tests/test_recorder_pool.py check that the slot paths never call
+lock().
+
+Usage:
+    python scripts/bench_record_toggle.py [--toggles 10] [--source synth]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "fm_receiver"))
+
+
+def make_probe():
+    from gnuradio import gr
+
+    class audio_probe(gr.sync_block):
+        """Arrival time of every buffer of audio"""
+
+        def __init__(self):
+            gr.sync_block.__init__(self, name="Audio Probe", in_sig=[np.float32], out_sig=None)
+            self.arrivals = []
+
+        def work(self, input_items, output_items):
+            self.arrivals.append(time.perf_counter())
+            return len(input_items[0])
+
+        def longest_gap(self, start, end):
+            """Longest time without audio between two instants, in seconds"""
+            times = [start] + [t for t in self.arrivals if start < t < end] + [end]
+            return max(np.diff(times))
+
+    return audio_probe()
+
+
+def toggle_stop_start(tb, endpoint, recorder, on):
+    tb.stop()
+    tb.wait()
+    if on:
+        tb.connect(endpoint, (recorder, 0))
+    else:
+        tb.disconnect(endpoint, (recorder, 0))
+    tb.start()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audio interruption when a recording starts or stops")
+    parser.add_argument("--toggles", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=1.0, help="Seconds between toggles")
+    parser.add_argument("--source", default="synth")
+    args = parser.parse_args()
+
+    from gnuradio import blocks, gr
+
+    from flowgraphs.MultipleRecorder import MultipleRecorder
+    from flowgraphs.channelizer import channelizer_bank
+    from flowgraphs.recorder_pool import RecorderPool
+    from flowgraphs.rds_rx_headless import rds_rx_headless
+
+    tb = rds_rx_headless(device_arguments=args.source, audio_device=None)
+    probe = make_probe()
+    tb.connect((tb.blocks_multiply_const_vxx_0, 0), (probe, 0))
+    endpoint = (tb.blocks_selector_0, 1)
+    samp_rate = tb.get_samp_rate()
+    freq_offset = 400e3 - 250e3
+    channelizer = channelizer_bank(samp_rate=samp_rate)
+    tb.connect(endpoint, (channelizer, 0))
+    for i in range(channelizer.numchans):
+        tb.connect((channelizer, i), (blocks.null_sink(gr.sizeof_gr_complex*1), 0))
+    pool = RecorderPool(tb, endpoint, samp_rate, slots=1,
+                        channelizer=channelizer, channel_slots=1)
+    locked = RecorderPool(tb, endpoint, samp_rate, slots=0)
+    channel, residual = channelizer.channel(400e3)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fname = os.path.join(tmp, "rec.wav")
+        recorder = MultipleRecorder(fname=fname, freq_offset=freq_offset, samp_rate=samp_rate)
+        handles = {}
+
+        def stop_start(on):
+            toggle_stop_start(tb, endpoint, recorder, on)
+
+        def lock_unlock(on):
+            if on:
+                handles["locked"] = locked.add(fname, 0, freq_offset, samp_rate)
+            else:
+                locked.remove(handles.pop("locked"))
+
+        def slot(on):
+            if on:
+                handles["slot"] = pool.add(fname, 0, freq_offset, samp_rate)
+            else:
+                pool.remove(handles.pop("slot"))
+
+        def channel_slot(on):
+            if on:
+                handles["channel"] = pool.add(fname, 0, residual - 250e3, samp_rate,
+                                              (channelizer, channel),
+                                              channelizer.get_channel_rate())
+            else:
+                pool.remove(handles.pop("channel"))
+
+        tb.start()
+        time.sleep(args.interval)
+        start = time.perf_counter()
+        time.sleep(args.interval * 2)
+        baseline = probe.longest_gap(start, time.perf_counter())
+
+        print(f"longest audio gap, {args.toggles} toggles each (ms)")
+        print(f"{'method':>12} {'max':>8} {'median':>8}")
+        print(f"{'none':>12} {baseline * 1e3:8.1f} {'':>8}")
+        for name, toggle in (("stop/start", stop_start), ("lock/unlock", lock_unlock), ("slot", slot),
+                             ("channel slot", channel_slot)):
+            gaps = []
+            for i in range(args.toggles):
+                before = time.perf_counter()
+                toggle(i % 2 == 0)
+                time.sleep(args.interval)
+                gaps.append(probe.longest_gap(before, time.perf_counter()))
+            if args.toggles % 2:
+                toggle(False)
+                time.sleep(args.interval)
+            print(f"{name:>12} {max(gaps) * 1e3:8.1f} {np.median(gaps) * 1e3:8.1f}")
+
+        tb.stop()
+        tb.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Recorder Chain Cost, Single-Rate vs Multistage
+
+Compares MultipleRecorder's former chain, which filtered the audio at the
+480 kHz demodulation rate with a filter designed for the capture rate and
+then resampled 1:10, with the current multistage chain (see
+flowgraphs/MultipleRecorder.py):
+
+- the real multiply-accumulates per output audio sample of each stage,
+  from the tap counts of the actual designs. Every tap counts, including
+  the zero taps of the fs/4 filter, which fir_filter_ccf computes too;
+- the throughput of both chains in the NumPy engine (core/demod.py) on a
+  synthetic band, in times real time, and the tone recovered by each;
+- when GNU Radio is installed, the CPU seconds per second of IQ of the
+  MultipleRecorder flowgraph, run unthrottled on the same band.
+
+The multistage chain always writes 48 kHz audio. At rates that are not a
+multiple of 480 kHz (e.g. --samp-rate 2.048e6) it adds a rational resampler,
+while the former chain followed the capture rate (51.2 kHz there).
+The savings quoted in flowgraphs/README.md come from the MAC counts and the
+NumPy engine; the GNU Radio measurement has not been run there.
+
+Usage:
+    python scripts/bench_recorder_chain.py [--samp-rate 1.92e6] [--seconds 4]
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "fm_receiver"))
+
+from core.band_synth import BandSynth, Carrier  # noqa: E402
+from core.demod import DemodChain, FirDecimator, low_pass, recorder_macs, resampler_taps  # noqa: E402
+
+
+class SingleRateChain:
+    """MultipleRecorder before the multistage chain, on NumPy blocks"""
+
+    def __init__(self, freq_offset, samp_rate):
+        self.decimation = max(1, round(samp_rate / 480e3))
+        demod_rate = samp_rate / self.decimation
+        self.audio_rate = int(demod_rate / 10)
+        self.channel = FirDecimator(low_pass(1, samp_rate, 130e3, 70e3), self.decimation, np.complex64)
+        self.audio_filter = FirDecimator(low_pass(1, samp_rate, 200e3, 56e3))
+        self.resampler = FirDecimator(resampler_taps(1, 10), 10)
+        self.gain = demod_rate / (2 * math.pi * 75000)
+        self._omega = -2 * math.pi * (freq_offset + 250e3) / samp_rate
+        self._phase = 0.0
+        self._last = np.complex64(0)
+
+    def macs(self):
+        # Per audio sample: 10 outputs of the channel and audio filters
+        return {
+            "channel": 4 * len(self.channel.taps) * 10,
+            "audio": len(self.audio_filter.taps) * 10,
+            "resampler": len(self.resampler.taps),
+        }
+
+    def process(self, iq):
+        mixer = np.exp(1j * (self._phase + self._omega * np.arange(len(iq)))).astype(np.complex64)
+        self._phase = (self._phase + self._omega * len(iq)) % (2 * math.pi)
+        channel = self.channel.process(iq * mixer)
+        previous = np.concatenate([[self._last], channel[:-1]]) if len(channel) else channel
+        if len(channel):
+            self._last = channel[-1]
+        demod = (self.gain * np.angle(channel * np.conj(previous))).astype(np.float32)
+        return self.resampler.process(self.audio_filter.process(demod)).astype(np.float32)
+
+
+def run(chain, iq, block_size):
+    """Audio and seconds taken to push the IQ through a chain in blocks"""
+    start = time.perf_counter()
+    audio = np.concatenate([chain.process(iq[i:i + block_size]) for i in range(0, len(iq), block_size)])
+    return audio, time.perf_counter() - start
+
+
+def tone(audio, audio_rate):
+    settled = audio[audio_rate // 10:]
+    spectrum = np.abs(np.fft.rfft(settled * np.hanning(len(settled))))
+    return np.fft.rfftfreq(len(settled), 1 / audio_rate)[np.argmax(spectrum)]
+
+
+def measure_gnuradio(iq, samp_rate, freq_offset, seconds):
+    """CPU seconds per second of IQ of the MultipleRecorder flowgraph"""
+    from gnuradio import blocks, gr
+
+    from flowgraphs.MultipleRecorder import MultipleRecorder
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tb = gr.top_block()
+        source = blocks.vector_source_c(iq, True)
+        head = blocks.head(gr.sizeof_gr_complex, int(samp_rate * seconds))
+        recorder = MultipleRecorder(fname=os.path.join(tmp, "rec.wav"), freq_offset=freq_offset,
+                                    samp_rate=samp_rate)
+        tb.connect(source, head, recorder)
+        cpu = time.process_time()
+        tb.run()
+        elapsed = time.process_time() - cpu
+        del tb, recorder
+    return elapsed / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recorder chain cost, single-rate vs multistage")
+    parser.add_argument("--samp-rate", type=float, default=1.92e6)
+    parser.add_argument("--seconds", type=float, default=4.0)
+    parser.add_argument("--block-size", type=int, default=2**18)
+    args = parser.parse_args()
+
+    centre, station, sent = 98e6, 98.3e6, 1000.0
+    carriers = [Carrier(station, 40.0, left_tone=sent, right_tone=sent, stereo=False),
+                Carrier(97.6e6, 30.0)]
+    freq_offset = station - centre - 250e3
+    iq = BandSynth(carriers, samp_rate=args.samp_rate, centre_freq=centre, seed=0).generate(
+        int(args.samp_rate * args.seconds))
+
+    chains = {
+        "single-rate": SingleRateChain(freq_offset, args.samp_rate),
+        "multistage": DemodChain(freq_offset, args.samp_rate),
+    }
+    macs = {"single-rate": chains["single-rate"].macs(), "multistage": recorder_macs(args.samp_rate)}
+
+    print(f"real MACs per audio sample at {args.samp_rate / 1e6:.3f} Msps")
+    for name, stages in macs.items():
+        detail = " + ".join(f"{stage} {count}" for stage, count in stages.items())
+        print(f"  {name:>11}: {sum(stages.values()):5d} ({detail})")
+    ratio = sum(macs["single-rate"].values()) / sum(macs["multistage"].values())
+    print(f"  {ratio:.1f}x fewer")
+
+    print(f"numpy engine, {args.seconds:.0f} s of IQ in blocks of {args.block_size}")
+    for name, chain in chains.items():
+        audio, elapsed = run(chain, iq, args.block_size)
+        print(f"  {name:>11}: {args.seconds / elapsed:6.1f}x real time, {chain.audio_rate} Hz audio, "
+              f"tone {tone(audio, chain.audio_rate):.0f} Hz (sent {sent:.0f} Hz)")
+
+    try:
+        cpu = measure_gnuradio(iq, args.samp_rate, freq_offset, args.seconds)
+    except ImportError:
+        print("GNU Radio is not installed, skipped the MultipleRecorder measurement")
+        return
+    print(f"MultipleRecorder flowgraph: {cpu:.3f} CPU seconds per second of IQ")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Recording Cost vs Number of Recorders, Direct vs Channelizer
+
+Compares two ways of feeding K MultipleRecorder instances from the
+receiver's capture:
+
+- direct: every recorder runs its own freq_xlating_fir_filter_ccc over the
+  full-rate capture (the default);
+- channelizer: one shared PFB channelizer (flowgraphs/channelizer.py) splits
+  the capture into channels, and each recorder only filters its channel at
+  the channel rate (MultipleRecorder with input_rate).
+
+The filter cost model (real multiply-accumulates per second, from the tap
+counts of the actual designs) is always printed. When GNU Radio is
+installed, both flowgraphs are also run unthrottled on a synthetic band
+held in memory, and the CPU seconds per second of IQ are measured.
+
+The figures in flowgraphs/README.md, and the default of record_channelizer,
+come from the model alone; the measurement has not been run there.
+
+Usage:
+    python scripts/bench_recorders.py [--recorders 1 2 4 8 10] [--seconds 5] [--model-only]
+"""
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "fm_receiver"))
+
+from core.band_synth import BandSynth  # noqa: E402
+from core.demod import AUDIO_RATE, STATION_HALF_WIDTH, low_pass, recorder_macs  # noqa: E402
+
+
+def model(samp_rate, numchans, oversample):
+    """Real MACs per second: (direct per recorder, shared channelizer, channel per recorder)"""
+    def recorder(in_rate):
+        return sum(recorder_macs(in_rate).values()) * AUDIO_RATE
+
+    direct = recorder(samp_rate)
+
+    spacing = samp_rate / numchans
+    channel_rate = spacing * oversample
+    passband = spacing / 2 + STATION_HALF_WIDTH
+    stopband = channel_rate - passband
+    prototype = len(low_pass(1, samp_rate, (passband + stopband) / 2, stopband - passband))
+    # Every numchans / oversample input samples: all arms (prototype real taps
+    # on complex samples) and one numchans-point FFT
+    period = numchans / oversample
+    shared = (2 * prototype + 2 * numchans * math.log2(numchans)) * samp_rate / period
+    channel = recorder(channel_rate)
+    return direct, shared, channel
+
+
+def measure(iq, samp_rate, recorders, use_channelizer, seconds, outdir):
+    """CPU seconds per second of IQ for one flowgraph run"""
+    from gnuradio import blocks, gr
+
+    from flowgraphs.channelizer import channelizer_bank
+    from flowgraphs.MultipleRecorder import MultipleRecorder
+
+    tb = gr.top_block()
+    source = blocks.vector_source_c(iq, True)
+    head = blocks.head(gr.sizeof_gr_complex, int(samp_rate * seconds))
+    tb.connect(source, head)
+
+    edge = samp_rate / 2 - STATION_HALF_WIDTH
+    offsets = np.linspace(-edge, edge, recorders) if recorders > 1 else [0.0]
+    if use_channelizer:
+        channelizer = channelizer_bank(samp_rate=samp_rate)
+        tb.connect(head, channelizer)
+        null = blocks.null_sink(gr.sizeof_gr_complex)
+        for i in range(channelizer.numchans):
+            tb.connect((channelizer, i), (null, i))
+    for k, offset in enumerate(offsets):
+        fname = os.path.join(outdir, f"rec{k}.wav")
+        if use_channelizer:
+            index, residual = channelizer.channel(offset)
+            recorder = MultipleRecorder(fname=fname, freq_offset=residual - 250e3, samp_rate=samp_rate,
+                                        input_rate=channelizer.get_channel_rate())
+            tb.connect((channelizer, index), recorder)
+        else:
+            recorder = MultipleRecorder(fname=fname, freq_offset=offset - 250e3, samp_rate=samp_rate)
+            tb.connect(head, recorder)
+
+    cpu = time.process_time()
+    tb.run()
+    return (time.process_time() - cpu) / seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recording cost vs number of recorders")
+    parser.add_argument("--samp-rate", type=float, default=1.92e6)
+    parser.add_argument("--numchans", type=int, default=8)
+    parser.add_argument("--oversample", type=int, default=2)
+    parser.add_argument("--recorders", type=int, nargs="+", default=[1, 2, 4, 8, 10])
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--model-only", action="store_true")
+    args = parser.parse_args()
+
+    direct, shared, channel = model(args.samp_rate, args.numchans, args.oversample)
+    print(f"filter cost model at {args.samp_rate / 1e6:.2f} Msps, {args.numchans} channels, "
+          f"{args.oversample}x oversampled (real MMAC/s)")
+    print(f"  per recorder, direct:  {direct / 1e6:8.1f}")
+    print(f"  channelizer, shared:   {shared / 1e6:8.1f}")
+    print(f"  per recorder, channel: {channel / 1e6:8.1f}")
+    print(f"{'recorders':>10} {'direct':>10} {'channelizer':>12}")
+    for k in args.recorders:
+        print(f"{k:10d} {k * direct / 1e6:10.1f} {(shared + k * channel) / 1e6:12.1f}")
+
+    if args.model_only:
+        return
+    try:
+        import gnuradio  # noqa: F401
+    except ImportError:
+        print("GNU Radio is not installed, skipped the flowgraph measurement")
+        return
+
+    iq = BandSynth(samp_rate=args.samp_rate, centre_freq=98e6, seed=0).generate(int(args.samp_rate))
+    print(f"measured CPU seconds per second of IQ ({args.seconds:.0f} s runs)")
+    print(f"{'recorders':>10} {'direct':>10} {'channelizer':>12}")
+    with tempfile.TemporaryDirectory() as outdir:
+        for k in args.recorders:
+            cpu_direct = measure(iq, args.samp_rate, k, False, args.seconds, outdir)
+            cpu_channel = measure(iq, args.samp_rate, k, True, args.seconds, outdir)
+            print(f"{k:10d} {cpu_direct:10.2f} {cpu_channel:12.2f}")
+
+
+if __name__ == "__main__":
+    main()
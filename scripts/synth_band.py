@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Synthetic FM Band Writer
+
+Writes the IQ of a synthetic FM band (core/band_synth.py) to a raw cf32 file,
+as an SDR tuned to --freq would capture it. The file can be replayed by the
+scanner with `main.py scan --device file=<path>`.
+
+Usage:
+    python scripts/synth_band.py --output band.cf32 [--seconds 2] [--samp-rate 2.4e6]
+        [--freq 98e6] [--band band.json] [--snr-offset 0]
+"""
+import argparse
+import logging
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src", "fm_receiver"))
+
+from core.band_synth import DEFAULT_BAND, BandSynth, Carrier, load_band  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic FM band to a cf32 file")
+    parser.add_argument("--output", required=True, help="cf32 file to write")
+    parser.add_argument("--seconds", type=float, default=2.0)
+    parser.add_argument("--samp-rate", type=float, default=2.4e6)
+    parser.add_argument("--freq", type=float, default=98e6, help="Centre frequency in Hz")
+    parser.add_argument("--band", help="JSON list of carriers (default: built-in band)")
+    parser.add_argument("--snr-offset", type=float, default=0.0, help="dB added to every carrier's SNR")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    carriers = load_band(args.band) if args.band else DEFAULT_BAND
+    carriers = [
+        Carrier(c.freq, c.snr_db + args.snr_offset, c.left_tone, c.right_tone, c.stereo, c.rds)
+        for c in carriers
+    ]
+    synth = BandSynth(carriers, samp_rate=args.samp_rate, centre_freq=args.freq, seed=args.seed)
+    for carrier in synth.visible_carriers():
+        print(f"{carrier.freq / 1e6:7.2f} MHz  {carrier.snr_db:5.1f} dB"
+              + (f"  RDS {carrier.rds['ps']}" if carrier.rds else ""))
+    synth.write(args.output, args.seconds)
+
+
+if __name__ == "__main__":
+    main()
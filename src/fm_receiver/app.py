@@ -10,11 +10,11 @@ logger = logging.getLogger(__name__)
 
 class FMReceiverApp:
     """Main application coordinator"""
-    def __init__(self, config_path=None,selected_device=0):
+    def __init__(self, config_path=None,selected_device=0,scan_devices=()):
         logger.info("Initializing FM Receiver Application")
 
         # Create main window
-        self.main_window = MainWindow(config_path,selected_device)
+        self.main_window = MainWindow(config_path,selected_device,scan_devices)
         logger.info("FM Receiver Application initialized successfully")
 
     def show(self):
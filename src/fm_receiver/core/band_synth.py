@@ -0,0 +1,313 @@
+"""
+Synthetic FM Band
+
+Generates complex baseband IQ of an FM broadcast band, as an SDR tuned to
+`centre_freq` would deliver it, without hardware. It is the standard input of
+the benchmarks and can replace the SDR source of the flowgraphs
+(`flowgraphs/synth_source.py`) or be written to a cf32 file.
+
+Every carrier is a broadcast FM station with a full stereo multiplex:
+
+- L+R audio (45 %), a 19 kHz pilot (9 %), L-R on a 38 kHz DSB-SC subcarrier
+  (45 %) and optionally RDS on 57 kHz (4 %), at 75 kHz peak deviation
+- Audio is one tone per channel, pre-emphasized (50 us), so the receiver's
+  de-emphasis restores the tone level and stereo separation can be checked
+- RDS carries 0A (PS name) and 2A (RadioText) groups with real checkwords and
+  offset words, differentially encoded, as biphase symbols at 1187.5 bps
+
+The multiplex is computed at a composite rate of at least 400 kHz and its
+phase integral is interpolated to the output rate, where each carrier is
+shifted to its offset from the tuned frequency. Complex Gaussian noise of
+`noise_level` RMS sets the SNR, defined in a 200 kHz channel.
+"""
+
+import json
+import logging
+import math
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Multiplex of a broadcast station
+PILOT_FREQ = 19e3
+DEVIATION = 75e3
+MONO_LEVEL = 0.45
+STEREO_LEVEL = 0.45
+PILOT_LEVEL = 0.09
+RDS_LEVEL = 0.04
+PREEMPHASIS_TAU = 50e-6
+
+# Lowest rate the multiplex is computed at before interpolation to the output rate
+MIN_COMPOSITE_RATE = 400e3
+
+# Bandwidth the SNR of a carrier is defined in
+SNR_BANDWIDTH = 200e3
+
+# RDS physical layer (IEC 62106)
+RDS_BITRATE = PILOT_FREQ / 16
+RDS_POLY = 0x5B9
+RDS_OFFSETS = {"A": 0x0FC, "B": 0x198, "C": 0x168, "C'": 0x350, "D": 0x1B4}
+
+# Block 3 of a 0A group without alternative frequencies (no AF + filler code)
+RDS_NO_AF = 0xE0CD
+
+
+def rds_checkword(info, offset):
+    """Return the 10-bit checkword of a 16-bit information word.
+
+    Args:
+        info (int): Information word
+        offset (str): Offset word name, "A", "B", "C", "C'" or "D"
+    """
+    reg = info << 10
+    for bit in range(25, 9, -1):
+        if reg & (1 << bit):
+            reg ^= RDS_POLY << (bit - 10)
+    return reg ^ RDS_OFFSETS[offset]
+
+
+def rds_group_bits(blocks, version_b=False):
+    """Serialize the four information words of a group into 104 bits, MSB first"""
+    offsets = ("A", "B", "C'" if version_b else "C", "D")
+    bits = []
+    for info, offset in zip(blocks, offsets):
+        word = (info << 10) | rds_checkword(info, offset)
+        bits.extend((word >> shift) & 1 for shift in range(25, -1, -1))
+    return bits
+
+
+def rds_groups(pi, ps="", rt="", pty=0, tp=False):
+    """Build one cycle of 0A (PS) and 2A (RadioText) groups.
+
+    The four PS groups are repeated before every RadioText group.
+
+    Args:
+        pi (int): Programme Identification code
+        ps (str): Programme Service name, up to 8 characters
+        rt (str): RadioText, up to 64 characters
+        pty (int): Programme Type code
+        tp (bool): Traffic Programme flag
+
+    Returns:
+        list: Groups, each a tuple of four 16-bit information words
+    """
+    common = (int(tp) << 10) | ((pty & 0x1F) << 5)
+    ps = ps[:8].ljust(8).encode("latin-1", "replace")
+    ps_groups = [
+        (pi, common | (1 << 3) | address, RDS_NO_AF, (ps[2 * address] << 8) | ps[2 * address + 1])
+        for address in range(4)
+    ]
+    if not rt:
+        return ps_groups
+
+    # A shorter text ends with a carriage return
+    rt = rt[:64]
+    if len(rt) < 64:
+        rt += "\r"
+    rt = rt.ljust(-(-len(rt) // 4) * 4).encode("latin-1", "replace")
+    groups = []
+    for address in range(len(rt) // 4):
+        chars = rt[4 * address:4 * address + 4]
+        groups.extend(ps_groups)
+        groups.append((pi, (2 << 12) | common | address,
+                       (chars[0] << 8) | chars[1], (chars[2] << 8) | chars[3]))
+    return groups
+
+
+def rds_symbols(groups):
+    """Return one period of differentially encoded RDS symbols (+1/-1).
+
+    The period is doubled when the cycle holds an odd number of ones, so the
+    differential encoder is back in its initial state at the end and the
+    symbols can be repeated seamlessly.
+    """
+    bits = np.array([bit for group in groups for bit in rds_group_bits(group)], dtype=np.int64)
+    if bits.sum() % 2:
+        bits = np.concatenate([bits, bits])
+    encoded = np.bitwise_xor.accumulate(bits)
+    return (2 * encoded - 1).astype(np.float32)
+
+
+class Carrier:
+    """One broadcast FM station of a synthetic band"""
+
+    def __init__(self, freq, snr_db=30.0, left_tone=1000.0, right_tone=400.0,
+                 stereo=True, rds=None):
+        """
+        Args:
+            freq (float): Carrier frequency in Hz
+            snr_db (float): Carrier-to-noise ratio in a 200 kHz channel
+            left_tone (float): Frequency of the left channel tone in Hz, None for silence
+            right_tone (float): Frequency of the right channel tone in Hz, None for silence
+            stereo (bool): Transmit the pilot and the L-R subcarrier
+            rds (dict): Keyword arguments of rds_groups (pi, ps, rt, pty, tp), None for no RDS
+        """
+        self.freq = freq
+        self.snr_db = snr_db
+        self.left_tone = left_tone
+        self.right_tone = right_tone
+        self.stereo = stereo
+        self.rds = rds
+        self.symbols = rds_symbols(rds_groups(**rds)) if rds else None
+
+    @classmethod
+    def from_dict(cls, spec):
+        """Build a carrier from its JSON description (same keys as __init__)"""
+        spec = dict(spec)
+        if spec.get("rds") and isinstance(spec["rds"].get("pi"), str):
+            spec["rds"] = dict(spec["rds"], pi=int(spec["rds"]["pi"], 16))
+        return cls(**spec)
+
+    def __repr__(self):
+        return f"Carrier({self.freq / 1e6:.1f} MHz, {self.snr_db:.0f} dB)"
+
+    def audio(self, t, tone):
+        """Pre-emphasized tone with a de-emphasized amplitude of 1/sqrt(1 + (w tau)^2)"""
+        if not tone:
+            return np.zeros_like(t)
+        omega = 2 * np.pi * tone
+        return np.sin(omega * t + math.atan(omega * PREEMPHASIS_TAU))
+
+    def multiplex(self, t):
+        """Return the baseband multiplex at times t (seconds), peak about 1"""
+        left = self.audio(t, self.left_tone)
+        right = self.audio(t, self.right_tone)
+        mpx = MONO_LEVEL * 0.5 * (left + right)
+        if self.stereo:
+            pilot = 2 * np.pi * PILOT_FREQ * t
+            mpx += PILOT_LEVEL * np.sin(pilot)
+            mpx += STEREO_LEVEL * 0.5 * (left - right) * np.sin(2 * pilot)
+        if self.symbols is not None:
+            # Biphase symbols: one sine period per bit, 57 kHz in phase with the pilot's third harmonic
+            bit_phase = RDS_BITRATE * t
+            symbols = self.symbols[np.floor(bit_phase).astype(np.int64) % len(self.symbols)]
+            mpx += RDS_LEVEL * symbols * np.sin(2 * np.pi * bit_phase) * np.sin(6 * np.pi * PILOT_FREQ * t)
+        return mpx
+
+
+# A crowded band around 98 MHz: strong, weak and adjacent stations, some with RDS
+DEFAULT_BAND = [
+    Carrier(97.3e6, 45.0, rds={"pi": 0xC201, "ps": "SYNTH 1", "rt": "Synthetic band generator"}),
+    Carrier(97.7e6, 12.0),
+    Carrier(98.1e6, 30.0, left_tone=800.0, right_tone=None, rds={"pi": 0xC202, "ps": "SYNTH 2"}),
+    Carrier(98.3e6, 8.0, stereo=False),
+    Carrier(98.7e6, 25.0, rds={"pi": 0xC203, "ps": "SYNTH 3", "pty": 10}),
+]
+
+
+def load_band(path):
+    """Load a list of carriers from a JSON file.
+
+    The file holds {"carriers": [{"freq": 98.1e6, "snr_db": 30, "rds": {"pi": "C201",
+    "ps": "NAME"}}, ...]} with the keys of Carrier.
+    """
+    with open(path, "r") as f:
+        spec = json.load(f)
+    return [Carrier.from_dict(carrier) for carrier in spec["carriers"]]
+
+
+class BandSynth:
+    """Streams the IQ of a synthetic FM band, as seen by an SDR tuned to centre_freq.
+
+    Samples are produced in internal blocks and handed out in any chunk size,
+    so the signal is continuous across generate() calls. Retuning and
+    resampling take effect at the next generated sample, like a real front end
+    dropping its buffers.
+    """
+
+    def __init__(self, carriers=None, samp_rate=2.4e6, centre_freq=98e6, noise_level=0.01,
+                 seed=None, block_frames=2**11):
+        """
+        Args:
+            carriers (list): Carrier objects, DEFAULT_BAND if None
+            samp_rate (float): Output sample rate in Hz
+            centre_freq (float): Frequency the simulated front end is tuned to in Hz
+            noise_level (float): RMS of the complex Gaussian noise
+            seed (int): Seed of the noise generator
+            block_frames (int): Composite-rate samples computed per internal block
+        """
+        self.carriers = list(DEFAULT_BAND if carriers is None else carriers)
+        self.noise_level = noise_level
+        self.block_frames = block_frames
+        self.rng = np.random.default_rng(seed)
+        self.centre_freq = centre_freq
+        self.set_samp_rate(samp_rate)
+
+    def set_samp_rate(self, samp_rate):
+        self.samp_rate = samp_rate
+        # Integer decimation to the composite rate, which stays at or above MIN_COMPOSITE_RATE
+        self.decimation = max(1, int(samp_rate // MIN_COMPOSITE_RATE))
+        self.composite_rate = samp_rate / self.decimation
+        self.block_size = self.block_frames * self.decimation
+        self._ramp = (np.arange(self.decimation) / self.decimation)[None, :]
+        self._sample = 0
+        self._mod_phase = {id(carrier): 0.0 for carrier in self.carriers}
+        self._carrier_phase = {id(carrier): 0.0 for carrier in self.carriers}
+        self._buffer = np.zeros(0, dtype=np.complex64)
+
+    def set_centre_freq(self, centre_freq):
+        self.centre_freq = centre_freq
+        self._buffer = self._buffer[:0]
+
+    def visible_carriers(self):
+        """Carriers whose 200 kHz channel lies inside the captured band"""
+        edge = self.samp_rate / 2 - SNR_BANDWIDTH / 2
+        return [c for c in self.carriers if abs(c.freq - self.centre_freq) < edge]
+
+    def _block(self):
+        """Compute the next internal block of block_size samples"""
+        n = self.block_size
+        noise = self.rng.standard_normal(2 * n, dtype=np.float32).view(np.complex64)
+        iq = noise * np.float32(self.noise_level / np.sqrt(2))
+
+        # Composite-rate time grid, with one extra point to interpolate the last frame
+        start = self._sample // self.decimation
+        t = (start + np.arange(self.block_frames + 1)) / self.composite_rate
+        phase_step = 2 * np.pi * DEVIATION / self.composite_rate
+        n_out = np.arange(n)
+
+        for carrier in self.visible_carriers():
+            key = id(carrier)
+            # Phase of the frequency modulation at the composite rate...
+            mod = np.empty(self.block_frames + 1)
+            mod[0] = self._mod_phase[key]
+            np.cumsum(carrier.multiplex(t[:-1]) * phase_step, out=mod[1:])
+            mod[1:] += mod[0]
+            self._mod_phase[key] = mod[-1] % (2 * np.pi)
+
+            # ...linearly interpolated to the output rate
+            mod = (mod[:-1, None] + np.diff(mod)[:, None] * self._ramp).ravel()
+
+            offset_step = 2 * np.pi * (carrier.freq - self.centre_freq) / self.samp_rate
+            phase = self._carrier_phase[key] + offset_step * n_out + mod
+            self._carrier_phase[key] = (self._carrier_phase[key] + offset_step * n) % (2 * np.pi)
+
+            amplitude = self.noise_level * math.sqrt(10 ** (carrier.snr_db / 10) * SNR_BANDWIDTH / self.samp_rate)
+            iq += (amplitude * np.exp(1j * phase)).astype(np.complex64)
+
+        self._sample += n
+        return iq
+
+    def generate(self, n):
+        """Return the next n samples as complex64"""
+        blocks = [self._buffer]
+        available = len(self._buffer)
+        while available < n:
+            block = self._block()
+            blocks.append(block)
+            available += len(block)
+        samples = np.concatenate(blocks) if len(blocks) > 1 else self._buffer
+        self._buffer = samples[n:]
+        return samples[:n]
+
+    def write(self, path, seconds, chunk=2**20):
+        """Write `seconds` of the band to a raw cf32 file (GNU Radio file_source format)"""
+        total = int(round(seconds * self.samp_rate))
+        with open(path, "wb") as f:
+            for start in range(0, total, chunk):
+                self.generate(min(chunk, total - start)).tofile(f)
+        logger.info(
+            f"Wrote {seconds:.2f} s of {len(self.visible_carriers())} carriers at "
+            f"{self.samp_rate / 1e6:.3f} Msps around {self.centre_freq / 1e6:.2f} MHz to {path}"
+        )
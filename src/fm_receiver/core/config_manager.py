@@ -70,4 +70,15 @@ class ConfigManager:
             "stations": [88.7e6],
             "volume": 0,
             "outdir":None,
+            "scan_samp_rate": 2.4e6,
+            "scan_two_pass": True,
+            "scan_method": "cfar",
+            "scan_incremental": True,
+            "scan_max_age_hours": 24,
+            "scan_segments": {},
+            "occupancy_monitor": False,
+            "occupancy_interval": 5,
+            "occupancy_max_age": 300,
+            "record_channelizer": False,
+            "record_slots": 4,
         }
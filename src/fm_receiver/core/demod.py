@@ -0,0 +1,300 @@
+"""
+NumPy FM Demodulator
+
+A GNU Radio-free implementation of the `flowgraphs/MultipleRecorder.py`
+demodulation chain, with the same parameters (freq_offset, samp_rate) and
+the same filter designs (`recorder_taps`), for offline analysis on machines
+without GNU Radio:
+
+    freq_xlating_fir_filter_ccc (/decimation to ~480 kHz, passes +/-100 kHz)
+    -> fir_filter_ccf (/2 to the ~240 kHz demodulation rate, fs/4 low-pass)
+    -> quadrature_demod_cf (gain demod_rate / (2 pi 75 kHz))
+    -> fir_filter_fff (/5 to ~48 kHz, 15 kHz audio low-pass)
+    -> rational_resampler_fff (to exactly 48 kHz, left out when already there)
+    -> [fm_deemph (optional, MultipleRecorder has none)]
+
+IQ is processed in fixed-size blocks. Every stage keeps its state between
+blocks (filter history, decimation phase, oscillator phase, last sample), so
+the output does not depend on the block size and a recording is never loaded
+as a whole. The FIR stages only compute the outputs they keep: each output is
+one row of a strided sliding-window view times the taps.
+
+The tap designs follow gr-filter: `low_pass` is firdes.low_pass and
+`resampler_taps` the default taps of filter.rational_resampler.
+"""
+
+import math
+import wave
+from fractions import Fraction
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+from scipy.signal import lfilter
+
+# Maximum attenuation (dB) of the windows, as fft::window::max_attenuation
+WINDOW_ATTENUATION = {"hamming": 53.0, "hann": 44.0, "blackman": 74.0, "rectangular": 21.0}
+
+# Rate after the recorder's channel filter, its decimation from there to the
+# demodulation rate and from the demodulation rate to audio
+CHANNEL_RATE = 480e3
+DEMOD_DECIMATION = 2
+AUDIO_DECIMATION = 5
+
+# Rate of the recorded audio, whatever the capture rate
+AUDIO_RATE = 48000
+
+# Half the bandwidth of an FM broadcast station
+STATION_HALF_WIDTH = 100e3
+
+
+def _window(name, ntaps, beta):
+    if name == "kaiser":
+        return np.kaiser(ntaps, beta)
+    if name == "rectangular":
+        return np.ones(ntaps)
+    return {"hamming": np.hamming, "hann": np.hanning, "blackman": np.blackman}[name](ntaps)
+
+
+def low_pass(gain, samp_rate, cutoff, transition_width, window="hamming", beta=6.76):
+    """Windowed-sinc low-pass taps, as gnuradio.filter.firdes.low_pass.
+
+    The number of taps is int(attenuation * samp_rate / (22 * transition_width)),
+    made odd, and the taps are scaled to `gain` at DC.
+    """
+    if window == "kaiser":
+        attenuation = beta / 0.1102 + 8.7
+    else:
+        attenuation = WINDOW_ATTENUATION[window]
+    ntaps = int(attenuation * samp_rate / (22.0 * transition_width))
+    ntaps |= 1
+
+    middle = (ntaps - 1) // 2
+    n = np.arange(ntaps) - middle
+    omega = 2 * np.pi * cutoff / samp_rate
+    with np.errstate(invalid="ignore", divide="ignore"):
+        taps = np.where(n == 0, omega / np.pi, np.sin(n * omega) / (n * np.pi))
+    taps *= _window(window, ntaps, beta)
+    return taps * (gain / taps.sum())
+
+
+def resampler_taps(interpolation, decimation, fractional_bw=0.4):
+    """Default taps of gnuradio.filter.rational_resampler (Kaiser, beta 7)"""
+    rate = interpolation / decimation
+    if rate >= 1.0:
+        transition_width = 0.5 - fractional_bw
+        mid_transition_band = 0.5 - transition_width / 2.0
+    else:
+        transition_width = rate * (0.5 - fractional_bw)
+        mid_transition_band = rate * 0.5 - transition_width / 2.0
+    return low_pass(interpolation, interpolation, mid_transition_band, transition_width, "kaiser", 7.0)
+
+
+def audio_resampling(in_rate):
+    """Interpolation and decimation from the audio filter's output to AUDIO_RATE.
+
+    The decimations of the chain only give 48 kHz for multiples of 480 kHz
+    (51.2 kHz at 2.048 Msps, 50 kHz at 1 Msps), so the recorder resamples
+    the rest. The ratio is bounded to denominators up to 1000, which keeps
+    the resampler small for odd rates at the cost of a few Hz of error.
+
+    Returns:
+        tuple: (interpolation, decimation), (1, 1) when no resampling is needed
+    """
+    decimation = max(1, round(in_rate / CHANNEL_RATE))
+    filtered_rate = Fraction(in_rate).limit_denominator() / (decimation * DEMOD_DECIMATION * AUDIO_DECIMATION)
+    ratio = (AUDIO_RATE / filtered_rate).limit_denominator(1000)
+    return ratio.numerator, ratio.denominator
+
+
+def recorder_taps(in_rate):
+    """Decimation and filters of each MultipleRecorder stage for an input rate.
+
+    Every filter is designed at the rate it runs at. The channel filter
+    passes the station and stops from channel_rate - 100 kHz, the first
+    frequency that folds back onto the station after both decimations (a
+    single tap when there is nothing to decimate, e.g. after the
+    channelizer). The fs/4 filter before the demodulator passes +/-100 kHz
+    and stops from demod_rate - 100 kHz. It has the cutoff of a half-band
+    filter, but fir_filter_ccf multiplies every tap, including the ones that
+    come out zero. The audio filter passes 15 kHz and stops the 19 kHz pilot.
+
+    Returns:
+        tuple: (decimation, channel taps, fs/4 taps, audio taps)
+    """
+    decimation = max(1, round(in_rate / CHANNEL_RATE))
+    channel_rate = in_rate / decimation
+    demod_rate = channel_rate / DEMOD_DECIMATION
+    if decimation == 1:
+        channel = np.ones(1)
+    else:
+        channel = low_pass(1, in_rate, channel_rate / 2, channel_rate - 2 * STATION_HALF_WIDTH)
+    halfband = low_pass(1, channel_rate, channel_rate / 4, demod_rate - 2 * STATION_HALF_WIDTH)
+    audio = low_pass(1, demod_rate, 17.5e3, 5e3, "hamming", 6.76)
+    return decimation, channel, halfband, audio
+
+
+def recorder_macs(in_rate):
+    """Real multiply-accumulates per 48 kHz audio sample of MultipleRecorder, per stage.
+
+    Complex taps on complex samples (the frequency-translating filter) count
+    4 real MACs per tap, real taps on complex samples 2 and real on real 1.
+    Every tap counts, zero or not, as in the GNU Radio filters. Only the kept
+    outputs of each decimating filter are computed, and the resampler only
+    runs the polyphase arm of each output.
+
+    Returns:
+        dict: MACs per audio sample of the channel, halfband, audio and
+            resampler stages
+    """
+    decimation, channel, halfband, audio = recorder_taps(in_rate)
+    interpolation, resampling = audio_resampling(in_rate)
+    # Audio filter outputs per 48 kHz output sample
+    scale = resampling / interpolation
+    resampler = math.ceil(len(resampler_taps(interpolation, resampling)) / interpolation) if resampling != interpolation else 0
+    return {
+        "channel": round(4 * len(channel) * DEMOD_DECIMATION * AUDIO_DECIMATION * scale) if decimation > 1 else 0,
+        "halfband": round(2 * len(halfband) * AUDIO_DECIMATION * scale),
+        "audio": round(len(audio) * scale),
+        "resampler": resampler,
+    }
+
+
+def fm_deemph_taps(samp_rate, tau):
+    """(b, a) of the de-emphasis IIR filter, as gnuradio.analog.fm_deemph"""
+    w_c = 1.0 / tau
+    w_ca = 2.0 * samp_rate * math.tan(w_c / (2.0 * samp_rate))
+    k = -w_ca / (2.0 * samp_rate)
+    p1 = (1.0 + k) / (1.0 - k)
+    b0 = -k / (1.0 - k)
+    return np.array([b0, b0]), np.array([1.0, -p1])
+
+
+class FirDecimator:
+    """Streaming FIR filter keeping every `decimation`-th output"""
+
+    def __init__(self, taps, decimation=1, dtype=np.float32):
+        self.decimation = decimation
+        # Reversed once, so each output is a plain dot product with the input window
+        self.taps = np.asarray(taps[::-1], dtype=np.float32)
+        self.history = np.zeros(len(taps) - 1, dtype=dtype)
+        self.phase = 0   # Input samples to skip before the next kept output
+
+    def process(self, x):
+        data = np.concatenate([self.history, x])
+        windows = sliding_window_view(data, len(self.taps))[self.phase::self.decimation]
+        y = windows @ self.taps
+
+        consumed = self.phase + len(windows) * self.decimation
+        self.phase = consumed - (len(data) - len(self.taps) + 1)
+        self.history = data[len(data) - len(self.history):]
+        return y
+
+
+class RationalResampler:
+    """Streaming polyphase resampler by interpolation / decimation, as filter.rational_resampler_fff"""
+
+    def __init__(self, interpolation, decimation, taps=None):
+        self.interpolation = interpolation
+        self.decimation = decimation
+        if taps is None:
+            taps = resampler_taps(interpolation, decimation)
+        # Arm p holds taps p, p + interpolation, ..., reversed like FirDecimator's
+        ntaps = math.ceil(len(taps) / interpolation)
+        padded = np.zeros(ntaps * interpolation)
+        padded[:len(taps)] = taps
+        self.arms = np.ascontiguousarray(padded.reshape(ntaps, interpolation).T[:, ::-1], dtype=np.float32)
+        self.history = np.zeros(ntaps - 1, dtype=np.float32)
+        self.position = 0   # Upsampled index of the next output, from the first new sample
+
+    def process(self, x):
+        data = np.concatenate([self.history, x])
+        total = len(x) * self.interpolation
+        upsampled = np.arange(self.position, total, self.decimation)
+        # Output n uses arm n % interpolation on the inputs up to n // interpolation
+        windows = sliding_window_view(data, self.arms.shape[1])[upsampled // self.interpolation]
+        y = np.einsum("ij,ij->i", windows, self.arms[upsampled % self.interpolation])
+
+        self.position = (upsampled[-1] + self.decimation if len(upsampled) else self.position) - total
+        self.history = data[len(data) - len(self.history):]
+        return y
+
+
+class DemodChain:
+    """MultipleRecorder's demodulation chain on NumPy blocks"""
+
+    def __init__(self, freq_offset=0, samp_rate=1920000, tau=None, input_rate=0):
+        """
+        Args:
+            freq_offset (float): Offset as given to MultipleRecorder; the station
+                sits at freq_offset + 250 kHz from the centre of the IQ
+            samp_rate (float): Sample rate of the IQ in Hz
+            tau (float): De-emphasis time constant in seconds, None for none
+                (like MultipleRecorder)
+            input_rate (float): Rate of a channelizer output, 0 for samp_rate
+        """
+        self.samp_rate = samp_rate
+        in_rate = input_rate or samp_rate
+        self.decimation, channel, halfband, audio = recorder_taps(in_rate)
+        self.demod_rate = in_rate / self.decimation / DEMOD_DECIMATION
+        self.audio_rate = AUDIO_RATE
+
+        self.channel = FirDecimator(channel, self.decimation, np.complex64)
+        self.halfband = FirDecimator(halfband, DEMOD_DECIMATION, np.complex64)
+        self.audio_filter = FirDecimator(audio, AUDIO_DECIMATION)
+        interpolation, resampling = audio_resampling(in_rate)
+        self.resampler = RationalResampler(interpolation, resampling) if interpolation != resampling else None
+        self.gain = self.demod_rate / (2 * math.pi * 75000)
+
+        self.deemph = fm_deemph_taps(self.audio_rate, tau) if tau else None
+        self._deemph_state = np.zeros(1)
+
+        self._omega = -2 * math.pi * (freq_offset + 250e3) / in_rate
+        self._phase = 0.0
+        self._last = np.complex64(0)    # Zero history, as in GNU Radio
+
+    def process(self, iq):
+        """Demodulate one block of complex64 IQ and return the audio produced by it"""
+        # Channel selection: translate the station to DC, low-pass and decimate twice
+        mixer = np.exp(1j * (self._phase + self._omega * np.arange(len(iq)))).astype(np.complex64)
+        self._phase = (self._phase + self._omega * len(iq)) % (2 * math.pi)
+        channel = self.halfband.process(self.channel.process(iq * mixer))
+
+        # Quadrature demodulation
+        previous = np.concatenate([[self._last], channel[:-1]]) if len(channel) else channel
+        if len(channel):
+            self._last = channel[-1]
+        demod = (self.gain * np.angle(channel * np.conj(previous))).astype(np.float32)
+
+        audio = self.audio_filter.process(demod)
+        if self.resampler is not None:
+            audio = self.resampler.process(audio)
+        if self.deemph is not None:
+            audio, self._deemph_state = lfilter(*self.deemph, audio, zi=self._deemph_state)
+        return audio.astype(np.float32)
+
+
+def demodulate_file(iq_file, fname, freq_offset, tau=None, block_size=2**18):
+    """Demodulate a station of an IQ recording into a 16-bit WAV file, block by block.
+
+    Args:
+        iq_file (core.iq_file.IQFile): Recording with a known sample rate
+        fname (str): WAV file to write
+        freq_offset (float): MultipleRecorder offset of the station
+        tau (float): De-emphasis time constant in seconds, None for none
+        block_size (int): IQ samples per block
+
+    Returns:
+        int: Audio samples written
+    """
+    chain = DemodChain(freq_offset, iq_file.samp_rate, tau)
+    written = 0
+    with wave.open(fname, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(chain.audio_rate)
+        for start in range(0, len(iq_file), block_size):
+            audio = chain.process(iq_file.read(start, min(block_size, len(iq_file) - start)))
+            # Same conversion as wavfile_sink for PCM_16
+            wav.writeframes((np.clip(audio, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+            written += len(audio)
+    return written
@@ -0,0 +1,216 @@
+"""
+IQ File Replay
+
+Reads recorded IQ through memory-mapped I/O and replays it as an SDR would
+deliver it, without GNU Radio imports (the flowgraph source is
+`flowgraphs/sources.py`).
+
+Supported recordings:
+
+- Raw interleaved I/Q: cf32 (complex float32, GNU Radio file_sink format),
+  cs16, cs8 and cu8 (rtl_sdr output). The format comes from the extension or
+  an explicit `fmt`; the sample rate and centre frequency are not stored in
+  the file and have to be given.
+- SigMF: a `.sigmf-meta` / `.sigmf-data` pair; the datatype, sample rate and
+  centre frequency are read from the metadata.
+
+`IQReplay` loops over the file and simulates the front end. A retune inside
+the recorded bandwidth is a frequency translation by the difference between
+the tuned and the recorded centre frequency, and a different sample rate is
+obtained with the rational resampler of `core.demod`, whose low-pass keeps
+anything beyond the new Nyquist frequency from folding into the band. Both
+keep their state across reads, so a flowgraph sees one unbroken stream.
+"""
+
+import json
+import logging
+import math
+import os
+from fractions import Fraction
+
+import numpy as np
+
+from core.demod import RationalResampler
+
+logger = logging.getLogger(__name__)
+
+# Raw formats: (numpy dtype of one I or Q value, scale to +/-1, offset)
+RAW_FORMATS = {
+    "cf32": (np.float32, 1.0, 0.0),
+    "cs16": (np.int16, 1 / 32768, 0.0),
+    "cs8": (np.int8, 1 / 128, 0.0),
+    "cu8": (np.uint8, 1 / 127.5, -127.5),
+}
+
+EXTENSIONS = {
+    ".cf32": "cf32", ".fc32": "cf32", ".cfile": "cf32", ".raw": "cf32",
+    ".cs16": "cs16", ".sc16": "cs16",
+    ".cs8": "cs8", ".sc8": "cs8",
+    ".cu8": "cu8",
+}
+
+SIGMF_DATATYPES = {
+    "cf32_le": "cf32", "ci16_le": "cs16", "ci8": "cs8", "cu8": "cu8",
+}
+
+
+class IQFile:
+    """A memory-mapped IQ recording"""
+
+    def __init__(self, path, fmt=None, samp_rate=None, centre_freq=None):
+        """
+        Args:
+            path (str): Raw IQ file, or either file of a SigMF pair
+            fmt (str): Raw format (cf32, cs16, cs8, cu8), from the extension if None
+            samp_rate (float): Sample rate of a raw file in Hz
+            centre_freq (float): Centre frequency of a raw file in Hz, None if unknown
+
+        Raises:
+            ValueError: Unknown format, or a SigMF datatype that is not supported
+        """
+        root, ext = os.path.splitext(path)
+        if ext in (".sigmf-meta", ".sigmf-data"):
+            with open(root + ".sigmf-meta", "r") as f:
+                meta = json.load(f)
+            datatype = meta["global"]["core:datatype"]
+            if datatype not in SIGMF_DATATYPES:
+                raise ValueError(f"Unsupported SigMF datatype {datatype}")
+            fmt = SIGMF_DATATYPES[datatype]
+            samp_rate = meta["global"].get("core:sample_rate", samp_rate)
+            captures = meta.get("captures") or [{}]
+            centre_freq = captures[0].get("core:frequency", centre_freq)
+            path = root + ".sigmf-data"
+
+        fmt = fmt or EXTENSIONS.get(ext)
+        if fmt not in RAW_FORMATS:
+            raise ValueError(f"Unknown IQ format for {path}, give one of {sorted(RAW_FORMATS)}")
+
+        self.path = path
+        self.fmt = fmt
+        self.samp_rate = samp_rate
+        self.centre_freq = centre_freq
+
+        dtype, self._scale, self._offset = RAW_FORMATS[fmt]
+        self.data = np.memmap(path, dtype=dtype, mode="r")
+        self.data = self.data[:len(self.data) // 2 * 2].reshape(-1, 2)
+        if not len(self.data):
+            raise ValueError(f"{path} holds no samples")
+
+        logger.info(
+            f"Opened {path}: {len(self)} {fmt} samples"
+            + (f" at {samp_rate / 1e6:.3f} Msps" if samp_rate else "")
+            + (f" around {centre_freq / 1e6:.3f} MHz" if centre_freq else "")
+        )
+
+    def __len__(self):
+        return len(self.data)
+
+    def read(self, start, count):
+        """Return `count` samples from `start` as complex64, wrapping at the end of the file"""
+        start %= len(self.data)
+        if start + count <= len(self.data):
+            raw = self.data[start:start + count]
+        else:
+            raw = self.data.take(np.arange(start, start + count) % len(self.data), axis=0)
+        if self.fmt == "cf32":
+            return np.ascontiguousarray(raw).view(np.complex64).ravel()
+        samples = np.empty(count, dtype=np.complex64)
+        samples.real = (raw[:, 0] + np.float32(self._offset)) * np.float32(self._scale)
+        samples.imag = (raw[:, 1] + np.float32(self._offset)) * np.float32(self._scale)
+        return samples
+
+
+class IQReplay:
+    """Loops over an IQFile as a front end tuned to centre_freq at samp_rate"""
+
+    def __init__(self, iq_file, samp_rate=None, centre_freq=None, repeat=True):
+        """
+        Args:
+            iq_file (IQFile): Recording to replay
+            samp_rate (float): Output sample rate in Hz, the file's rate if None
+            centre_freq (float): Tuned frequency in Hz, the file's centre if None
+            repeat (bool): Loop over the file, or stop at its end
+        """
+        self.file = iq_file
+        self.repeat = repeat
+        self.file_rate = iq_file.samp_rate or samp_rate
+        self.samp_rate = samp_rate or self.file_rate
+        self.centre_freq = centre_freq
+        self._position = 0          # Read position in file samples
+        self._phase = 0.0           # Phase of the translation oscillator
+        self._outside = False       # Warned about a tuning outside the recording
+        self.set_samp_rate(self.samp_rate)
+        self.set_centre_freq(centre_freq)
+
+    def set_samp_rate(self, samp_rate):
+        self.samp_rate = samp_rate
+        # Bounded like core.demod.audio_resampling, a few Hz off for odd rates
+        ratio = Fraction(samp_rate / self.file_rate).limit_denominator(1000) if self.file_rate else Fraction(1)
+        self._ratio = ratio
+        self._resampler = None
+        self._pending = np.zeros(0, dtype=np.complex64)   # Resampled samples not returned yet
+        if ratio != 1:
+            self._resampler = RationalResampler(ratio.numerator, ratio.denominator)
+            logger.info(
+                f"Replaying {self.file_rate / 1e6:.3f} Msps at {samp_rate / 1e6:.3f} Msps "
+                f"by resampling {ratio.numerator}/{ratio.denominator}"
+            )
+        self._update_offset()
+
+    def set_centre_freq(self, centre_freq):
+        self.centre_freq = centre_freq
+        self._update_offset()
+
+    def _update_offset(self):
+        # Retunes are only simulated when the recorded centre frequency is known
+        if self.file.centre_freq is None or self.centre_freq is None:
+            self.offset = 0.0
+        else:
+            self.offset = self.centre_freq - self.file.centre_freq
+            if abs(self.offset) > self.file_rate / 2 and not self._outside:
+                self._outside = True
+                logger.warning(
+                    f"Tuned {self.centre_freq / 1e6:.3f} MHz is outside the recording "
+                    f"({self.file.centre_freq / 1e6:.3f} MHz +/- {self.file_rate / 2e6:.3f} MHz)"
+                )
+        self._omega = -2 * np.pi * self.offset / self.samp_rate
+
+    def remaining(self):
+        """Samples left before the end of the file (unbounded when repeating)"""
+        if self.repeat:
+            return math.inf
+        return len(self._pending) + math.floor((len(self.file) - self._position) * self._ratio)
+
+    def _read_file(self, count):
+        """Return up to count file samples from the read position"""
+        if not self.repeat:
+            count = min(count, len(self.file) - self._position)
+        samples = self.file.read(self._position, count)
+        self._position += count
+        if self.repeat:
+            self._position %= len(self.file)
+        return samples
+
+    def read(self, n):
+        """Return the next n samples as complex64, fewer (or none) at the end of a non-repeating file"""
+        n = min(n, self.remaining())
+        if n == 0:
+            return np.zeros(0, dtype=np.complex64)
+        if self._resampler is None:
+            samples = self._read_file(n)
+        else:
+            while len(self._pending) < n:
+                count = math.ceil((n - len(self._pending)) / self._ratio) + 1
+                raw = self._read_file(count)
+                if not len(raw):
+                    break
+                resampled = self._resampler.process(raw).astype(np.complex64)
+                self._pending = np.concatenate([self._pending, resampled])
+            samples, self._pending = self._pending[:n], self._pending[n:]
+            n = len(samples)
+
+        if self._omega:
+            phase = self._phase + self._omega * np.arange(n)
+            samples = samples * np.exp(1j * phase).astype(np.complex64)
+            self._phase = (self._phase + self._omega * n) % (2 * np.pi)
+        return samples
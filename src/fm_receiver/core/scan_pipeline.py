@@ -0,0 +1,125 @@
+"""
+Scan Detection Pipeline
+
+Overlaps station detection with capture during a band scan. When a window
+finishes, its per-bin power accumulator is handed off to a worker thread
+together with the window's candidate grid, and the capture side is free to
+retune and start filling the next window straight away. Detections of all
+windows are merged at the end with `core.scan_planner.merge_stations`.
+
+With `pipelined=False` the same object runs detection inline, so callers
+use a single code path in both modes.
+
+Jobs are queued from the flowgraph's work thread and collected from the
+caller's thread, so the list of pending jobs is guarded by its own lock.
+`close()` finishes the queued jobs and stops the worker thread; the owner
+calls it when it stops (the scanner block's `stop()`), and the next job
+starts a new worker.
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from core.scan_planner import merge_stations
+from core.station_detector import CFAR, DEFAULT_THRESHOLDS, MINMAX, refine_stations, window_detections
+
+logger = logging.getLogger(__name__)
+
+
+class DetectionPipeline:
+    """Collects per-window detections, optionally on a background thread.
+
+    Attributes:
+        threshold (float): Detection threshold passed to the detector
+        method (str): Decision rule, core.station_detector.MINMAX or CFAR
+        detections (dict): Station frequency in Hz -> strongest power seen
+    """
+
+    def __init__(self, threshold, pipelined=True, max_workers=1, method=MINMAX):
+        self.threshold = threshold
+        self.method = method
+        self.pipelined = pipelined
+        self.max_workers = max_workers
+        self.detections = {}
+        self._lock = threading.Lock()           # Guards detections
+        self._pending_lock = threading.Lock()   # Guards _pending and _executor
+        self._pending = []
+        self._executor = None
+
+    def submit(self, bin_power, station_mask, candidate_freqs, frames):
+        """Queue the detection of one finished window.
+
+        The arrays are owned by the pipeline from here on, so callers must
+        pass a copy of any buffer they keep reusing.
+
+        Args:
+            bin_power (np.ndarray): Accumulated statistic per FFT bin
+            station_mask (np.ndarray): (candidates x fft_size) bin mask
+            candidate_freqs (np.ndarray): Frequency of each candidate in Hz
+            frames (int): FFT frames accumulated into bin_power
+        """
+        self._queue(self._detect, bin_power, station_mask, candidate_freqs, frames)
+
+    def submit_refine(self, bin_power, freq, samp_rate, targets, frames):
+        """Queue the confirmation of known candidates on a high-resolution window.
+
+        Candidates are always confirmed by the "cfar" rule, at this pipeline's
+        threshold when it is a "cfar" one.
+        """
+        threshold = self.threshold if self.method == CFAR else DEFAULT_THRESHOLDS[CFAR]
+        self._queue(refine_stations, bin_power, freq, samp_rate, targets, threshold, frames)
+
+    def _queue(self, job, *args):
+        if not self.pipelined:
+            self._run(job, *args)
+            return
+        with self._pending_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="scan-detect"
+                )
+            self._pending = [f for f in self._pending if not f.done()]
+            self._pending.append(self._executor.submit(self._run, job, *args))
+
+    def _detect(self, bin_power, station_mask, candidate_freqs, frames):
+        return window_detections(station_mask @ bin_power, candidate_freqs, self.threshold, self.method,
+                                 frames, station_mask.sum(axis=1))
+
+    def _run(self, job, *args):
+        found = job(*args)
+        with self._lock:
+            for station, power in found.items():
+                self.detections[station] = max(power, self.detections.get(station, 0.0))
+
+    def _drain(self):
+        """Wait for the queued jobs, including any queued while waiting"""
+        while True:
+            with self._pending_lock:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            wait(pending)
+            for future in pending:
+                if future.exception() is not None:
+                    logger.error(f"Window detection failed: {future.exception()}")
+
+    def results(self):
+        """Wait for queued windows and return the merged, sorted stations"""
+        self._drain()
+        with self._lock:
+            return merge_stations(self.detections)
+
+    def reset(self):
+        """Forget all detections, e.g. before a new scan"""
+        self._drain()
+        with self._lock:
+            self.detections = {}
+
+    def close(self):
+        """Finish the queued windows and shut the worker thread down"""
+        self._drain()
+        with self._pending_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
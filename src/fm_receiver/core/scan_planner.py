@@ -0,0 +1,163 @@
+"""
+Scan Planner
+
+Computes the centre frequencies a band scan has to visit, based on the
+actual sample rate, the usable passband of each capture and the band edges,
+and merges the stations reported by overlapping windows.
+
+Each window trusts the candidates within `candidate_span()` of its centre.
+Consecutive windows are spaced so those trusted ranges overlap by `overlap`
+Hz, which guarantees every channel of the band lies fully inside at least
+one window. A station near the seam may be reported by both windows, on the
+same or an adjacent raster point; `merge_stations` keeps the strongest one.
+
+For incremental rescans each window of a plan is a segment of the band with
+the time of its last full scan. `plan_incremental` rescans only the stale
+segments and verifies the known stations elsewhere with targeted dwells.
+"""
+
+import logging
+import math
+
+from core.station_detector import CHANNEL_STEP, USABLE_FRACTION, candidate_span
+
+logger = logging.getLogger(__name__)
+
+# Sample rates the scanner accepts (RTL-SDR: 2.4 Msps stable, 3.2 Msps max)
+SUPPORTED_SCAN_RATES = (2.048e6, 2.4e6, 3.2e6)
+DEFAULT_SCAN_RATE = 2.4e6
+
+
+def scan_step(samp_rate, usable_fraction=USABLE_FRACTION, overlap=CHANNEL_STEP):
+    """Return the distance between window centres in Hz, on the channel raster"""
+    step = 2 * candidate_span(samp_rate, usable_fraction) - overlap
+    return max(CHANNEL_STEP, math.floor(step / CHANNEL_STEP + 1e-9) * CHANNEL_STEP)
+
+
+def plan_scan(start_freq, end_freq, samp_rate, usable_fraction=USABLE_FRACTION,
+              overlap=CHANNEL_STEP):
+    """Plan the window centres needed to cover a band.
+
+    Args:
+        start_freq (float): Lowest station frequency to cover in Hz
+        end_freq (float): Highest station frequency to cover in Hz
+        samp_rate (float): Capture sample rate in Hz
+        usable_fraction (float): Fraction of samp_rate with a flat passband
+        overlap (float): Overlap of the trusted ranges of adjacent windows in Hz
+
+    Returns:
+        list: Window centre frequencies in Hz
+    """
+    span = candidate_span(samp_rate, usable_fraction)
+    step = scan_step(samp_rate, usable_fraction, overlap)
+
+    # First window starts its trusted range exactly at the band edge
+    centre = start_freq + math.floor(span / CHANNEL_STEP + 1e-9) * CHANNEL_STEP
+    plan = [centre]
+    while centre + span < end_freq:
+        centre += step
+        plan.append(centre)
+
+    logger.info(
+        f"Scan plan: {len(plan)} windows of {samp_rate / 1e6:.3f} Msps, "
+        f"step {step / 1e3:.0f} kHz for {start_freq / 1e6:.1f}-{end_freq / 1e6:.1f} MHz"
+    )
+    return plan
+
+
+def plan_refine(candidates, samp_rate, search=CHANNEL_STEP, usable_fraction=USABLE_FRACTION):
+    """Group flagged candidates into the fewest high-resolution windows.
+
+    Each target must have `search` Hz of margin inside the trusted range of
+    its window so its refined centre can move to a neighbouring channel.
+
+    Args:
+        candidates (list): Station frequencies flagged by the coarse pass in Hz
+        samp_rate (float): Capture sample rate in Hz
+        search (float): Refinement search radius around each target in Hz
+
+    Returns:
+        list: (centre_freq, [target_freqs]) tuples
+    """
+    reach = candidate_span(samp_rate, usable_fraction) - search
+    reach = math.floor(reach / CHANNEL_STEP + 1e-9) * CHANNEL_STEP
+    windows = []
+    for freq in sorted(candidates):
+        if windows and freq <= windows[-1][0] + reach:
+            windows[-1][1].append(freq)
+        else:
+            windows.append((freq + reach, [freq]))
+
+    logger.info(f"Refine plan: {len(windows)} windows for {len(candidates)} candidates")
+    return windows
+
+
+def split_plan(plan, parts):
+    """Split a plan into at most `parts` contiguous runs of near-equal length.
+
+    Contiguous runs keep the retune steps of each device small.
+    """
+    size, extra = divmod(len(plan), parts)
+    chunks = []
+    start = 0
+    for index in range(parts):
+        end = start + size + (index < extra)
+        if end > start:
+            chunks.append(plan[start:end])
+        start = end
+    return chunks
+
+
+def segment_key(centre):
+    """Key of a plan window in the persisted segment timestamps (JSON keys are strings)"""
+    return str(int(round(centre)))
+
+
+def plan_incremental(plan, segments, stations, samp_rate, now, max_age,
+                     usable_fraction=USABLE_FRACTION):
+    """Split a scan into stale windows to rescan and known stations to verify.
+
+    Args:
+        plan (list): Window centres of the full scan in Hz, see plan_scan
+        segments (dict): segment_key(centre) -> time of the last full scan (epoch seconds)
+        stations (list): Known station frequencies in Hz
+        samp_rate (float): Capture sample rate in Hz
+        now (float): Current time in epoch seconds
+        max_age (float): Age in seconds after which a segment is rescanned
+
+    Returns:
+        tuple: (windows, targets) - window centres in Hz needing a full scan,
+        and known stations in Hz outside them to verify
+    """
+    windows = [c for c in plan if now - segments.get(segment_key(c), 0) > max_age]
+
+    span = candidate_span(samp_rate, usable_fraction)
+    targets = [f for f in sorted(stations) if not any(abs(f - c) <= span for c in windows)]
+
+    logger.info(
+        f"Incremental scan: {len(windows)} of {len(plan)} windows stale, "
+        f"{len(targets)} known stations to verify"
+    )
+    return windows, targets
+
+
+def merge_stations(detections, min_spacing=CHANNEL_STEP):
+    """Merge detections from overlapping windows.
+
+    Detections are taken strongest first, and one within `min_spacing` of a
+    station already kept is a duplicate of it. Duplicates do not chain: two
+    stations 200 kHz apart stay separate even when a third detection sits
+    between them.
+
+    Args:
+        detections (dict): Station frequency in Hz -> detected power
+        min_spacing (float): Largest distance in Hz between duplicates
+
+    Returns:
+        list: Sorted station frequencies in Hz
+    """
+    stations = []
+    for freq in sorted(sorted(detections), key=detections.get, reverse=True):
+        if all(abs(freq - kept) > min_spacing + 1 for kept in stations):
+            stations.append(freq)
+    return sorted(stations)
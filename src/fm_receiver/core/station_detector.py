@@ -0,0 +1,414 @@
+"""
+Station Detector
+
+Vectorized FM station detection on power spectral density frames. The
+functions here hold the numeric core of the scanner's Python block
+(`flowgraphs/scan_detector.py`) and are free of GNU Radio imports so
+they can be reused and benchmarked outside a running flowgraph.
+
+A capture of N float PSD values is viewed as a (frames x fft_size) matrix.
+Per-bin power is reduced over the frame axis once, and the per-station power
+is obtained by multiplying a precomputed (candidates x fft_size) bin mask
+with that vector. `PowerAccumulator` performs the same reduction on a
+stream, one `work()` call at a time, so the capture never has to be held in
+memory. The grid and mask of a window depend only on (freq, samp_rate,
+fft_size); `window_setup` keeps the recently used ones in an LRU cache.
+
+Two decision rules are available on the per-station power:
+
+- "minmax": min-max normalization and a fixed fraction of the strongest
+  candidate (the original rule). One very strong station raises the bar for
+  every other one in the window.
+- "cfar": an ordered-statistic estimate of the window's noise floor, and a
+  threshold in standard deviations of a noise-only candidate's averaged
+  statistic above it, independent of the strongest station. The spread of
+  the average shrinks with the square root of the frames averaged, so a
+  longer dwell finds weaker stations at the same false-alarm rate. Every
+  local maximum above the threshold is a station, so a weak station on the
+  skirt of a strong one is not merged into it.
+"""
+
+import functools
+import math
+
+import numpy as np
+
+# Station spacing and occupied bandwidth used to build the candidate grid
+CHANNEL_STEP = 100e3
+FM_BANDWIDTH = 200e3
+
+# Fraction of the sample rate treated as flat passband (the rest is
+# anti-aliasing roll-off near the band edges of typical SDR front ends)
+USABLE_FRACTION = 0.8
+
+# Detection rules and their default thresholds (fraction of peak / standard
+# deviations of the averaged noise above the floor)
+MINMAX = "minmax"
+CFAR = "cfar"
+DEFAULT_THRESHOLDS = {MINMAX: 0.3, CFAR: 5.0}
+
+# Relative standard deviation of one bin of one frame of the statistic on
+# noise. A squared exponential variable has sqrt(5); adjacent bins of the
+# Blackman-Harris FFT are correlated, which raises it to the 3.5 measured on
+# noise windows of the synthetic band (scripts/bench_detection_rate.py).
+STATISTIC_CV = 3.5
+
+# Quantile of the candidates' power taken as the noise floor. Below the
+# median so the estimate holds when up to ~3/4 of a window is occupied.
+CFAR_QUANTILE = 0.25
+
+
+def round_to_3_sigfigs(x):
+    """Round to 3 significant figures"""
+    if x == 0:
+        return 0
+    return round(x, -int(math.floor(math.log10(abs(x))) - 2))
+
+
+def normalize(x):
+    """Normalize array to 0-1 range"""
+    x_min, x_max = x.min(), x.max()
+    if x_max == x_min:
+        return np.zeros_like(x)
+    return (x - x_min) / (x_max - x_min)
+
+
+def half_station_size(samp_rate, fft_size, fm_bandwidth=FM_BANDWIDTH):
+    """Return half the number of FFT bins covered by one FM station"""
+    bin_bandwidth = samp_rate / fft_size
+    station_size = math.ceil(fm_bandwidth / bin_bandwidth)
+    return station_size / 2 if station_size % 2 == 0 else (station_size + 1) / 2
+
+
+def candidate_span(samp_rate, usable_fraction=USABLE_FRACTION, fm_bandwidth=FM_BANDWIDTH):
+    """Return the half-width in Hz around the centre where a whole station fits.
+
+    A candidate is only trusted when its full FM bandwidth lies inside the
+    usable passband of the capture.
+    """
+    return samp_rate * usable_fraction / 2 - fm_bandwidth / 2
+
+
+def candidate_grid(freq, samp_rate, fft_size, step_size=CHANNEL_STEP, span=None):
+    """Compute candidate station frequencies and their centre FFT bins.
+
+    Args:
+        freq (float): Centre frequency of the capture in Hz
+        samp_rate (float): Sample rate in Hz
+        fft_size (int): Number of FFT bins
+        step_size (float): Spacing of the candidate grid in Hz
+        span (float): Keep the channel-raster candidates within +/- span of
+            freq (see candidate_span). When None, the whole capture minus its
+            outermost grid points is used.
+
+    Returns:
+        tuple: (candidate_freqs, candidate_bins) as NumPy arrays
+    """
+    if span is None:
+        start_freq = round_to_3_sigfigs(freq - samp_rate / 2)
+        end_freq = round_to_3_sigfigs(freq + samp_rate / 2)
+        candidate_freqs = np.arange(start_freq, end_freq, step_size)[1:-1]
+    else:
+        first = math.ceil((freq - span) / step_size - 1e-9)
+        last = math.floor((freq + span) / step_size + 1e-9)
+        candidate_freqs = np.arange(first, last + 1) * step_size
+
+    candidate_bins = np.round(
+        ((candidate_freqs - freq) * fft_size / samp_rate) + fft_size / 2, 1
+    ).astype(int)
+    return candidate_freqs, candidate_bins
+
+
+def station_mask(candidate_bins, half_size, fft_size):
+    """Build the (candidates x fft_size) matrix selecting each station's bins.
+
+    Row j is 1.0 on the bins `[bin_j - half_size, bin_j + half_size)` clipped
+    to the FFT range, and 0.0 elsewhere.
+    """
+    start = np.maximum(0, (candidate_bins - half_size).astype(int))
+    end = np.minimum(fft_size, (candidate_bins + half_size).astype(int))
+    bins = np.arange(fft_size)
+    return ((bins >= start[:, None]) & (bins < end[:, None])).astype(np.float64)
+
+
+@functools.lru_cache(maxsize=32)
+def window_setup(freq, samp_rate, fft_size, usable_fraction=USABLE_FRACTION):
+    """Return the cached candidate grid and station mask of one scan window.
+
+    The cache holds two full-band scan plans (coarse and refine passes), so
+    rescanning a known band skips the grid and mask construction entirely.
+    The returned arrays are shared between callers and marked read-only.
+
+    Args:
+        freq (float): Centre frequency of the capture in Hz, rounded to 1 Hz
+            by the caller so equal windows share one cache entry
+        samp_rate (float): Sample rate in Hz
+        fft_size (int): Number of FFT bins
+        usable_fraction (float): Fraction of samp_rate with a flat passband
+
+    Returns:
+        tuple: (candidate_freqs, candidate_bins, station_mask)
+    """
+    span = candidate_span(samp_rate, usable_fraction)
+    candidate_freqs, candidate_bins = candidate_grid(freq, samp_rate, fft_size, span=span)
+    mask = station_mask(candidate_bins, half_station_size(samp_rate, fft_size), fft_size)
+    for array in (candidate_freqs, candidate_bins, mask):
+        array.setflags(write=False)
+    return candidate_freqs, candidate_bins, mask
+
+
+def blackman_harris(size):
+    """4-term Blackman-Harris window, as gnuradio.fft.window.blackmanharris.
+
+    The scanner's FFT blocks use this window; offline detection has to use
+    it too, or its leakage and noise bandwidth differ from the live scan.
+    """
+    n = np.arange(size) * 2 * np.pi / (size - 1)
+    return 0.35875 - 0.48829 * np.cos(n) + 0.14128 * np.cos(2 * n) - 0.01168 * np.cos(3 * n)
+
+
+def psd_frames(iq, fft_size):
+    """Magnitude-squared spectra of the whole frames of IQ, flattened.
+
+    This is what the scanner's fft_vcc (Blackman-Harris, shifted) and
+    complex_to_mag_squared deliver, ready for PowerAccumulator.add().
+    """
+    frames = len(iq) // fft_size
+    window = blackman_harris(fft_size).astype(np.float32)
+    spectra = np.fft.fftshift(np.fft.fft(iq[:frames * fft_size].reshape(frames, fft_size) * window, axis=1), axes=1)
+    return np.square(np.abs(spectra)).astype(np.float32).ravel()
+
+
+def frame_power(samples, fft_size):
+    """Sum the squared PSD values of every complete frame, per FFT bin.
+
+    Trailing samples that do not fill a whole frame are ignored.
+
+    Returns:
+        tuple: (bin_power, frames) where bin_power has length fft_size
+    """
+    frames = len(samples) // fft_size
+    matrix = np.reshape(samples[:frames * fft_size], (frames, fft_size))
+    return np.square(matrix).sum(axis=0, dtype=np.float64), frames
+
+
+class PowerAccumulator:
+    """Constant-memory running per-bin power sum over a stream of PSD values.
+
+    Incoming samples are folded into a fixed `fft_size` sum of squares as
+    they arrive. Samples that do not complete a frame are carried over to
+    the next call, so arbitrary `work()` chunk sizes give the same result as
+    a single `frame_power()` pass over the concatenated stream.
+
+    Attributes:
+        fft_size (int): Number of bins per frame
+        bin_power (np.ndarray): Sum of squared values per bin
+        frames (int): Number of complete frames folded into bin_power
+    """
+
+    def __init__(self, fft_size):
+        self.fft_size = fft_size
+        self.bin_power = np.zeros(fft_size)
+        self.frames = 0
+        self._partial = np.zeros(fft_size, dtype=np.float32)
+        self._partial_len = 0
+
+    @property
+    def items(self):
+        """Number of samples received since the last reset"""
+        return self.frames * self.fft_size + self._partial_len
+
+    def add(self, samples):
+        """Fold a chunk of PSD samples into the running sum"""
+        if self._partial_len:
+            take = min(self.fft_size - self._partial_len, len(samples))
+            self._partial[self._partial_len:self._partial_len + take] = samples[:take]
+            self._partial_len += take
+            samples = samples[take:]
+            if self._partial_len < self.fft_size:
+                return
+            self.bin_power += np.square(self._partial)
+            self.frames += 1
+            self._partial_len = 0
+
+        power, frames = frame_power(samples, self.fft_size)
+        self.bin_power += power
+        self.frames += frames
+
+        remainder = len(samples) - frames * self.fft_size
+        if remainder:
+            self._partial[:remainder] = samples[frames * self.fft_size:]
+            self._partial_len = remainder
+
+    def add_integrated(self, batches, frames_per_batch):
+        """Fold vectors that were already squared and summed in the flowgraph.
+
+        Args:
+            batches (np.ndarray): (n x fft_size) per-bin sums of squared PSD
+            frames_per_batch (int): Number of frames summed into each vector
+        """
+        self.bin_power += batches.sum(axis=0, dtype=np.float64)
+        self.frames += len(batches) * frames_per_batch
+
+    def reset(self):
+        """Clear the running sum and any carried-over partial frame"""
+        self.bin_power.fill(0)
+        self.frames = 0
+        self._partial_len = 0
+
+
+def group_active(active_indices):
+    """Split sorted candidate indices into runs of adjacent indices"""
+    if active_indices.size == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(active_indices) != 1) + 1
+    return np.split(active_indices, breaks)
+
+
+def local_maxima(values):
+    """Boolean mask of the candidates not exceeded by either neighbour.
+
+    On a plateau only the first candidate is kept.
+    """
+    padded = np.concatenate(([-np.inf], values, [-np.inf]))
+    return (padded[1:-1] > padded[:-2]) & (padded[1:-1] >= padded[2:])
+
+
+def noise_floor(values, quantile=CFAR_QUANTILE):
+    """Ordered-statistic estimate of the noise floor of a window"""
+    return float(np.quantile(values, quantile))
+
+
+def noise_cv(frames, bins):
+    """Relative standard deviation of a noise-only statistic summed over frames x bins"""
+    return STATISTIC_CV / np.sqrt(np.maximum(np.multiply(frames, bins), 1))
+
+
+def detection_score(power_per_station, method=MINMAX, frames=None, bins=None):
+    """Score every candidate on the scale its method's threshold applies to.
+
+    Args:
+        power_per_station (np.ndarray): Accumulated statistic of each candidate
+        method (str): MINMAX or CFAR
+        frames (int): FFT frames averaged into the statistic (CFAR only)
+        bins (np.ndarray): FFT bins summed into each candidate, the row sums
+            of the station mask (CFAR only)
+
+    Returns:
+        np.ndarray: 0-1 normalized power ("minmax") or standard deviations of
+        the averaged noise above the window's noise floor ("cfar")
+    """
+    if method == CFAR:
+        if frames is None or bins is None:
+            raise ValueError("CFAR detection needs the number of frames and bins averaged")
+        floor = noise_floor(power_per_station)
+        if floor <= 0:
+            return np.zeros(len(power_per_station))
+        return (power_per_station / floor - 1) / noise_cv(frames, bins)
+    if method != MINMAX:
+        raise ValueError(f"Unknown detection method: {method}")
+    return normalize(power_per_station)
+
+
+def detection_state(power_per_station, threshold, method=MINMAX, frames=None, bins=None):
+    """Return the threshold decisions and per-group picks for a power vector.
+
+    Two accumulation steps that give equal states would report the same
+    stations, which is what the scanner's early-termination mode checks.
+
+    Returns:
+        tuple: (active_indices, picked_indices) as tuples of ints
+    """
+    score = detection_score(power_per_station, method, frames, bins)
+    active_indices = np.flatnonzero(score > threshold)
+    if method == CFAR:
+        picked = tuple(int(idx) for idx in active_indices[local_maxima(score)[active_indices]])
+    else:
+        picked = tuple(
+            int(group[np.argmax(score[group])])
+            for group in group_active(active_indices)
+        )
+    return tuple(active_indices.tolist()), picked
+
+
+def detect_stations(power_per_station, candidate_freqs, threshold, method=MINMAX,
+                    frames=None, bins=None):
+    """Pick one station per group of adjacent candidates above threshold.
+
+    Args:
+        power_per_station (np.ndarray): Accumulated power of each candidate
+        candidate_freqs (np.ndarray): Frequency of each candidate in Hz
+        threshold (float): Fraction of the normalized power ("minmax") or
+            standard deviations of the averaged noise above the floor ("cfar")
+        method (str): MINMAX or CFAR
+        frames (int): FFT frames averaged into the statistic (CFAR only)
+        bins (np.ndarray): FFT bins summed into each candidate (CFAR only)
+
+    Returns:
+        list: Detected station frequencies in Hz
+    """
+    _, picked = detection_state(power_per_station, threshold, method, frames, bins)
+    return [float(candidate_freqs[idx]) for idx in picked]
+
+
+def window_detections(power_per_station, candidate_freqs, threshold, method=MINMAX,
+                      frames=None, bins=None):
+    """Return the stations of one window with their accumulated power.
+
+    Returns:
+        dict: Station frequency in Hz -> power of the picked candidate
+    """
+    _, picked = detection_state(power_per_station, threshold, method, frames, bins)
+    return {float(candidate_freqs[idx]): float(power_per_station[idx]) for idx in picked}
+
+
+def refine_stations(bin_power, freq, samp_rate, targets, threshold, frames,
+                    search=CHANNEL_STEP, usable_fraction=USABLE_FRACTION,
+                    fm_bandwidth=FM_BANDWIDTH):
+    """Confirm candidate stations on a high-resolution spectrum and refine them.
+
+    A station-wide boxcar is slid over the spectrum; within `search` Hz of
+    each target its peak gives the refined centre, snapped to the channel
+    raster. The target is confirmed by the "cfar" rule of the coarse pass:
+    the peak must stand `threshold` standard deviations of the averaged
+    noise above the noise floor of the usable passband. The boxcar averages
+    frames x bins values like a coarse candidate, and both scale with the
+    dwell times the station bandwidth, so a station scores about the same
+    in both passes at equal dwells, whatever the FFT sizes.
+
+    Args:
+        bin_power (np.ndarray): Accumulated statistic per FFT bin (fftshifted)
+        freq (float): Centre frequency of the capture in Hz
+        samp_rate (float): Sample rate in Hz
+        targets (list): Candidate station frequencies in Hz
+        threshold (float): Standard deviations of the averaged noise above the floor
+        frames (int): FFT frames averaged into bin_power
+
+    Returns:
+        dict: Confirmed station frequency in Hz -> peak statistic
+    """
+    fft_size = len(bin_power)
+    bin_width = samp_rate / fft_size
+    bin_freqs = freq + (np.arange(fft_size) - fft_size / 2) * bin_width
+
+    width = max(1, int(round(fm_bandwidth / bin_width)))
+    station_power = np.convolve(bin_power, np.ones(width) / width, mode="same")
+
+    # Floor over station-wide averages, as the coarse pass takes it over candidates
+    usable = np.abs(bin_freqs - freq) <= samp_rate * usable_fraction / 2
+    floor = noise_floor(station_power[usable])
+    if floor <= 0:
+        return {}
+    score = (station_power / floor - 1) / noise_cv(frames, width)
+
+    confirmed = {}
+    for target in targets:
+        region = np.flatnonzero(usable & (np.abs(bin_freqs - target) <= search))
+        if region.size == 0:
+            continue
+        peak = region[np.argmax(station_power[region])]
+        if score[peak] <= threshold:
+            continue
+        centre = float(round(bin_freqs[peak] / CHANNEL_STEP) * CHANNEL_STEP)
+        confirmed[centre] = max(float(station_power[peak]), confirmed.get(centre, 0.0))
+    return confirmed
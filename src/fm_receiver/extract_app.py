@@ -0,0 +1,153 @@
+"""
+Offline Station Extraction Application
+"""
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from core.demod import demodulate_file
+from core.iq_file import IQFile
+from core.station_detector import (CFAR, DEFAULT_THRESHOLDS, PowerAccumulator,
+                                   detect_stations, psd_frames, window_setup)
+
+logger = logging.getLogger(__name__)
+
+# FFT frames averaged per sampled stretch of the recording, and stretches sampled
+DETECT_FFT_SIZE = 2**7
+DETECT_FRAMES = 2**9
+DETECT_STRETCHES = 64
+
+
+def find_stations(iq_file, method=CFAR, threshold=None, fft_size=DETECT_FFT_SIZE):
+    """Detect the stations of a recording with the scanner's detection rule.
+
+    The averaged spectrum is taken from stretches spread over the whole file,
+    so stations that are only on the air for part of it are still found.
+
+    Args:
+        iq_file (IQFile): Recording with a known sample rate and centre frequency
+        method (str): Detection rule, see core.station_detector
+        threshold (float): Detection threshold, the method's default if None
+
+    Returns:
+        list: Sorted station frequencies in Hz
+    """
+    if threshold is None:
+        threshold = DEFAULT_THRESHOLDS[method]
+
+    stretch = fft_size * DETECT_FRAMES
+    count = min(DETECT_STRETCHES, max(1, len(iq_file) // stretch))
+    accumulator = PowerAccumulator(fft_size)
+    for start in np.linspace(0, max(0, len(iq_file) - stretch), count).astype(np.int64):
+        accumulator.add(psd_frames(iq_file.read(int(start), stretch), fft_size))
+
+    candidate_freqs, _, mask = window_setup(float(round(iq_file.centre_freq)), iq_file.samp_rate, fft_size)
+    return detect_stations(mask @ accumulator.bin_power, candidate_freqs, threshold, method,
+                           accumulator.frames, mask.sum(axis=1))
+
+
+def extract_station(path, fmt, samp_rate, centre_freq, station, fname, audio_format, engine="gnuradio"):
+    """Demodulate one station of a recording into an audio file.
+
+    Runs in a worker process: it opens its own memory map of the recording
+    (the pages are shared through the OS page cache) and a top block made of
+    the replay source and a MultipleRecorder, run unthrottled to the end of
+    the file. With engine="numpy" the same chain runs on core.demod instead,
+    without GNU Radio (WAV only).
+
+    Returns:
+        tuple: (station, fname, seconds of recording, wall-clock seconds)
+    """
+    start = time.perf_counter()
+    # The recorder shifts by freq_offset + 250 kHz, the receiver's tuning offset
+    freq_offset = station - centre_freq - 250e3
+
+    if engine == "numpy":
+        iq_file = IQFile(path, fmt, samp_rate, centre_freq)
+        demodulate_file(iq_file, fname, freq_offset)
+        return station, fname, len(iq_file) / samp_rate, time.perf_counter() - start
+
+    from gnuradio import gr
+
+    from flowgraphs.MultipleRecorder import MultipleRecorder
+    from flowgraphs.sources import file_source
+
+    tb = gr.top_block(f"Extract {station / 1e6:.1f} MHz")
+    source = file_source(path, samp_rate, centre_freq, fmt=fmt, file_rate=samp_rate,
+                         file_freq=centre_freq, throttle=False, repeat=False)
+    recorder = MultipleRecorder(fname=fname, freq=station, freq_offset=freq_offset,
+                                samp_rate=samp_rate, audio_format=audio_format)
+    tb.connect((source, 0), (recorder, 0))
+    tb.run()
+
+    seconds = len(source.replay.file) / samp_rate
+    return station, fname, seconds, time.perf_counter() - start
+
+
+def extract_all(path, outdir, stations=None, fmt=None, samp_rate=None, centre_freq=None,
+                audio_format="wav", workers=None, engine="gnuradio"):
+    """Extract the audio of every station of a recording in parallel.
+
+    Args:
+        path (str): Raw IQ file or SigMF recording
+        outdir (str): Directory for the audio files
+        stations (list): Station frequencies in Hz, detected from the file if None
+        fmt (str): Raw format, from the extension if None
+        samp_rate (float): Sample rate of a raw recording in Hz
+        centre_freq (float): Centre frequency of a raw recording in Hz
+        audio_format (str): "wav" or "flac"
+        workers (int): Worker processes, one per CPU if None
+        engine (str): "gnuradio" (MultipleRecorder) or "numpy" (core.demod, WAV only)
+
+    Returns:
+        list: Paths of the written audio files, sorted by station
+
+    Raises:
+        ValueError: The sample rate or centre frequency of the recording is unknown,
+            or FLAC was requested from the NumPy engine
+    """
+    if engine == "numpy" and audio_format != "wav":
+        raise ValueError("The NumPy engine writes WAV files only")
+    iq_file = IQFile(path, fmt, samp_rate, centre_freq)
+    if not iq_file.samp_rate or iq_file.centre_freq is None:
+        raise ValueError(f"{path} needs a sample rate and a centre frequency (SigMF metadata or options)")
+
+    if stations is None:
+        stations = find_stations(iq_file)
+        logger.info(f"Found {len(stations)} stations in {path}")
+    # The recorder needs the whole 200 kHz channel inside the recording
+    edge = iq_file.samp_rate / 2 - 100e3
+    stations = [s for s in stations if abs(s - iq_file.centre_freq) < edge]
+    if not stations:
+        return []
+
+    os.makedirs(outdir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(iq_file.path))[0]
+    tasks = [
+        (iq_file.path, iq_file.fmt, iq_file.samp_rate, iq_file.centre_freq, station,
+         os.path.join(outdir, f"{name}_{int(station)}.{audio_format}"), audio_format, engine)
+        for station in stations
+    ]
+
+    start = time.perf_counter()
+    written = {}
+    with ProcessPoolExecutor(max_workers=workers or min(len(tasks), os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(extract_station, *task) for task in tasks]
+        for future in as_completed(futures):
+            station, fname, seconds, elapsed = future.result()
+            written[station] = fname
+            logger.info(
+                f"{station / 1e6:.1f} MHz -> {fname}: {seconds:.1f} s in {elapsed:.1f} s "
+                f"({seconds / elapsed:.1f}x real time)"
+            )
+
+    elapsed = time.perf_counter() - start
+    audio_seconds = len(iq_file) / iq_file.samp_rate * len(written)
+    logger.info(
+        f"Extracted {len(written)} stations in {elapsed:.1f} s, "
+        f"{audio_seconds / elapsed:.1f}x real time overall"
+    )
+    return [written[station] for station in sorted(written)]
@@ -17,6 +17,7 @@ from gnuradio import gr
 from gnuradio.fft import window
 import sys
 import signal
+from core.demod import AUDIO_RATE, audio_resampling
 
 
 
@@ -25,7 +26,7 @@ import signal
 
 
 class MultipleRecorder(gr.hier_block2):
-    def __init__(self, fname='0', freq=0, freq_offset=0):
+    def __init__(self, fname='0', freq=0, freq_offset=0, samp_rate=1920000, audio_format='wav', input_rate=0):
         gr.hier_block2.__init__(
             self, "Multiple Recorder Block",
                 gr.io_signature(1, 1, gr.sizeof_gr_complex*1),
@@ -38,53 +39,95 @@ class MultipleRecorder(gr.hier_block2):
         self.fname = fname
         self.freq = freq
         self.freq_offset = freq_offset
+        self.samp_rate = samp_rate
+        self.audio_format = audio_format
+        self.input_rate = input_rate    # Rate of a channelizer output, 0 for the capture itself
 
         ##################################################
         # Variables
         ##################################################
-        self.samp_rate = samp_rate = 1920000
+        # Multistage chain, each filter designed at the rate it runs at
+        # (1.92 Msps: 1920k -> 480k -> 240k demod -> 48k audio):
+        #   1. freq_xlating_fir_filter_ccc, /decimation to ~480 kHz: passes the
+        #      station (+/-100 kHz) and stops what would alias onto it later
+        #   2. fir_filter_ccf, /2 to the 240 kHz demodulation rate: fs/4
+        #      low-pass, passes +/-100 kHz, stops from 140 kHz. Its cutoff is
+        #      that of a half-band filter, but every tap is computed
+        #   3. quadrature_demod_cf at 240 kHz
+        #   4. fir_filter_fff, /5 to 48 kHz: mono audio to 15 kHz, pilot at
+        #      19 kHz and stereo subcarrier stopped
+        #   5. rational_resampler_fff to exactly 48 kHz, only for capture rates
+        #      that are not a multiple of 480 kHz (15/16 at 2.048 Msps)
+        # Real MACs per output sample at 1.92 Msps, counting every tap:
+        # 4*17*10 + 2*29*5 + 115 = 1085, against 2680 + 830 + 329 = 3839 for
+        # the former single-rate chain (67-tap /4 filter, 83-tap filter at
+        # 480 kHz, 329-tap 1:10 resampler).
         self.freq_offset_250 = freq_offset_250 = freq_offset+250e3
-        self.decimation = decimation = 4
+        self.in_rate = in_rate = input_rate or samp_rate
+        self.decimation = decimation = max(1, round(in_rate / 480e3))
+        self.channel_rate = channel_rate = in_rate / decimation
+        self.demod_rate = demod_rate = channel_rate / 2
+        self.audio_decimation = audio_decimation = 5
+        self.audio_rate = audio_rate = AUDIO_RATE
+        self.interpolation, self.resampling = interpolation, resampling = audio_resampling(in_rate)
 
         ##################################################
         # Blocks
         ##################################################
-        self.rational_resampler_xxx_0 = filter.rational_resampler_fff(
-                interpolation=1,
-                decimation=10,
-                taps=[],
-                fractional_bw=0)
         self.low_pass_filter_0 = filter.fir_filter_fff(
-            1,
+            audio_decimation,
             firdes.low_pass(
                 1,
-                samp_rate,
-                200e3,
-                56e3,
+                demod_rate,
+                17.5e3,
+                5e3,
                 window.WIN_HAMMING,
                 6.76))
-        self.freq_xlating_fir_filter_xxx_0 = filter.freq_xlating_fir_filter_ccc(decimation, firdes.low_pass(1, samp_rate, 130e3, 70e3), freq_offset_250, samp_rate)
+        self.rational_resampler_xxx_0 = None
+        if interpolation != resampling:
+            self.rational_resampler_xxx_0 = filter.rational_resampler_fff(
+                    interpolation=interpolation,
+                    decimation=resampling,
+                    taps=[],
+                    fractional_bw=0)
+        self.fir_filter_xxx_0 = filter.fir_filter_ccf(
+            2,
+            firdes.low_pass(1, channel_rate, channel_rate / 4, demod_rate - 200e3))
+        self.fir_filter_xxx_0.declare_sample_delay(0)
+        self.freq_xlating_fir_filter_xxx_0 = filter.freq_xlating_fir_filter_ccc(decimation, self.channel_taps(), freq_offset_250, in_rate)
         self.blocks_wavfile_sink_0 = blocks.wavfile_sink(
             fname,
             1,
-            48000,
-            blocks.FORMAT_WAV,
+            audio_rate,
+            blocks.FORMAT_FLAC if audio_format == 'flac' else blocks.FORMAT_WAV,
             blocks.FORMAT_PCM_16,
             False
             )
-        self.analog_quadrature_demod_cf_0 = analog.quadrature_demod_cf((samp_rate / decimation) / (2*math.pi*75000))
+        self.analog_quadrature_demod_cf_0 = analog.quadrature_demod_cf(demod_rate / (2*math.pi*75000))
 
 
         ##################################################
         # Connections
         ##################################################
         self.connect((self.analog_quadrature_demod_cf_0, 0), (self.low_pass_filter_0, 0))
-        self.connect((self.freq_xlating_fir_filter_xxx_0, 0), (self.analog_quadrature_demod_cf_0, 0))
-        self.connect((self.low_pass_filter_0, 0), (self.rational_resampler_xxx_0, 0))
+        self.connect((self.fir_filter_xxx_0, 0), (self.analog_quadrature_demod_cf_0, 0))
+        self.connect((self.freq_xlating_fir_filter_xxx_0, 0), (self.fir_filter_xxx_0, 0))
+        if self.rational_resampler_xxx_0 is None:
+            self.connect((self.low_pass_filter_0, 0), (self.blocks_wavfile_sink_0, 0))
+        else:
+            self.connect((self.low_pass_filter_0, 0), (self.rational_resampler_xxx_0, 0))
+            self.connect((self.rational_resampler_xxx_0, 0), (self.blocks_wavfile_sink_0, 0))
         self.connect((self, 0), (self.freq_xlating_fir_filter_xxx_0, 0))
-        self.connect((self.rational_resampler_xxx_0, 0), (self.blocks_wavfile_sink_0, 0))
 
 
+    def channel_taps(self):
+        # Passes +/-100 kHz and stops from channel_rate - 100 kHz, the first
+        # frequency that folds back onto the station after decimation. Without
+        # decimation (channelizer input) only the frequency shift is left.
+        if self.decimation == 1:
+            return [1.0]
+        return firdes.low_pass(1, self.in_rate, self.channel_rate / 2, self.channel_rate - 200e3)
+
     def get_fname(self):
         return self.fname
 
@@ -109,10 +152,20 @@ class MultipleRecorder(gr.hier_block2):
         return self.samp_rate
 
     def set_samp_rate(self, samp_rate):
+        # The filters follow the input rate. The resampling ratio is fixed
+        # when the block is built, so the audio only stays at 48 kHz for a
+        # rate with the same ratio; build a new recorder otherwise
         self.samp_rate = samp_rate
-        self.analog_quadrature_demod_cf_0.set_gain((self.samp_rate / self.decimation) / (2*math.pi*75000))
-        self.freq_xlating_fir_filter_xxx_0.set_taps(firdes.low_pass(1, self.samp_rate, 130e3, 70e3))
-        self.low_pass_filter_0.set_taps(firdes.low_pass(1, self.samp_rate, 200e3, 56e3, window.WIN_HAMMING, 6.76))
+        self.in_rate = self.input_rate or self.samp_rate
+        self.channel_rate = self.in_rate / self.decimation
+        self.demod_rate = self.channel_rate / 2
+        self.freq_xlating_fir_filter_xxx_0.set_taps(self.channel_taps())
+        self.fir_filter_xxx_0.set_taps(firdes.low_pass(1, self.channel_rate, self.channel_rate / 4, self.demod_rate - 200e3))
+        self.analog_quadrature_demod_cf_0.set_gain(self.demod_rate / (2*math.pi*75000))
+        self.low_pass_filter_0.set_taps(firdes.low_pass(1, self.demod_rate, 17.5e3, 5e3, window.WIN_HAMMING, 6.76))
+
+    def get_input_rate(self):
+        return self.input_rate
 
     def get_freq_offset_250(self):
         return self.freq_offset_250
@@ -124,7 +177,8 @@ class MultipleRecorder(gr.hier_block2):
     def get_decimation(self):
         return self.decimation
 
-    def set_decimation(self, decimation):
-        self.decimation = decimation
-        self.analog_quadrature_demod_cf_0.set_gain((self.samp_rate / self.decimation) / (2*math.pi*75000))
+    def get_demod_rate(self):
+        return self.demod_rate
 
+    def get_audio_rate(self):
+        return self.audio_rate
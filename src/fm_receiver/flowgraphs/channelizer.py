@@ -0,0 +1,77 @@
+"""
+PFB Channelizer Front End
+
+Splits the receiver's capture into fixed channels once, with a polyphase
+filter bank, so that recorders each filter one low-rate channel instead of
+the full-rate capture:
+
+    capture (samp_rate) -> pfb.channelizer_ccf -> numchans channels
+                           (spacing samp_rate / numchans,
+                            rate oversample * spacing)
+
+A station lies within half a spacing of its nearest channel centre. The
+prototype filter passes that residual offset plus the 100 kHz half-width
+of the station, and the oversampled channel rate keeps it clear of
+aliases. At 1.92 Msps this gives 8 channels 240 kHz apart at 480 kHz,
+MultipleRecorder's channel rate. A recorder then only shifts by the
+residual before its fs/4 low-pass stage (`MultipleRecorder` with
+`input_rate`).
+"""
+
+from gnuradio import gr
+from gnuradio.filter import firdes, pfb
+
+# Half the bandwidth of an FM broadcast station
+STATION_HALF_WIDTH = 100e3
+
+
+class channelizer_bank(gr.hier_block2):
+    """Polyphase channelizer with one output per channel, in FFT order"""
+
+    def __init__(self, samp_rate=1920000, numchans=8, oversample=2):
+        gr.hier_block2.__init__(
+            self, "Channelizer Bank",
+                gr.io_signature(1, 1, gr.sizeof_gr_complex*1),
+                gr.io_signature(numchans, numchans, gr.sizeof_gr_complex*1),
+        )
+
+        self.samp_rate = samp_rate
+        self.numchans = numchans
+        self.spacing = samp_rate / numchans
+        self.channel_rate = self.spacing * oversample
+
+        # Pass the worst residual plus the station, stop where the alias of the
+        # next station would fold back onto it
+        passband = self.spacing / 2 + STATION_HALF_WIDTH
+        stopband = self.channel_rate - passband
+        if stopband <= passband:
+            raise ValueError(
+                f"{numchans} channels at {oversample}x oversampling are too narrow for a station"
+            )
+        self.taps = firdes.low_pass(1, samp_rate, (passband + stopband) / 2, stopband - passband)
+
+        self.pfb_channelizer_ccf_0 = pfb.channelizer_ccf(numchans, self.taps, oversample, 100)
+
+        self.connect((self, 0), (self.pfb_channelizer_ccf_0, 0))
+        for i in range(numchans):
+            self.connect((self.pfb_channelizer_ccf_0, i), (self, i))
+
+    def get_channel_rate(self):
+        return self.channel_rate
+
+    def channel(self, offset):
+        """Channel holding a station and the station's offset from its centre.
+
+        Args:
+            offset (float): Station frequency minus the capture centre in Hz
+
+        Returns:
+            tuple: (output index, residual offset in Hz)
+
+        Raises:
+            ValueError: The station is not entirely inside the capture
+        """
+        if abs(offset) + STATION_HALF_WIDTH > self.samp_rate / 2:
+            raise ValueError(f"Offset {offset / 1e3:.0f} kHz is outside the capture")
+        k = round(offset / self.spacing)
+        return k % self.numchans, offset - k * self.spacing
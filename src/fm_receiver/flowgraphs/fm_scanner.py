@@ -8,63 +8,77 @@
 # Title: Not titled yet
 # Author: hamza
 # GNU Radio version: 3.10.1.1
+#
+# Maintained by hand since the streaming power sink replaced the vector
+# sink. fm_scanner.grc shows the same graph and is kept in step by hand,
+# see README.md.
 
 import signal
 import sys
 from argparse import ArgumentParser
 
-from gnuradio import blocks, eng_notation, fft, gr, soapy
+from gnuradio import blocks, eng_notation, gr, soapy
 from gnuradio.eng_arg import eng_float, intx
-from gnuradio.fft import window
 from gnuradio.filter import firdes
+from flowgraphs.power_sink import power_sink
+from flowgraphs.psd_integrator import psd_integrator
+from flowgraphs.sources import make_source
 
 
 class fm_scanner(gr.top_block):
 
-    def __init__(self):
+    def __init__(self, device_args='driver=rtlsdr', samp_rate=2.048*10**6):
         gr.top_block.__init__(self, "Not titled yet", catch_exceptions=True)
 
+        ##################################################
+        # Parameters
+        ##################################################
+        self.device_args = device_args
+
         ##################################################
         # Variables
         ##################################################
-        self.samp_rate = samp_rate = 2.048*10**6
+        self.samp_rate = samp_rate
         self.num_items = num_items = int(samp_rate*2)
         self.freq = freq = 87e6
         self.fft_size = fft_size = 2**7
+        self.scan_batch = scan_batch = 2**7
+        self.skip = skip = 0
 
         ##################################################
         # Blocks
         ##################################################
-        self.soapy_rtlsdr_source_0 = None
-        dev = 'driver=rtlsdr'
-        stream_args = ''
-        tune_args = ['']
-        settings = ['']
-
-        self.soapy_rtlsdr_source_0 = soapy.source(dev, "fc32", 1, 'True',
-                                  stream_args, tune_args, settings)
-        self.soapy_rtlsdr_source_0.set_sample_rate(0, samp_rate)
-        self.soapy_rtlsdr_source_0.set_gain_mode(0, False)
-        self.soapy_rtlsdr_source_0.set_frequency(0, freq)
-        self.soapy_rtlsdr_source_0.set_frequency_correction(0, 0)
-        self.soapy_rtlsdr_source_0.set_gain(0, 'TUNER', 20)
-        self.fft_vxx_0 = fft.fft_vcc(fft_size, True, window.blackmanharris(fft_size), True, 1)
-        self.blocks_vector_sink_x_0 = blocks.vector_sink_f(fft_size, num_items)
-        self.blocks_stream_to_vector_0 = blocks.stream_to_vector(gr.sizeof_gr_complex*1, fft_size)
+        # Recording or synthetic band in place of the dongle, unthrottled for batch scans
+        self.soapy_rtlsdr_source_0 = make_source(device_args, samp_rate, freq, throttle=False)
+        if self.soapy_rtlsdr_source_0 is None:
+            dev = device_args
+            stream_args = ''
+            tune_args = ['']
+            settings = ['']
+
+            self.soapy_rtlsdr_source_0 = soapy.source(dev, "fc32", 1, 'True',
+                                      stream_args, tune_args, settings)
+            self.soapy_rtlsdr_source_0.set_sample_rate(0, samp_rate)
+            self.soapy_rtlsdr_source_0.set_gain_mode(0, False)
+            self.soapy_rtlsdr_source_0.set_frequency(0, freq)
+            self.soapy_rtlsdr_source_0.set_frequency_correction(0, 0)
+            self.soapy_rtlsdr_source_0.set_gain(0, 'TUNER', 20)
+        self.psd_integrator_0 = psd_integrator(fft_size=fft_size, frames_per_batch=scan_batch)
+        self.epy_block_0 = power_sink(fft_size=fft_size, frames_per_batch=scan_batch, skip=skip)
         self.blocks_head_0 = blocks.head(gr.sizeof_gr_complex*1, num_items)
-        self.blocks_complex_to_mag_squared_0 = blocks.complex_to_mag_squared(fft_size)
 
 
         ##################################################
         # Connections
         ##################################################
-        self.connect((self.blocks_complex_to_mag_squared_0, 0), (self.blocks_vector_sink_x_0, 0))
-        self.connect((self.blocks_head_0, 0), (self.blocks_stream_to_vector_0, 0))
-        self.connect((self.blocks_stream_to_vector_0, 0), (self.fft_vxx_0, 0))
-        self.connect((self.fft_vxx_0, 0), (self.blocks_complex_to_mag_squared_0, 0))
+        self.connect((self.blocks_head_0, 0), (self.psd_integrator_0, 0))
+        self.connect((self.psd_integrator_0, 0), (self.epy_block_0, 0))
         self.connect((self.soapy_rtlsdr_source_0, 0), (self.blocks_head_0, 0))
 
 
+    def get_device_args(self):
+        return self.device_args
+
     def get_samp_rate(self):
         return self.samp_rate
 
@@ -93,6 +107,16 @@ class fm_scanner(gr.top_block):
     def set_fft_size(self, fft_size):
         self.fft_size = fft_size
 
+    def get_scan_batch(self):
+        return self.scan_batch
+
+    def get_skip(self):
+        return self.skip
+
+    def set_skip(self, skip):
+        self.skip = skip
+        self.epy_block_0.skip = self.skip
+
 
 
 
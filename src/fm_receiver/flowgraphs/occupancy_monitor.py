@@ -0,0 +1,130 @@
+"""
+Band Occupancy Monitor - GNU Radio Python Block
+
+Keeps a running picture of which FM channels are occupied inside the band
+currently captured by the receiver, while it is demodulating a station. It sits
+on a low-rate PSD tap of the source stream (a psd_integrator transforming one
+FFT frame in monitor_decim, squared and integrated natively), so it costs a
+small fraction of the audio chain and never retunes the SDR.
+
+Algorithm Overview:
+1. Every input vector is the per-bin sum of squared magnitude-squared FFT output
+   over frames_per_batch frames
+2. The vectors are folded into an exponential moving average (weight alpha), which
+   restarts whenever the source is retuned (set_freq) or resampled (set_samp_rate)
+3. On request, the averaged spectrum goes through the scanner's CFAR detection
+   (core.station_detector) on the cached candidate grid of the current window
+
+Parameters:
+    fft_size (int): Length of the input vectors (default: 128)
+    samp_rate (float): Sample rate of the source in Hz (default: 1.92e6)
+    freq (float): Frequency the source is tuned to in Hz (default: 88.45e6)
+    frames_per_batch (int): FFT frames summed into each input vector (default: 16)
+    alpha (float): Weight of a new vector in the moving average (default: 0.05)
+    threshold (float): CFAR threshold in standard deviations of the averaged noise
+        above the noise floor (default: 5.0)
+    settle (int): Vectors dropped after a retune (default: 2)
+
+Input:
+    - Single input stream of float32 vectors of length fft_size
+
+Output:
+    - No streaming output (out_sig=None)
+    - get_stations(): frequencies in Hz of the channels occupied in the current window,
+      empty until min_batches vectors were averaged since the last retune
+    - get_candidates(): frequencies in Hz of every channel get_stations() decides on,
+      empty until then, so that a caller can tell a channel that went quiet from one
+      that is not observed
+"""
+
+import threading
+
+import numpy as np
+from gnuradio import gr
+
+from core.station_detector import CFAR, detect_stations, window_setup
+
+
+class occupancy_monitor(gr.sync_block):
+    """Exponentially averaged PSD of the captured band, with CFAR channel occupancy"""
+
+    def __init__(self, fft_size=2**7, samp_rate=1.92e6, freq=88.45e6, frames_per_batch=2**4,
+                 alpha=0.05, threshold=5.0, settle=2):
+        gr.sync_block.__init__(
+            self,
+            name='Band Occupancy Monitor',
+            in_sig=[(np.float32, fft_size)],
+            out_sig=None
+        )
+        self.fft_size = fft_size
+        self.samp_rate = samp_rate
+        self.freq = freq
+        self.frames_per_batch = frames_per_batch
+        self.alpha = alpha
+        self.threshold = threshold
+        self.settle = settle
+
+        # Averages needed before the occupancy is reported
+        self.min_batches = int(np.ceil(1 / alpha))
+
+        self.average = np.zeros(fft_size)
+        self.batches = 0
+        self._discard = settle
+        self._lock = threading.Lock()
+
+    def work(self, input_items, output_items):
+        batches = input_items[0]
+
+        with self._lock:
+            if self._discard:
+                dropped = min(self._discard, len(batches))
+                batches = batches[dropped:]
+                self._discard -= dropped
+
+            for batch in batches:
+                if self.batches == 0:
+                    self.average[:] = batch
+                else:
+                    self.average += self.alpha * (batch - self.average)
+                self.batches += 1
+
+        return len(input_items[0])
+
+    def reset(self):
+        with self._lock:
+            self.batches = 0
+            self._discard = self.settle
+
+    def set_freq(self, freq):
+        self.freq = freq
+        self.reset()
+
+    def set_samp_rate(self, samp_rate):
+        self.samp_rate = samp_rate
+        self.reset()
+
+    def get_candidates(self):
+        with self._lock:
+            if self.batches < self.min_batches:
+                return []
+            freq = self.freq
+        candidate_freqs, _, _ = window_setup(float(round(freq)), self.samp_rate, self.fft_size)
+        return candidate_freqs.tolist()
+
+    def get_stations(self):
+        with self._lock:
+            if self.batches < self.min_batches:
+                return []
+            spectrum = self.average.copy()
+            freq = self.freq
+            # Frames behind the moving average: the variance of an EMA of
+            # independent vectors is alpha / (2 - alpha) times theirs
+            frames = self.frames_per_batch * min(self.batches, (2 - self.alpha) / self.alpha)
+
+        # The LO leaks into the centre bin, replace it with its neighbours
+        centre = self.fft_size // 2
+        spectrum[centre] = (spectrum[centre - 1] + spectrum[centre + 1]) / 2
+
+        candidate_freqs, _, mask = window_setup(float(round(freq)), self.samp_rate, self.fft_size)
+        return detect_stations(mask @ spectrum, candidate_freqs, self.threshold, CFAR,
+                               frames, mask.sum(axis=1))
@@ -0,0 +1,82 @@
+"""
+Streaming Power Sink - GNU Radio Python Block
+
+Replaces the vector sink of the fm_scanner flowgraph. Instead of keeping every
+PSD frame of a capture in a Python-visible list, it folds the vectors coming
+out of a psd_integrator (flowgraphs/psd_integrator.py) into a running per-bin sum (core.station_detector
+.PowerAccumulator) and exposes only the averaged spectrum.
+
+Parameters:
+    fft_size (int): Length of the input vectors (default: 128)
+
+    frames_per_batch (int): FFT frames summed into each input vector (default: 128)
+        - Must match the decimation of the integrate block feeding this block
+
+    skip (int): Input vectors dropped after each reset() (default: 0)
+        - Used as a settling guard after the source was retuned
+
+Input:
+    - Single input stream of float32 vectors of length fft_size, each the per-bin sum
+      of squared magnitude-squared FFT output over frames_per_batch frames
+
+Output:
+    - No streaming output (out_sig=None)
+    - mean_spectrum(): per-frame average of the accumulated statistic, returned as a
+      read-only view of a buffer preallocated in __init__ (no copy, no allocation)
+    - get_frames(): number of FFT frames folded in since the last reset()
+
+Memory usage: O(fft_size), independent of the capture length.
+"""
+
+import numpy as np
+from gnuradio import gr
+
+from core.station_detector import PowerAccumulator
+
+
+class power_sink(gr.sync_block):
+    """Accumulates integrated PSD vectors into a per-bin running sum"""
+
+    def __init__(self, fft_size=2**7, frames_per_batch=2**7, skip=0):
+        gr.sync_block.__init__(
+            self,
+            name='Streaming Power Sink',
+            in_sig=[(np.float32, fft_size)],
+            out_sig=None
+        )
+        self.fft_size = fft_size
+        self.frames_per_batch = frames_per_batch
+        self.skip = skip
+        self._skipped = 0
+
+        self.accumulator = PowerAccumulator(fft_size)
+
+        # Averaged spectrum, written in place and handed out read-only
+        self._mean = np.zeros(fft_size)
+        self._mean_view = self._mean.view()
+        self._mean_view.setflags(write=False)
+
+    def work(self, input_items, output_items):
+        batches = input_items[0]
+
+        # Vectors captured while the source was settling after a retune
+        if self._skipped < self.skip:
+            dropped = min(self.skip - self._skipped, len(batches))
+            batches = batches[dropped:]
+            self._skipped += dropped
+
+        if len(batches):
+            self.accumulator.add_integrated(batches, self.frames_per_batch)
+
+        return len(input_items[0])
+
+    def reset(self):
+        self.accumulator.reset()
+        self._skipped = 0
+
+    def get_frames(self):
+        return self.accumulator.frames
+
+    def mean_spectrum(self):
+        np.divide(self.accumulator.bin_power, max(self.accumulator.frames, 1), out=self._mean)
+        return self._mean_view
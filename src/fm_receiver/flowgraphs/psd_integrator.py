@@ -0,0 +1,59 @@
+"""
+PSD Integrator Front End
+
+The spectrum front end shared by the scanner's detectors and the band
+occupancy monitor in `rds_rx.py`, and by `fm_scanner.py`:
+
+    capture -> stream_to_vector -> [keep_one_in_n] -> fft_vcc (Blackman-Harris, shifted)
+            -> complex_to_mag_squared -> multiply_vff (square) -> integrate_ff
+
+Each output vector is the per-bin sum of the squared PSD over
+frames_per_batch FFT frames, which is the statistic of
+`core.station_detector` (`psd_frames` computes the same frames in NumPy).
+The Python blocks downstream only see one vector per batch. With
+decimation > 1 only one FFT frame in `decimation` is transformed, for taps
+that only need a low-rate picture of the band.
+"""
+
+from gnuradio import blocks, fft, gr
+from gnuradio.fft import window
+
+
+class psd_integrator(gr.hier_block2):
+    """Integrated squared PSD of a complex stream, one vector per batch of frames"""
+
+    def __init__(self, fft_size=2**7, frames_per_batch=2**10, decimation=1):
+        gr.hier_block2.__init__(
+            self, "PSD Integrator",
+                gr.io_signature(1, 1, gr.sizeof_gr_complex*1),
+                gr.io_signature(1, 1, gr.sizeof_float*fft_size),
+        )
+
+        self.fft_size = fft_size
+        self.frames_per_batch = frames_per_batch
+        self.decimation = decimation
+
+        self.blocks_stream_to_vector_0 = blocks.stream_to_vector(gr.sizeof_gr_complex*1, fft_size)
+        self.fft_vxx_0 = fft.fft_vcc(fft_size, True, window.blackmanharris(fft_size), True, 1)
+        self.blocks_complex_to_mag_squared_0 = blocks.complex_to_mag_squared(fft_size)
+        self.blocks_multiply_xx_0 = blocks.multiply_vff(fft_size)
+        self.blocks_integrate_xx_0 = blocks.integrate_ff(frames_per_batch, fft_size)
+
+        self.connect((self, 0), (self.blocks_stream_to_vector_0, 0))
+        if decimation > 1:
+            self.blocks_keep_one_in_n_0 = blocks.keep_one_in_n(gr.sizeof_gr_complex*fft_size, decimation)
+            self.connect((self.blocks_stream_to_vector_0, 0), (self.blocks_keep_one_in_n_0, 0))
+            self.connect((self.blocks_keep_one_in_n_0, 0), (self.fft_vxx_0, 0))
+        else:
+            self.connect((self.blocks_stream_to_vector_0, 0), (self.fft_vxx_0, 0))
+        self.connect((self.fft_vxx_0, 0), (self.blocks_complex_to_mag_squared_0, 0))
+        self.connect((self.blocks_complex_to_mag_squared_0, 0), (self.blocks_multiply_xx_0, 0))
+        self.connect((self.blocks_complex_to_mag_squared_0, 0), (self.blocks_multiply_xx_0, 1))
+        self.connect((self.blocks_multiply_xx_0, 0), (self.blocks_integrate_xx_0, 0))
+        self.connect((self.blocks_integrate_xx_0, 0), (self, 0))
+
+    def get_fft_size(self):
+        return self.fft_size
+
+    def get_frames_per_batch(self):
+        return self.frames_per_batch
@@ -7,6 +7,11 @@
 # GNU Radio Python Flow Graph
 # Title: Stereo FM receiver and RDS Decoder
 # GNU Radio version: 3.10.1.1
+#
+# Maintained by hand since the scanner rewrite. The receive chain is
+# rds_rx_headless; this file adds the scanner, the occupancy monitor, the
+# recorder channelizer and the Qt window on top of it. rds_rx.grc shows the
+# same graph and is kept in step by hand, see README.md.
 
 from packaging.version import Version as StrictVersion
 
@@ -22,36 +27,35 @@ if __name__ == '__main__':
 
 from PyQt5 import Qt
 from gnuradio import qtgui
-from gnuradio.filter import firdes
 import sip
-from gnuradio import analog
-import math
-from gnuradio import audio
 from gnuradio import blocks
-from gnuradio import digital
-from gnuradio import filter
-from gnuradio import fft
 from gnuradio.fft import window
 from gnuradio import gr
 import sys
 import signal
+import threading
 from argparse import ArgumentParser
 from gnuradio.eng_arg import eng_float, intx
 from gnuradio import eng_notation
-from gnuradio import soapy
 from gnuradio.qtgui import Range, RangeWidget
 from PyQt5 import QtCore
 import rds
-import rds_rx_epy_block_0 as epy_block_0  # embedded python block
+from flowgraphs.channelizer import channelizer_bank
+from flowgraphs.occupancy_monitor import occupancy_monitor
+from flowgraphs.psd_integrator import psd_integrator
+from flowgraphs.rds_rx_headless import rds_rx_headless
+from flowgraphs.scan_detector import scan_detector
 
 
 
 from gnuradio import qtgui
 
-class rds_rx(gr.top_block, Qt.QWidget):
+class rds_rx(rds_rx_headless, Qt.QWidget):
+    """rds_rx_headless with the scanner, the occupancy monitor, the recorder
+    channelizer and the Qt window: range widgets, rdsPanels and qtgui sinks"""
 
     def __init__(self, device_arguments='0'):
-        gr.top_block.__init__(self, "Stereo FM receiver and RDS Decoder", catch_exceptions=True)
+        rds_rx_headless.__init__(self, device_arguments=device_arguments, audio_device='', fname='Output.wav')
         Qt.QWidget.__init__(self)
         self.setWindowTitle("Stereo FM receiver and RDS Decoder")
         qtgui.util.check_set_qss()
@@ -81,33 +85,37 @@ class rds_rx(gr.top_block, Qt.QWidget):
         except:
             pass
 
-        ##################################################
-        # Parameters
-        ##################################################
-        self.device_arguments = device_arguments
-
         ##################################################
         # Variables
         ##################################################
-        self.samp_rate = samp_rate = 1920000
-        self.rrc_taps = rrc_taps = firdes.root_raised_cosine(1.0, 19000,19000/8, 1.0, 151)
-        self.freq_offset = freq_offset = 250e3
-        self.freq = freq = 88.7
-        self.volume = volume = -5
+        samp_rate = self.samp_rate
+        freq = self.freq
+        freq_tune = self.freq_tune
+        decimation = self.decimation
         self.tau_1 = tau_1 = 75e-6
-        self.tau = tau = 75e-6
-        self.rrc_taps_manchester = rrc_taps_manchester = [rrc_taps[n] - rrc_taps[n+8] for n in range(len(rrc_taps)-8)]
-        self.pilot_taps = pilot_taps = firdes.complex_band_pass(1.0, 240000, 18980, 19020, 1000, window.WIN_HAMMING, 6.76)
-        self.num_items = num_items = samp_rate*2
-        self.mute = mute = 1
-        self.mode = mode = 1
-        self.gain = gain = 40
-        self.freq_tune = freq_tune = freq*1e6-freq_offset
-        self.fir_transition_width = fir_transition_width = 20e3
-        self.fir_cutoff = fir_cutoff = 135e3
         self.fft_size = fft_size = 2**7
+        self.scan_batch = scan_batch = 2**10
+        self.scan_stable_batches = scan_stable_batches = 3
+        self.scan_min_dwell = scan_min_dwell = 0.2
+        self.scan_max_dwell = scan_max_dwell = 2.0
+        self.scan_adaptive = scan_adaptive = 1
+        self.scan_pipelined = scan_pipelined = 1
+        self.scan_settle_time = scan_settle_time = 0.02
+        self.scan_method = scan_method = 'cfar'
+        self.scan_threshold = scan_threshold = 5.0
+        self.fine_fft_size = fine_fft_size = 2**10
+        self.scan_fine_batch = scan_fine_batch = 2**7
+        self.scan_fine_dwell = scan_fine_dwell = 0.5
+        self.scan_pass = scan_pass = 0
+        self.monitor_enabled = monitor_enabled = 0
+        self.monitor_decim = monitor_decim = 2**6
+        self.monitor_batch = monitor_batch = 2**4
         self.done = done = 0
-        self.decimation = decimation = 6
+        self.done_event = threading.Event()
+        self.channelizer_enabled = channelizer_enabled = 0
+        self.channelizer_chans = channelizer_chans = 8
+        self.channelizer_oversample = channelizer_oversample = 2
+        self.num_items = num_items = samp_rate*2
 
         ##################################################
         # Blocks
@@ -132,25 +140,6 @@ class rds_rx(gr.top_block, Qt.QWidget):
         self._fir_cutoff_range = Range(20e3, 200e3, 1e3, 135e3, 200)
         self._fir_cutoff_win = RangeWidget(self._fir_cutoff_range, self.set_fir_cutoff, "Cutoff Frequency", "counter_slider", float, QtCore.Qt.Horizontal)
         self.top_layout.addWidget(self._fir_cutoff_win)
-        self.soapy_custom_source_0 = None
-        dev = 'driver=' + ''
-        stream_args = ''
-        tune_args = ['']
-        settings = ['']
-        self.soapy_custom_source_0 = soapy.source(dev, "fc32",
-                                  1, device_arguments,
-                                  stream_args, tune_args, settings)
-        self.soapy_custom_source_0.set_sample_rate(0, samp_rate)
-        self.soapy_custom_source_0.set_bandwidth(0, 0)
-        self.soapy_custom_source_0.set_antenna(0, 'RX')
-        self.soapy_custom_source_0.set_frequency(0, freq_tune)
-        self.soapy_custom_source_0.set_frequency_correction(0, 0)
-        self.soapy_custom_source_0.set_gain_mode(0, False)
-        self.soapy_custom_source_0.set_gain(0, 10)
-        self.soapy_custom_source_0.set_dc_offset_mode(0, False)
-        self.soapy_custom_source_0.set_dc_offset(0, 0)
-        self.soapy_custom_source_0.set_iq_balance(0, 0)
-        self.rds_parser_0 = rds.parser(False, False, 0)
         self.rds_panel_0_0 = rds.rdsPanel(freq)
         self._rds_panel_0_0_win = self.rds_panel_0_0
         self.top_layout.addWidget(self._rds_panel_0_0_win)
@@ -161,17 +150,6 @@ class rds_rx(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(0, 1):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.rds_decoder_0 = rds.decoder(False, False)
-        self.rational_resampler_xxx_1 = filter.rational_resampler_ccc(
-                interpolation=19000,
-                decimation=samp_rate // decimation // 10,
-                taps=[],
-                fractional_bw=0)
-        self.rational_resampler_xxx_0 = filter.rational_resampler_fff(
-                interpolation=240000,
-                decimation=samp_rate // decimation,
-                taps=[],
-                fractional_bw=0)
         self.qtgui_waterfall_sink_x_0 = qtgui.waterfall_sink_f(
             1024, #size
             window.WIN_BLACKMAN_hARRIS, #wintype
@@ -445,120 +423,79 @@ class rds_rx(gr.top_block, Qt.QWidget):
             self.top_grid_layout.setRowStretch(r, 1)
         for c in range(0, 1):
             self.top_grid_layout.setColumnStretch(c, 1)
-        self.freq_xlating_fir_filter_xxx_1_0 = filter.freq_xlating_fir_filter_fcc(10, firdes.low_pass(1.0, samp_rate / decimation, 7.5e3, 5e3), 57e3, samp_rate / decimation)
-        self.freq_xlating_fir_filter_xxx_0 = filter.freq_xlating_fir_filter_ccc(decimation, firdes.low_pass(1, samp_rate, fir_cutoff, fir_transition_width), freq_offset, samp_rate)
-        self.fir_filter_xxx_2 = filter.fir_filter_ccc(1, rrc_taps_manchester)
-        self.fir_filter_xxx_2.declare_sample_delay(0)
-        self.fir_filter_xxx_1_0 = filter.fir_filter_fff(5, firdes.low_pass(-2.1,240000,15e3,2e3))
-        self.fir_filter_xxx_1_0.declare_sample_delay(0)
-        self.fir_filter_xxx_1 = filter.fir_filter_fff(5, firdes.low_pass(1.0,240000,15e3,2e3))
-        self.fir_filter_xxx_1.declare_sample_delay(0)
-        self.fir_filter_xxx_0 = filter.fir_filter_fcc(1, pilot_taps)
-        self.fir_filter_xxx_0.declare_sample_delay(0)
-        self.fft_vxx_0 = fft.fft_vcc(fft_size, True, window.blackmanharris(fft_size), True, 1)
-        self.epy_block_0 = epy_block_0.blk(fft_size=fft_size, samp_rate=samp_rate, freq=freq*10**6, done=done)
-        self.digital_symbol_sync_xx_0 = digital.symbol_sync_cc(
-            digital.TED_ZERO_CROSSING,
-            16,
-            0.01,
-            1.0,
-            1.0,
-            0.1,
-            1,
-            digital.constellation_bpsk().base(),
-            digital.IR_MMSE_8TAP,
-            128,
-            [])
-        self.digital_diff_decoder_bb_0 = digital.diff_decoder_bb(2, digital.DIFF_DIFFERENTIAL)
-        self.digital_constellation_receiver_cb_0 = digital.constellation_receiver_cb(digital.constellation_bpsk().base(), 2*math.pi / 100, -0.002, 0.002)
-        self.blocks_wavfile_sink_0 = blocks.wavfile_sink(
-            'Output.wav',
-            2,
-            48000,
-            blocks.FORMAT_WAV,
-            blocks.FORMAT_FLOAT,
-            False
-            )
-        self.blocks_vector_to_stream_0 = blocks.vector_to_stream(gr.sizeof_float*1, fft_size)
-        self.blocks_sub_xx_0 = blocks.sub_ff(1)
-        self.blocks_stream_to_vector_0 = blocks.stream_to_vector(gr.sizeof_gr_complex*1, fft_size)
-        self.blocks_selector_0 = blocks.selector(gr.sizeof_gr_complex*1,0,mode)
-        self.blocks_selector_0.set_enabled(True)
-        self.blocks_null_sink_0 = blocks.null_sink(gr.sizeof_float*1)
-        self.blocks_multiply_xx_1 = blocks.multiply_vff(1)
-        self.blocks_multiply_xx_0 = blocks.multiply_vcc(1)
-        self.blocks_multiply_const_vxx_0_0 = blocks.multiply_const_ff(0 if mute else 10 ** (1. * volume / 10))
-        self.blocks_multiply_const_vxx_0 = blocks.multiply_const_ff(0 if mute else 10 ** (1. * volume / 10))
+        self.psd_integrator_0 = psd_integrator(fft_size=fft_size, frames_per_batch=scan_batch)
+        self.epy_block_0 = scan_detector(fft_size=fft_size, samp_rate=samp_rate, freq=freq*10**6, done=done, frames_per_batch=scan_batch, adaptive=scan_adaptive, min_dwell=scan_min_dwell, max_dwell=scan_max_dwell, stable_batches=scan_stable_batches, pipelined=scan_pipelined, settle_time=scan_settle_time, method=scan_method, threshold=scan_threshold)
+        self.psd_integrator_2 = psd_integrator(fft_size=fft_size, frames_per_batch=monitor_batch, decimation=monitor_decim)
+        self.epy_block_2 = occupancy_monitor(fft_size=fft_size, samp_rate=samp_rate, freq=freq_tune, frames_per_batch=monitor_batch, alpha=0.05, threshold=scan_threshold, settle=2)
+        self.psd_integrator_1 = psd_integrator(fft_size=fine_fft_size, frames_per_batch=scan_fine_batch)
+        self.epy_block_1 = scan_detector(fft_size=fine_fft_size, samp_rate=samp_rate, freq=freq*10**6, done=1, frames_per_batch=scan_fine_batch, adaptive=0, min_dwell=scan_fine_dwell, max_dwell=scan_fine_dwell, stable_batches=scan_stable_batches, pipelined=scan_pipelined, settle_time=scan_settle_time, method=scan_method, threshold=scan_threshold)
+        # Shared front end for recorders, fed while set_channelizer_enabled
+        self.channelizer_bank_0 = channelizer_bank(samp_rate=samp_rate, numchans=channelizer_chans, oversample=channelizer_oversample)
+        self.blocks_null_sink_2 = blocks.null_sink(gr.sizeof_gr_complex*1)
         self.blocks_msgpair_to_var_0_0 = blocks.msg_pair_to_var(self.set_done)
-        self.blocks_delay_0 = blocks.delay(gr.sizeof_float*1, (len(pilot_taps) - 1) // 2)
-        self.blocks_complex_to_mag_squared_0 = blocks.complex_to_mag_squared(fft_size)
-        self.blocks_complex_to_imag_0 = blocks.complex_to_imag(1)
-        self.blocks_add_xx_0 = blocks.add_vff(1)
-        self.audio_sink_0 = audio.sink(48000, '', True)
-        self.analog_quadrature_demod_cf_0 = analog.quadrature_demod_cf((samp_rate / decimation) / (2*math.pi*75000))
-        self.analog_pll_refout_cc_0 = analog.pll_refout_cc(0.001, 2 * math.pi * 19020 / 240000, 2 * math.pi * 18980 / 240000)
-        self.analog_fm_deemph_0_0_0 = analog.fm_deemph(fs=48000, tau=tau)
-        self.analog_fm_deemph_0_0 = analog.fm_deemph(fs=48000, tau=tau)
-        self.analog_agc_xx_0 = analog.agc_cc(2e-3, 0.585, 53)
-        self.analog_agc_xx_0.set_max_gain(1000)
-
+        self.blocks_copy_2 = blocks.copy(gr.sizeof_gr_complex*1)
+        self.blocks_copy_2.set_enabled(bool(channelizer_enabled))
+        self.blocks_copy_1 = blocks.copy(gr.sizeof_gr_complex*1)
+        self.blocks_copy_1.set_enabled(scan_pass == 1)
+        self.blocks_copy_0 = blocks.copy(gr.sizeof_gr_complex*1)
+        self.blocks_copy_0.set_enabled(bool(monitor_enabled))
+        # Valves in front of the qtgui sinks, see set_debug_sinks
+        self.blocks_copy_3 = blocks.copy(gr.sizeof_gr_complex*1)
+        self.blocks_copy_4 = blocks.copy(gr.sizeof_float*1)
+        self.blocks_copy_5 = blocks.copy(gr.sizeof_float*1)
+        self.blocks_copy_6 = blocks.copy(gr.sizeof_float*1)
+        self.blocks_copy_7 = blocks.copy(gr.sizeof_gr_complex*1)
+        self.blocks_copy_8 = blocks.copy(gr.sizeof_float*1)
+        self.blocks_copy_9 = blocks.copy(gr.sizeof_float*1)
 
         ##################################################
         # Connections
         ##################################################
         self.msg_connect((self.epy_block_0, 'done'), (self.blocks_msgpair_to_var_0_0, 'inpair'))
-        self.msg_connect((self.rds_decoder_0, 'out'), (self.rds_parser_0, 'in'))
+        self.msg_connect((self.epy_block_1, 'done'), (self.blocks_msgpair_to_var_0_0, 'inpair'))
         self.msg_connect((self.rds_parser_0, 'out'), (self.rds_panel_0, 'in'))
         self.msg_connect((self.rds_parser_0, 'out'), (self.rds_panel_0_0, 'in'))
-        self.connect((self.analog_agc_xx_0, 0), (self.digital_symbol_sync_xx_0, 0))
-        self.connect((self.analog_fm_deemph_0_0, 0), (self.blocks_multiply_const_vxx_0_0, 0))
-        self.connect((self.analog_fm_deemph_0_0_0, 0), (self.blocks_multiply_const_vxx_0, 0))
-        self.connect((self.analog_pll_refout_cc_0, 0), (self.blocks_multiply_xx_0, 0))
-        self.connect((self.analog_pll_refout_cc_0, 0), (self.blocks_multiply_xx_0, 1))
-        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.freq_xlating_fir_filter_xxx_1_0, 0))
-        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.qtgui_freq_sink_x_1, 0))
-        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.qtgui_waterfall_sink_x_0, 0))
-        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.rational_resampler_xxx_0, 0))
-        self.connect((self.blocks_add_xx_0, 0), (self.analog_fm_deemph_0_0_0, 0))
-        self.connect((self.blocks_complex_to_imag_0, 0), (self.blocks_multiply_xx_1, 1))
-        self.connect((self.blocks_complex_to_mag_squared_0, 0), (self.blocks_vector_to_stream_0, 0))
-        self.connect((self.blocks_delay_0, 0), (self.blocks_multiply_xx_1, 0))
-        self.connect((self.blocks_delay_0, 0), (self.fir_filter_xxx_1, 0))
-        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.audio_sink_0, 0))
-        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_wavfile_sink_0, 0))
-        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.qtgui_time_sink_x_0, 1))
-        self.connect((self.blocks_multiply_const_vxx_0_0, 0), (self.audio_sink_0, 1))
-        self.connect((self.blocks_multiply_const_vxx_0_0, 0), (self.blocks_wavfile_sink_0, 1))
-        self.connect((self.blocks_multiply_const_vxx_0_0, 0), (self.qtgui_time_sink_x_0, 0))
-        self.connect((self.blocks_multiply_xx_0, 0), (self.blocks_complex_to_imag_0, 0))
-        self.connect((self.blocks_multiply_xx_1, 0), (self.fir_filter_xxx_1_0, 0))
-        self.connect((self.blocks_selector_0, 0), (self.blocks_stream_to_vector_0, 0))
-        self.connect((self.blocks_selector_0, 1), (self.freq_xlating_fir_filter_xxx_0, 0))
-        self.connect((self.blocks_stream_to_vector_0, 0), (self.fft_vxx_0, 0))
-        self.connect((self.blocks_sub_xx_0, 0), (self.analog_fm_deemph_0_0, 0))
-        self.connect((self.blocks_vector_to_stream_0, 0), (self.epy_block_0, 0))
-        self.connect((self.digital_constellation_receiver_cb_0, 1), (self.blocks_null_sink_0, 0))
-        self.connect((self.digital_constellation_receiver_cb_0, 3), (self.blocks_null_sink_0, 2))
-        self.connect((self.digital_constellation_receiver_cb_0, 2), (self.blocks_null_sink_0, 1))
-        self.connect((self.digital_constellation_receiver_cb_0, 0), (self.digital_diff_decoder_bb_0, 0))
-        self.connect((self.digital_constellation_receiver_cb_0, 4), (self.qtgui_const_sink_x_0, 0))
-        self.connect((self.digital_diff_decoder_bb_0, 0), (self.rds_decoder_0, 0))
-        self.connect((self.digital_symbol_sync_xx_0, 0), (self.digital_constellation_receiver_cb_0, 0))
-        self.connect((self.fft_vxx_0, 0), (self.blocks_complex_to_mag_squared_0, 0))
-        self.connect((self.fir_filter_xxx_0, 0), (self.analog_pll_refout_cc_0, 0))
-        self.connect((self.fir_filter_xxx_1, 0), (self.blocks_add_xx_0, 0))
-        self.connect((self.fir_filter_xxx_1, 0), (self.blocks_sub_xx_0, 0))
-        self.connect((self.fir_filter_xxx_1, 0), (self.qtgui_freq_sink_x_1_0, 0))
-        self.connect((self.fir_filter_xxx_1_0, 0), (self.blocks_add_xx_0, 1))
-        self.connect((self.fir_filter_xxx_1_0, 0), (self.blocks_sub_xx_0, 1))
-        self.connect((self.fir_filter_xxx_2, 0), (self.analog_agc_xx_0, 0))
-        self.connect((self.freq_xlating_fir_filter_xxx_0, 0), (self.analog_quadrature_demod_cf_0, 0))
-        self.connect((self.freq_xlating_fir_filter_xxx_0, 0), (self.qtgui_freq_sink_x_0, 0))
-        self.connect((self.freq_xlating_fir_filter_xxx_1_0, 0), (self.rational_resampler_xxx_1, 0))
-        self.connect((self.rational_resampler_xxx_0, 0), (self.blocks_delay_0, 0))
-        self.connect((self.rational_resampler_xxx_0, 0), (self.fir_filter_xxx_0, 0))
-        self.connect((self.rational_resampler_xxx_1, 0), (self.fir_filter_xxx_2, 0))
-        self.connect((self.soapy_custom_source_0, 0), (self.blocks_selector_0, 0))
+        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.blocks_copy_4, 0))
+        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.blocks_copy_5, 0))
+        self.connect((self.blocks_copy_0, 0), (self.psd_integrator_2, 0))
+        self.connect((self.blocks_copy_1, 0), (self.psd_integrator_1, 0))
+        self.connect((self.blocks_copy_2, 0), (self.channelizer_bank_0, 0))
+        self.connect((self.blocks_copy_3, 0), (self.qtgui_freq_sink_x_0, 0))
+        self.connect((self.blocks_copy_4, 0), (self.qtgui_freq_sink_x_1, 0))
+        self.connect((self.blocks_copy_5, 0), (self.qtgui_waterfall_sink_x_0, 0))
+        self.connect((self.blocks_copy_6, 0), (self.qtgui_freq_sink_x_1_0, 0))
+        self.connect((self.blocks_copy_7, 0), (self.qtgui_const_sink_x_0, 0))
+        self.connect((self.blocks_copy_8, 0), (self.qtgui_time_sink_x_0, 0))
+        self.connect((self.blocks_copy_9, 0), (self.qtgui_time_sink_x_0, 1))
+        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_copy_9, 0))
+        self.connect((self.blocks_multiply_const_vxx_0_0, 0), (self.blocks_copy_8, 0))
+        self.connect((self.blocks_selector_0, 0), (self.psd_integrator_0, 0))
+        self.connect((self.blocks_selector_0, 0), (self.blocks_copy_1, 0))
+        self.connect((self.blocks_selector_0, 1), (self.blocks_copy_2, 0))
+        for i in range(channelizer_chans):
+            self.connect((self.channelizer_bank_0, i), (self.blocks_null_sink_2, i))
+        self.connect((self.digital_constellation_receiver_cb_0, 4), (self.blocks_copy_7, 0))
+        self.connect((self.fir_filter_xxx_1, 0), (self.blocks_copy_6, 0))
+        self.connect((self.freq_xlating_fir_filter_xxx_0, 0), (self.blocks_copy_3, 0))
+        self.connect((self.psd_integrator_0, 0), (self.epy_block_0, 0))
+        self.connect((self.psd_integrator_1, 0), (self.epy_block_1, 0))
+        self.connect((self.psd_integrator_2, 0), (self.epy_block_2, 0))
+        self.connect((self.soapy_custom_source_0, 0), (self.blocks_copy_0, 0))
+
+        ##################################################
+        # Debug sinks
+        ##################################################
+        # Valves in front of each qtgui sink, so that a sink whose plot is not
+        # shown can be starved (see set_debug_sinks)
+        self.debug_sinks = {
+            'rf': [self.blocks_copy_3],
+            'fm_demod': [self.blocks_copy_4],
+            'waterfall': [self.blocks_copy_5],
+            'l_r': [self.blocks_copy_6],
+            'rds_constellation': [self.blocks_copy_7],
+            'audio': [self.blocks_copy_8, self.blocks_copy_9],
+        }
+        self.debug_attached = set(self.debug_sinks)
 
 
     def closeEvent(self, event):
@@ -569,64 +506,27 @@ class rds_rx(gr.top_block, Qt.QWidget):
 
         event.accept()
 
-    def get_device_arguments(self):
-        return self.device_arguments
-
-    def set_device_arguments(self, device_arguments):
-        self.device_arguments = device_arguments
-
-    def get_samp_rate(self):
-        return self.samp_rate
-
     def set_samp_rate(self, samp_rate):
-        self.samp_rate = samp_rate
+        rds_rx_headless.set_samp_rate(self, samp_rate)
         self.set_num_items(self.samp_rate*2)
-        self.analog_quadrature_demod_cf_0.set_gain((self.samp_rate / self.decimation) / (2*math.pi*75000))
-        self.epy_block_0.samp_rate = self.samp_rate
-        self.freq_xlating_fir_filter_xxx_0.set_taps(firdes.low_pass(1, self.samp_rate, self.fir_cutoff, self.fir_transition_width))
-        self.freq_xlating_fir_filter_xxx_1_0.set_taps(firdes.low_pass(1.0, self.samp_rate / self.decimation, 7.5e3, 5e3))
+        self.epy_block_0.set_samp_rate(self.samp_rate)
+        self.epy_block_1.set_samp_rate(self.samp_rate)
+        self.epy_block_2.set_samp_rate(self.samp_rate)
         self.qtgui_freq_sink_x_0.set_frequency_range(self.freq, self.samp_rate / self.decimation)
         self.qtgui_freq_sink_x_1.set_frequency_range(self.freq, self.samp_rate / self.decimation)
         self.qtgui_freq_sink_x_1_0.set_frequency_range(self.freq, self.samp_rate / (self.decimation*5))
         self.qtgui_time_sink_x_0.set_samp_rate(self.samp_rate)
         self.qtgui_waterfall_sink_x_0.set_frequency_range(0, self.samp_rate / self.decimation)
 
-    def get_rrc_taps(self):
-        return self.rrc_taps
-
-    def set_rrc_taps(self, rrc_taps):
-        self.rrc_taps = rrc_taps
-        self.set_rrc_taps_manchester([self.rrc_taps[n] - self.rrc_taps[n+8] for n in range(len(self.rrc_taps)-8)])
-
-    def get_freq_offset(self):
-        return self.freq_offset
-
-    def set_freq_offset(self, freq_offset):
-        self.freq_offset = freq_offset
-        self.set_freq_tune(self.freq*1e6-self.freq_offset)
-        self.freq_xlating_fir_filter_xxx_0.set_center_freq(self.freq_offset)
-
-    def get_freq(self):
-        return self.freq
-
     def set_freq(self, freq):
-        self.freq = freq
-        self.set_freq_tune(self.freq*1e6-self.freq_offset)
-        self.epy_block_0.freq = self.freq*10**6
+        rds_rx_headless.set_freq(self, freq)
+        self.epy_block_0.set_freq(self.freq*10**6)
+        self.epy_block_1.set_freq(self.freq*10**6)
         self.qtgui_freq_sink_x_0.set_frequency_range(self.freq, self.samp_rate / self.decimation)
         self.qtgui_freq_sink_x_1.set_frequency_range(self.freq, self.samp_rate / self.decimation)
         self.qtgui_freq_sink_x_1_0.set_frequency_range(self.freq, self.samp_rate / (self.decimation*5))
         self.rds_panel_0.set_frequency(self.freq)
         self.rds_panel_0_0.set_frequency(self.freq)
-        self.rds_parser_0.reset() # self.freq
-
-    def get_volume(self):
-        return self.volume
-
-    def set_volume(self, volume):
-        self.volume = volume
-        self.blocks_multiply_const_vxx_0.set_k(0 if self.mute else 10 ** (1. * self.volume / 10))
-        self.blocks_multiply_const_vxx_0_0.set_k(0 if self.mute else 10 ** (1. * self.volume / 10))
 
     def get_tau_1(self):
         return self.tau_1
@@ -634,96 +534,183 @@ class rds_rx(gr.top_block, Qt.QWidget):
     def set_tau_1(self, tau_1):
         self.tau_1 = tau_1
 
-    def get_tau(self):
-        return self.tau
+    def get_num_items(self):
+        return self.num_items
 
-    def set_tau(self, tau):
-        self.tau = tau
+    def set_num_items(self, num_items):
+        self.num_items = num_items
 
-    def get_rrc_taps_manchester(self):
-        return self.rrc_taps_manchester
+    def set_freq_tune(self, freq_tune):
+        rds_rx_headless.set_freq_tune(self, freq_tune)
+        self.epy_block_2.set_freq(self.freq_tune)
 
-    def set_rrc_taps_manchester(self, rrc_taps_manchester):
-        self.rrc_taps_manchester = rrc_taps_manchester
-        self.fir_filter_xxx_2.set_taps(self.rrc_taps_manchester)
+    def get_fft_size(self):
+        return self.fft_size
 
-    def get_pilot_taps(self):
-        return self.pilot_taps
+    def set_fft_size(self, fft_size):
+        self.fft_size = fft_size
+        self.epy_block_0.fft_size = self.fft_size
 
-    def set_pilot_taps(self, pilot_taps):
-        self.pilot_taps = pilot_taps
-        self.blocks_delay_0.set_dly((len(self.pilot_taps) - 1) // 2)
-        self.fir_filter_xxx_0.set_taps(self.pilot_taps)
+    def get_scan_batch(self):
+        return self.scan_batch
 
-    def get_num_items(self):
-        return self.num_items
+    def get_scan_stable_batches(self):
+        return self.scan_stable_batches
 
-    def set_num_items(self, num_items):
-        self.num_items = num_items
+    def set_scan_stable_batches(self, scan_stable_batches):
+        self.scan_stable_batches = scan_stable_batches
+        self.epy_block_0.stable_batches = self.scan_stable_batches
 
-    def get_mute(self):
-        return self.mute
+    def get_scan_min_dwell(self):
+        return self.scan_min_dwell
 
-    def set_mute(self, mute):
-        self.mute = mute
-        self.blocks_multiply_const_vxx_0.set_k(0 if self.mute else 10 ** (1. * self.volume / 10))
-        self.blocks_multiply_const_vxx_0_0.set_k(0 if self.mute else 10 ** (1. * self.volume / 10))
+    def set_scan_min_dwell(self, scan_min_dwell):
+        self.scan_min_dwell = scan_min_dwell
+        self.epy_block_0.min_dwell = self.scan_min_dwell
 
-    def get_mode(self):
-        return self.mode
+    def get_scan_max_dwell(self):
+        return self.scan_max_dwell
 
-    def set_mode(self, mode):
-        self.mode = mode
-        self.blocks_selector_0.set_output_index(self.mode)
+    def set_scan_max_dwell(self, scan_max_dwell):
+        self.scan_max_dwell = scan_max_dwell
+        self.epy_block_0.max_dwell = self.scan_max_dwell
+        self.epy_block_0.num_items = self.samp_rate*self.scan_max_dwell
 
-    def get_gain(self):
-        return self.gain
+    def get_scan_adaptive(self):
+        return self.scan_adaptive
 
-    def set_gain(self, gain):
-        self.gain = gain
+    def set_scan_adaptive(self, scan_adaptive):
+        self.scan_adaptive = scan_adaptive
+        self.epy_block_0.adaptive = self.scan_adaptive
 
-    def get_freq_tune(self):
-        return self.freq_tune
+    def get_scan_pipelined(self):
+        return self.scan_pipelined
 
-    def set_freq_tune(self, freq_tune):
-        self.freq_tune = freq_tune
-        self.soapy_custom_source_0.set_frequency(0, self.freq_tune)
+    def get_scan_settle_time(self):
+        return self.scan_settle_time
 
-    def get_fir_transition_width(self):
-        return self.fir_transition_width
+    def set_scan_settle_time(self, scan_settle_time):
+        self.scan_settle_time = scan_settle_time
+        self.epy_block_0.settle_time = self.scan_settle_time
+        self.epy_block_1.settle_time = self.scan_settle_time
 
-    def set_fir_transition_width(self, fir_transition_width):
-        self.fir_transition_width = fir_transition_width
-        self.freq_xlating_fir_filter_xxx_0.set_taps(firdes.low_pass(1, self.samp_rate, self.fir_cutoff, self.fir_transition_width))
+    def get_scan_method(self):
+        return self.scan_method
 
-    def get_fir_cutoff(self):
-        return self.fir_cutoff
+    def set_scan_method(self, scan_method):
+        self.scan_method = scan_method
+        self.epy_block_0.set_detector(self.scan_method, self.scan_threshold)
+        self.epy_block_1.set_detector(self.scan_method, self.scan_threshold)
 
-    def set_fir_cutoff(self, fir_cutoff):
-        self.fir_cutoff = fir_cutoff
-        self.freq_xlating_fir_filter_xxx_0.set_taps(firdes.low_pass(1, self.samp_rate, self.fir_cutoff, self.fir_transition_width))
+    def get_scan_threshold(self):
+        return self.scan_threshold
 
-    def get_fft_size(self):
-        return self.fft_size
+    def set_scan_threshold(self, scan_threshold):
+        self.scan_threshold = scan_threshold
+        self.epy_block_0.set_detector(self.scan_method, self.scan_threshold)
+        self.epy_block_1.set_detector(self.scan_method, self.scan_threshold)
 
-    def set_fft_size(self, fft_size):
-        self.fft_size = fft_size
-        self.epy_block_0.fft_size = self.fft_size
+    def get_fine_fft_size(self):
+        return self.fine_fft_size
+
+    def get_scan_fine_batch(self):
+        return self.scan_fine_batch
+
+    def get_scan_fine_dwell(self):
+        return self.scan_fine_dwell
+
+    def set_scan_fine_dwell(self, scan_fine_dwell):
+        self.scan_fine_dwell = scan_fine_dwell
+        self.epy_block_1.min_dwell = self.scan_fine_dwell
+        self.epy_block_1.max_dwell = self.scan_fine_dwell
+        self.epy_block_1.num_items = self.samp_rate*self.scan_fine_dwell
+
+    def get_monitor_enabled(self):
+        return self.monitor_enabled
+
+    def set_monitor_enabled(self, monitor_enabled):
+        # The copy block drops the tap's input while disabled
+        self.monitor_enabled = monitor_enabled
+        self.blocks_copy_0.set_enabled(bool(self.monitor_enabled))
+        self.epy_block_2.reset()
+
+    def get_monitor_decim(self):
+        return self.monitor_decim
+
+    def get_monitor_batch(self):
+        return self.monitor_batch
+
+    def get_scan_pass(self):
+        return self.scan_pass
+
+    def set_scan_pass(self, scan_pass):
+        # 0: coarse detector (epy_block_0), 1: high-resolution refine detector
+        # (epy_block_1). Both are disarmed until the next set_done(0).
+        self.scan_pass = scan_pass
+        # The 1024-point FFT of the refine detector only runs during its pass
+        self.blocks_copy_1.set_enabled(self.scan_pass == 1)
+        self.epy_block_0.done = 1
+        self.epy_block_1.done = 1
+        self.done = 1
+
+    def set_scan_targets(self, targets):
+        self.epy_block_1.set_targets(targets)
 
     def get_done(self):
         return self.done
 
     def set_done(self, done):
         self.done = done
-        self.epy_block_0.done = self.done
-
-    def get_decimation(self):
-        return self.decimation
+        # Only the detector of the current scan pass runs
+        if self.scan_pass == 0:
+            self.epy_block_0.done = self.done
+        else:
+            self.epy_block_1.done = self.done
+        # Wake the scanner thread as soon as the detector reports completion
+        if self.done:
+            self.done_event.set()
+        else:
+            self.done_event.clear()
+
+    def set_scan_freq(self, freq):
+        # Retune for the next scan step without touching any Qt widget,
+        # so it can be called from the scanner thread
+        self.freq = freq
+        self.set_freq_tune(self.freq*1e6-self.freq_offset)
+        self.epy_block_0.set_freq(self.freq*10**6)
+        self.epy_block_1.set_freq(self.freq*10**6)
+
+    def get_channelizer_enabled(self):
+        return self.channelizer_enabled
+
+    def set_channelizer_enabled(self, channelizer_enabled):
+        # The channelizer stays connected to selector output 1 behind a copy
+        # valve, so switching it needs no lock()/unlock(). While disabled the
+        # valve drops the capture and the PFB does not run; recorders on its
+        # outputs then receive nothing.
+        self.channelizer_enabled = channelizer_enabled
+        self.blocks_copy_2.set_enabled(bool(self.channelizer_enabled))
+
+    def get_channelizer_chans(self):
+        return self.channelizer_chans
+
+    def get_debug_sinks(self):
+        return self.debug_attached
+
+    def set_debug_sinks(self, names):
+        # A disabled copy block consumes its input and produces nothing, so the
+        # sink behind it neither computes its FFT nor redraws. Unlike rewiring,
+        # this needs no lock()/unlock() and does not interrupt the audio.
+        names = set(names)
+        if not names <= set(self.debug_sinks):
+            raise ValueError(f"Unknown debug sinks {sorted(names - set(self.debug_sinks))}")
+        for name, valves in self.debug_sinks.items():
+            for valve in valves:
+                valve.set_enabled(name in names)
+        self.debug_attached = names
 
     def set_decimation(self, decimation):
-        self.decimation = decimation
-        self.analog_quadrature_demod_cf_0.set_gain((self.samp_rate / self.decimation) / (2*math.pi*75000))
-        self.freq_xlating_fir_filter_xxx_1_0.set_taps(firdes.low_pass(1.0, self.samp_rate / self.decimation, 7.5e3, 5e3))
+        rds_rx_headless.set_decimation(self, decimation)
         self.qtgui_freq_sink_x_0.set_frequency_range(self.freq, self.samp_rate / self.decimation)
         self.qtgui_freq_sink_x_1.set_frequency_range(self.freq, self.samp_rate / self.decimation)
         self.qtgui_freq_sink_x_1_0.set_frequency_range(self.freq, self.samp_rate / (self.decimation*5))
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+#
+# SPDX-License-Identifier: GPL-3.0
+#
+# GNU Radio Python Flow Graph
+# Title: Stereo FM receiver and RDS Decoder (no GUI)
+# GNU Radio version: 3.10.1.1
+
+import math
+import os
+import signal
+import sys
+from argparse import ArgumentParser
+
+from gnuradio import analog, audio, blocks, digital, filter, gr, soapy
+from gnuradio.eng_arg import eng_float
+from gnuradio.fft import window
+from gnuradio.filter import firdes
+import rds
+from core.demod import fm_deemph_taps
+from flowgraphs.rds_sink import rds_sink
+from flowgraphs.sources import make_source
+
+
+class rds_rx_headless(gr.top_block):
+    """The receiver flowgraph without Qt widgets or qtgui sinks.
+
+    Demodulation, stereo decoding, RDS decoding and the WAV sink, with
+    their setters. RDS comes out through `rds_sink` callbacks
+    (`add_rds_callback`). Selector output 0 ends in a null sink. `rds_rx`
+    adds the scanner's detectors there, the occupancy monitor, the recorder
+    channelizer, the Qt window, the rdsPanel widgets and the qtgui sinks on
+    top of this class, so the receive chain exists once.
+    """
+
+    def __init__(self, device_arguments='0', audio_device='', fname='', rds_callback=None):
+        gr.top_block.__init__(self, "Stereo FM receiver and RDS Decoder (no GUI)", catch_exceptions=True)
+
+        ##################################################
+        # Parameters
+        ##################################################
+        self.device_arguments = device_arguments
+        self.audio_device = audio_device    # None: no sound card, e.g. on a server
+        self.fname = fname                  # WAV file recorded from the start, '' for none
+
+        ##################################################
+        # Variables
+        ##################################################
+        self.samp_rate = samp_rate = 1920000
+        self.rrc_taps = rrc_taps = firdes.root_raised_cosine(1.0, 19000,19000/8, 1.0, 151)
+        self.freq_offset = freq_offset = 250e3
+        self.freq = freq = 88.7
+        self.volume = volume = -5
+        self.tau = tau = 75e-6
+        self.rrc_taps_manchester = rrc_taps_manchester = [rrc_taps[n] - rrc_taps[n+8] for n in range(len(rrc_taps)-8)]
+        self.pilot_taps = pilot_taps = firdes.complex_band_pass(1.0, 240000, 18980, 19020, 1000, window.WIN_HAMMING, 6.76)
+        self.mute = mute = 1
+        self.mode = mode = 1
+        self.gain = gain = 40
+        self.freq_tune = freq_tune = freq*1e6-freq_offset
+        self.fir_transition_width = fir_transition_width = 20e3
+        self.fir_cutoff = fir_cutoff = 135e3
+        self.decimation = decimation = 6
+
+        ##################################################
+        # Blocks
+        ##################################################
+        # Recording or synthetic band in place of the SDR, see flowgraphs/sources.py
+        self.soapy_custom_source_0 = make_source(device_arguments, samp_rate, freq_tune, throttle=True)
+        if self.soapy_custom_source_0 is None:
+            dev = 'driver=' + ''
+            stream_args = ''
+            tune_args = ['']
+            settings = ['']
+            self.soapy_custom_source_0 = soapy.source(dev, "fc32",
+                                      1, device_arguments,
+                                      stream_args, tune_args, settings)
+            self.soapy_custom_source_0.set_sample_rate(0, samp_rate)
+            self.soapy_custom_source_0.set_bandwidth(0, 0)
+            self.soapy_custom_source_0.set_antenna(0, 'RX')
+            self.soapy_custom_source_0.set_frequency(0, freq_tune)
+            self.soapy_custom_source_0.set_frequency_correction(0, 0)
+            self.soapy_custom_source_0.set_gain_mode(0, False)
+            self.soapy_custom_source_0.set_gain(0, 10)
+            self.soapy_custom_source_0.set_dc_offset_mode(0, False)
+            self.soapy_custom_source_0.set_dc_offset(0, 0)
+            self.soapy_custom_source_0.set_iq_balance(0, 0)
+        self.rds_sink_0 = rds_sink(rds_callback)
+        self.rds_parser_0 = rds.parser(False, False, 0)
+        self.rds_decoder_0 = rds.decoder(False, False)
+        self.rational_resampler_xxx_1 = filter.rational_resampler_ccc(
+                interpolation=19000,
+                decimation=samp_rate // decimation // 10,
+                taps=[],
+                fractional_bw=0)
+        self.rational_resampler_xxx_0 = filter.rational_resampler_fff(
+                interpolation=240000,
+                decimation=samp_rate // decimation,
+                taps=[],
+                fractional_bw=0)
+        self.freq_xlating_fir_filter_xxx_1_0 = filter.freq_xlating_fir_filter_fcc(10, firdes.low_pass(1.0, samp_rate / decimation, 7.5e3, 5e3), 57e3, samp_rate / decimation)
+        self.freq_xlating_fir_filter_xxx_0 = filter.freq_xlating_fir_filter_ccc(decimation, firdes.low_pass(1, samp_rate, fir_cutoff, fir_transition_width), freq_offset, samp_rate)
+        self.fir_filter_xxx_2 = filter.fir_filter_ccc(1, rrc_taps_manchester)
+        self.fir_filter_xxx_2.declare_sample_delay(0)
+        self.fir_filter_xxx_1_0 = filter.fir_filter_fff(5, firdes.low_pass(-2.1,240000,15e3,2e3))
+        self.fir_filter_xxx_1_0.declare_sample_delay(0)
+        self.fir_filter_xxx_1 = filter.fir_filter_fff(5, firdes.low_pass(1.0,240000,15e3,2e3))
+        self.fir_filter_xxx_1.declare_sample_delay(0)
+        self.fir_filter_xxx_0 = filter.fir_filter_fcc(1, pilot_taps)
+        self.fir_filter_xxx_0.declare_sample_delay(0)
+        self.digital_symbol_sync_xx_0 = digital.symbol_sync_cc(
+            digital.TED_ZERO_CROSSING,
+            16,
+            0.01,
+            1.0,
+            1.0,
+            0.1,
+            1,
+            digital.constellation_bpsk().base(),
+            digital.IR_MMSE_8TAP,
+            128,
+            [])
+        self.digital_diff_decoder_bb_0 = digital.diff_decoder_bb(2, digital.DIFF_DIFFERENTIAL)
+        self.digital_constellation_receiver_cb_0 = digital.constellation_receiver_cb(digital.constellation_bpsk().base(), 2*math.pi / 100, -0.002, 0.002)
+        self.blocks_wavfile_sink_0 = blocks.wavfile_sink(
+            fname or os.devnull,
+            2,
+            48000,
+            blocks.FORMAT_WAV,
+            blocks.FORMAT_FLOAT,
+            False
+            )
+        if not fname:
+            self.blocks_wavfile_sink_0.close()
+        self.blocks_sub_xx_0 = blocks.sub_ff(1)
+        self.blocks_selector_0 = blocks.selector(gr.sizeof_gr_complex*1,0,mode)
+        self.blocks_selector_0.set_enabled(True)
+        self.blocks_null_sink_1 = blocks.null_sink(gr.sizeof_gr_complex*1)
+        self.blocks_null_sink_0 = blocks.null_sink(gr.sizeof_float*1)
+        self.blocks_multiply_xx_1 = blocks.multiply_vff(1)
+        self.blocks_multiply_xx_0 = blocks.multiply_vcc(1)
+        self.blocks_multiply_const_vxx_0_0 = blocks.multiply_const_ff(0 if mute else 10 ** (1. * volume / 10))
+        self.blocks_multiply_const_vxx_0 = blocks.multiply_const_ff(0 if mute else 10 ** (1. * volume / 10))
+        self.blocks_delay_0 = blocks.delay(gr.sizeof_float*1, (len(pilot_taps) - 1) // 2)
+        self.blocks_complex_to_imag_0 = blocks.complex_to_imag(1)
+        self.blocks_add_xx_0 = blocks.add_vff(1)
+        if audio_device is None:
+            self.audio_sink_0 = blocks.null_sink(gr.sizeof_float*1)
+        else:
+            self.audio_sink_0 = audio.sink(48000, audio_device, True)
+        self.analog_quadrature_demod_cf_0 = analog.quadrature_demod_cf((samp_rate / decimation) / (2*math.pi*75000))
+        self.analog_pll_refout_cc_0 = analog.pll_refout_cc(0.001, 2 * math.pi * 19020 / 240000, 2 * math.pi * 18980 / 240000)
+        # IIR form of analog.fm_deemph, which has no setter for tau
+        deemph_b, deemph_a = fm_deemph_taps(48000, tau)
+        self.analog_fm_deemph_0_0_0 = filter.iir_filter_ffd(list(deemph_b), list(deemph_a), False)
+        self.analog_fm_deemph_0_0 = filter.iir_filter_ffd(list(deemph_b), list(deemph_a), False)
+        self.analog_agc_xx_0 = analog.agc_cc(2e-3, 0.585, 53)
+        self.analog_agc_xx_0.set_max_gain(1000)
+
+
+        ##################################################
+        # Connections
+        ##################################################
+        self.msg_connect((self.rds_decoder_0, 'out'), (self.rds_parser_0, 'in'))
+        self.msg_connect((self.rds_parser_0, 'out'), (self.rds_sink_0, 'in'))
+        self.connect((self.analog_agc_xx_0, 0), (self.digital_symbol_sync_xx_0, 0))
+        self.connect((self.analog_fm_deemph_0_0, 0), (self.blocks_multiply_const_vxx_0_0, 0))
+        self.connect((self.analog_fm_deemph_0_0_0, 0), (self.blocks_multiply_const_vxx_0, 0))
+        self.connect((self.analog_pll_refout_cc_0, 0), (self.blocks_multiply_xx_0, 0))
+        self.connect((self.analog_pll_refout_cc_0, 0), (self.blocks_multiply_xx_0, 1))
+        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.freq_xlating_fir_filter_xxx_1_0, 0))
+        self.connect((self.analog_quadrature_demod_cf_0, 0), (self.rational_resampler_xxx_0, 0))
+        self.connect((self.blocks_add_xx_0, 0), (self.analog_fm_deemph_0_0_0, 0))
+        self.connect((self.blocks_complex_to_imag_0, 0), (self.blocks_multiply_xx_1, 1))
+        self.connect((self.blocks_delay_0, 0), (self.blocks_multiply_xx_1, 0))
+        self.connect((self.blocks_delay_0, 0), (self.fir_filter_xxx_1, 0))
+        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.audio_sink_0, 0))
+        self.connect((self.blocks_multiply_const_vxx_0, 0), (self.blocks_wavfile_sink_0, 0))
+        self.connect((self.blocks_multiply_const_vxx_0_0, 0), (self.audio_sink_0, 1))
+        self.connect((self.blocks_multiply_const_vxx_0_0, 0), (self.blocks_wavfile_sink_0, 1))
+        self.connect((self.blocks_multiply_xx_0, 0), (self.blocks_complex_to_imag_0, 0))
+        self.connect((self.blocks_multiply_xx_1, 0), (self.fir_filter_xxx_1_0, 0))
+        self.connect((self.blocks_selector_0, 0), (self.blocks_null_sink_1, 0))
+        self.connect((self.blocks_selector_0, 1), (self.freq_xlating_fir_filter_xxx_0, 0))
+        self.connect((self.blocks_sub_xx_0, 0), (self.analog_fm_deemph_0_0, 0))
+        self.connect((self.digital_constellation_receiver_cb_0, 1), (self.blocks_null_sink_0, 0))
+        self.connect((self.digital_constellation_receiver_cb_0, 3), (self.blocks_null_sink_0, 2))
+        self.connect((self.digital_constellation_receiver_cb_0, 2), (self.blocks_null_sink_0, 1))
+        self.connect((self.digital_constellation_receiver_cb_0, 0), (self.digital_diff_decoder_bb_0, 0))
+        self.connect((self.digital_diff_decoder_bb_0, 0), (self.rds_decoder_0, 0))
+        self.connect((self.digital_symbol_sync_xx_0, 0), (self.digital_constellation_receiver_cb_0, 0))
+        self.connect((self.fir_filter_xxx_0, 0), (self.analog_pll_refout_cc_0, 0))
+        self.connect((self.fir_filter_xxx_1, 0), (self.blocks_add_xx_0, 0))
+        self.connect((self.fir_filter_xxx_1, 0), (self.blocks_sub_xx_0, 0))
+        self.connect((self.fir_filter_xxx_1_0, 0), (self.blocks_add_xx_0, 1))
+        self.connect((self.fir_filter_xxx_1_0, 0), (self.blocks_sub_xx_0, 1))
+        self.connect((self.fir_filter_xxx_2, 0), (self.analog_agc_xx_0, 0))
+        self.connect((self.freq_xlating_fir_filter_xxx_0, 0), (self.analog_quadrature_demod_cf_0, 0))
+        self.connect((self.freq_xlating_fir_filter_xxx_1_0, 0), (self.rational_resampler_xxx_1, 0))
+        self.connect((self.rational_resampler_xxx_0, 0), (self.blocks_delay_0, 0))
+        self.connect((self.rational_resampler_xxx_0, 0), (self.fir_filter_xxx_0, 0))
+        self.connect((self.rational_resampler_xxx_1, 0), (self.fir_filter_xxx_2, 0))
+        self.connect((self.soapy_custom_source_0, 0), (self.blocks_selector_0, 0))
+
+
+    def get_device_arguments(self):
+        return self.device_arguments
+
+    def set_device_arguments(self, device_arguments):
+        self.device_arguments = device_arguments
+
+    def get_samp_rate(self):
+        return self.samp_rate
+
+    def set_samp_rate(self, samp_rate):
+        self.samp_rate = samp_rate
+        self.soapy_custom_source_0.set_sample_rate(0, self.samp_rate)
+        self.analog_quadrature_demod_cf_0.set_gain((self.samp_rate / self.decimation) / (2*math.pi*75000))
+        self.freq_xlating_fir_filter_xxx_0.set_taps(firdes.low_pass(1, self.samp_rate, self.fir_cutoff, self.fir_transition_width))
+        self.freq_xlating_fir_filter_xxx_1_0.set_taps(firdes.low_pass(1.0, self.samp_rate / self.decimation, 7.5e3, 5e3))
+
+    def get_rrc_taps(self):
+        return self.rrc_taps
+
+    def set_rrc_taps(self, rrc_taps):
+        self.rrc_taps = rrc_taps
+        self.set_rrc_taps_manchester([self.rrc_taps[n] - self.rrc_taps[n+8] for n in range(len(self.rrc_taps)-8)])
+
+    def get_freq_offset(self):
+        return self.freq_offset
+
+    def set_freq_offset(self, freq_offset):
+        self.freq_offset = freq_offset
+        self.set_freq_tune(self.freq*1e6-self.freq_offset)
+        self.freq_xlating_fir_filter_xxx_0.set_center_freq(self.freq_offset)
+
+    def get_freq(self):
+        return self.freq
+
+    def set_freq(self, freq):
+        self.freq = freq
+        self.set_freq_tune(self.freq*1e6-self.freq_offset)
+        self.rds_parser_0.reset()
+        self.rds_sink_0.reset()
+
+    def get_volume(self):
+        return self.volume
+
+    def set_volume(self, volume):
+        self.volume = volume
+        self.blocks_multiply_const_vxx_0.set_k(0 if self.mute else 10 ** (1. * self.volume / 10))
+        self.blocks_multiply_const_vxx_0_0.set_k(0 if self.mute else 10 ** (1. * self.volume / 10))
+
+    def get_tau(self):
+        return self.tau
+
+    def set_tau(self, tau):
+        self.tau = tau
+        deemph_b, deemph_a = fm_deemph_taps(48000, self.tau)
+        self.analog_fm_deemph_0_0_0.set_taps(list(deemph_b), list(deemph_a))
+        self.analog_fm_deemph_0_0.set_taps(list(deemph_b), list(deemph_a))
+
+    def get_rrc_taps_manchester(self):
+        return self.rrc_taps_manchester
+
+    def set_rrc_taps_manchester(self, rrc_taps_manchester):
+        self.rrc_taps_manchester = rrc_taps_manchester
+        self.fir_filter_xxx_2.set_taps(self.rrc_taps_manchester)
+
+    def get_pilot_taps(self):
+        return self.pilot_taps
+
+    def set_pilot_taps(self, pilot_taps):
+        self.pilot_taps = pilot_taps
+        self.blocks_delay_0.set_dly((len(self.pilot_taps) - 1) // 2)
+        self.fir_filter_xxx_0.set_taps(self.pilot_taps)
+
+    def get_mute(self):
+        return self.mute
+
+    def set_mute(self, mute):
+        self.mute = mute
+        self.blocks_multiply_const_vxx_0.set_k(0 if self.mute else 10 ** (1. * self.volume / 10))
+        self.blocks_multiply_const_vxx_0_0.set_k(0 if self.mute else 10 ** (1. * self.volume / 10))
+
+    def get_mode(self):
+        return self.mode
+
+    def set_mode(self, mode):
+        self.mode = mode
+        self.blocks_selector_0.set_output_index(self.mode)
+
+    def get_gain(self):
+        return self.gain
+
+    def set_gain(self, gain):
+        self.gain = gain
+
+    def get_freq_tune(self):
+        return self.freq_tune
+
+    def set_freq_tune(self, freq_tune):
+        self.freq_tune = freq_tune
+        self.soapy_custom_source_0.set_frequency(0, self.freq_tune)
+
+    def get_fir_transition_width(self):
+        return self.fir_transition_width
+
+    def set_fir_transition_width(self, fir_transition_width):
+        self.fir_transition_width = fir_transition_width
+        self.freq_xlating_fir_filter_xxx_0.set_taps(firdes.low_pass(1, self.samp_rate, self.fir_cutoff, self.fir_transition_width))
+
+    def get_fir_cutoff(self):
+        return self.fir_cutoff
+
+    def set_fir_cutoff(self, fir_cutoff):
+        self.fir_cutoff = fir_cutoff
+        self.freq_xlating_fir_filter_xxx_0.set_taps(firdes.low_pass(1, self.samp_rate, self.fir_cutoff, self.fir_transition_width))
+
+    def get_decimation(self):
+        return self.decimation
+
+    def set_decimation(self, decimation):
+        self.decimation = decimation
+        self.analog_quadrature_demod_cf_0.set_gain((self.samp_rate / self.decimation) / (2*math.pi*75000))
+        self.freq_xlating_fir_filter_xxx_1_0.set_taps(firdes.low_pass(1.0, self.samp_rate / self.decimation, 7.5e3, 5e3))
+
+    def get_rds(self):
+        return dict(self.rds_sink_0.info)
+
+    def add_rds_callback(self, callback):
+        self.rds_sink_0.add_callback(callback)
+
+    def remove_rds_callback(self, callback):
+        self.rds_sink_0.remove_callback(callback)
+
+    def start_recording(self, fname):
+        self.fname = fname
+        self.blocks_wavfile_sink_0.open(fname)
+
+    def stop_recording(self):
+        self.fname = ''
+        self.blocks_wavfile_sink_0.close()
+
+
+
+def argument_parser():
+    parser = ArgumentParser()
+    parser.add_argument(
+        "--device-arguments", dest="device_arguments", type=str, default='0',
+        help="Set 0 [default=%(default)r]")
+    parser.add_argument(
+        "--freq", dest="freq", type=eng_float, default=88.7,
+        help="Set station in MHz [default=%(default)r]")
+    return parser
+
+
+def main(top_block_cls=rds_rx_headless, options=None):
+    if options is None:
+        options = argument_parser().parse_args()
+
+    tb = top_block_cls(device_arguments=options.device_arguments,
+                       rds_callback=lambda field, text: print(f"{field}: {text}", flush=True))
+    tb.set_freq(options.freq)
+    tb.set_mute(0)
+
+    def sig_handler(sig=None, frame=None):
+        tb.stop()
+        tb.wait()
+
+        sys.exit(0)
+
+    signal.signal(signal.SIGINT, sig_handler)
+    signal.signal(signal.SIGTERM, sig_handler)
+
+    tb.start()
+
+    tb.wait()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+RDS Message Sink
+
+Qt-free counterpart of `rds.rdsPanel`: receives the messages of `rds.parser`
+and hands them to Python callbacks, keeping the last value of each field.
+"""
+
+import pmt
+from gnuradio import gr
+
+# Message types of rds.parser, as rdsPanel interprets them
+RDS_FIELDS = {
+    0: "pi",
+    1: "ps",
+    2: "pty",
+    3: "flags",
+    4: "radiotext",
+    5: "clocktime",
+    6: "af",
+}
+
+
+class rds_sink(gr.basic_block):
+    """Calls callback(field, text) for each message of rds.parser.
+
+    Callbacks run on the message thread of the flowgraph, so they should
+    return quickly and must not touch Qt widgets directly.
+    """
+
+    def __init__(self, callback=None):
+        gr.basic_block.__init__(self, name="RDS Sink", in_sig=None, out_sig=None)
+        self.callbacks = [callback] if callback else []
+        self.info = {}      # Last text of each field
+        self.message_port_register_in(pmt.intern("in"))
+        self.set_msg_handler(pmt.intern("in"), self.handle_msg)
+
+    def add_callback(self, callback):
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self.callbacks.remove(callback)
+
+    def reset(self):
+        # Forget the previous station after a retune
+        self.info = {}
+
+    def handle_msg(self, msg):
+        if not pmt.is_tuple(msg):
+            return
+        field = RDS_FIELDS.get(pmt.to_long(pmt.tuple_ref(msg, 0)))
+        if field is None:
+            return
+        text = pmt.symbol_to_string(pmt.tuple_ref(msg, 1))
+        self.info[field] = text
+        for callback in list(self.callbacks):
+            callback(field, text)
@@ -0,0 +1,166 @@
+"""
+Hot-Pluggable Recorders
+
+Adds and removes `MultipleRecorder` instances while the receiver keeps
+running. Stopping the top block to connect a recorder tears down the SDR
+stream, drops the live audio and loses RDS sync.
+
+Instead, `slots` recorders are connected to the capture before the receiver
+starts. Each sits behind a disabled blocks.copy valve, with its file closed:
+
+    selector output 1 -> copy (valve, disabled) -> MultipleRecorder
+
+With a channelizer, `channel_slots` more recorders take their input from a
+blocks.selector connected to every channelizer output, disabled while idle:
+
+    channelizer outputs 0..N-1 -> selector (disabled) -> MultipleRecorder
+
+A disabled selector consumes its inputs and produces nothing, like the copy
+valve, and set_input_index picks the station's channel at run time.
+
+Starting a recording retunes a free slot (and picks its channel), opens its
+file and enables the valve. Stopping one disables the valve and closes the file. These are
+setter calls on the running flowgraph, as the Record button already does
+with the receiver's own file sink, and nothing else in the flowgraph
+notices them. A disabled copy consumes its input and produces nothing, so
+an idle slot does no filtering.
+
+When no slot fits, the recorder is connected under lock()/unlock() instead.
+That happens when all slots of its kind are taken, or at a sample rate other
+than the one the slots were built for. The top block then
+keeps running but restarts its threads, so the audio still drops briefly.
+"""
+
+import logging
+import os
+
+from gnuradio import blocks, gr
+
+from flowgraphs.MultipleRecorder import MultipleRecorder
+
+logger = logging.getLogger(__name__)
+
+
+class RecorderPool:
+    """Recorders on a running top block, from pre-connected slots where possible"""
+
+    def __init__(self, tb, endpoint, samp_rate, slots=4, audio_format='wav', channelizer=None, channel_slots=0):
+        """Connect the idle slots. Call before the top block starts, or under lock().
+
+        Args:
+            tb (gr.top_block): Receiver flowgraph
+            endpoint (tuple): (block, port) carrying the capture
+            samp_rate (float): Sample rate of the capture in Hz
+            slots (int): Number of pre-connected recorders on the capture
+            audio_format (str): 'wav' or 'flac'
+            channelizer (channelizer_bank): Channelizer of the receiver, None for none
+            channel_slots (int): Number of pre-connected recorders on the channelizer
+        """
+        self.tb = tb
+        self.endpoint = endpoint
+        self.samp_rate = samp_rate
+        self.audio_format = audio_format
+        self.channelizer = channelizer
+        self.valves = {}        # Slot recorder -> copy or selector block gating its input
+        self.free = []          # Idle capture slots, least recently used first
+        self.free_channel = []  # Idle channelizer slots, least recently used first
+        self.inputs = {}        # Active recorder -> endpoint feeding it
+
+        for _ in range(slots):
+            recorder = MultipleRecorder(fname=os.devnull, samp_rate=samp_rate, audio_format=audio_format)
+            recorder.blocks_wavfile_sink_0.close()
+            valve = blocks.copy(gr.sizeof_gr_complex*1)
+            valve.set_enabled(False)
+            tb.connect(endpoint, (valve, 0))
+            tb.connect((valve, 0), (recorder, 0))
+            self.valves[recorder] = valve
+            self.free.append(recorder)
+
+        for _ in range(channel_slots if channelizer is not None else 0):
+            recorder = MultipleRecorder(fname=os.devnull, samp_rate=samp_rate, audio_format=audio_format,
+                                        input_rate=channelizer.get_channel_rate())
+            recorder.blocks_wavfile_sink_0.close()
+            selector = blocks.selector(gr.sizeof_gr_complex*1, 0, 0)
+            selector.set_enabled(False)
+            for i in range(channelizer.numchans):
+                tb.connect((channelizer, i), (selector, i))
+            tb.connect((selector, 0), (recorder, 0))
+            self.valves[recorder] = selector
+            self.free_channel.append(recorder)
+
+    def add(self, fname, freq, freq_offset, samp_rate, endpoint=None, input_rate=0):
+        """Start recording a station.
+
+        Args:
+            fname (str): File to record to
+            freq (float): Station frequency in Hz
+            freq_offset (float): MultipleRecorder offset (station - centre - 250 kHz)
+            samp_rate (float): Current sample rate of the capture in Hz
+            endpoint (tuple): (block, port) feeding the recorder, None for the capture
+            input_rate (float): Rate of a channelizer output, 0 for the capture
+
+        Returns:
+            MultipleRecorder: The recorder, to pass to remove()
+        """
+        if endpoint is None:
+            endpoint = self.endpoint
+
+        on_channel = self.channelizer is not None and endpoint[0] is self.channelizer
+        if on_channel:
+            free = self.free_channel
+        else:
+            free = self.free if not input_rate else []
+
+        if free and samp_rate == self.samp_rate:
+            recorder = free.pop(0)
+            recorder.set_freq(freq)
+            recorder.set_freq_offset(freq_offset)
+            recorder.set_fname(fname)
+            if on_channel:
+                self.valves[recorder].set_input_index(endpoint[1])
+            self.valves[recorder].set_enabled(True)
+        else:
+            logger.info(f"No free recorder slot for {freq / 1e6:.1f} MHz, reconfiguring the flowgraph")
+            recorder = MultipleRecorder(fname=fname, freq=freq, freq_offset=freq_offset,
+                                        samp_rate=samp_rate, audio_format=self.audio_format,
+                                        input_rate=input_rate)
+            self.tb.lock()
+            self.tb.connect(endpoint, (recorder, 0))
+            self.tb.unlock()
+
+        self.inputs[recorder] = endpoint
+        return recorder
+
+    def remove(self, recorder):
+        """Stop a recorder and finish its file"""
+        self.remove_all([recorder])
+
+    def remove_all(self, recorders=None):
+        """Stop recorders (all active ones by default), reconfiguring at most once"""
+        recorders = list(self.inputs) if recorders is None else recorders
+        connected = [recorder for recorder in recorders if recorder not in self.valves]
+
+        for recorder in recorders:
+            if recorder in self.valves:
+                # Gate the input before closing, so the file ends cleanly
+                self.valves[recorder].set_enabled(False)
+                self.inputs.pop(recorder)
+                recorder.blocks_wavfile_sink_0.close()
+                if recorder.get_input_rate():
+                    self.free_channel.append(recorder)
+                else:
+                    self.free.append(recorder)
+
+        if connected:
+            self.tb.lock()
+            for recorder in connected:
+                self.tb.disconnect(self.inputs.pop(recorder), (recorder, 0))
+            self.tb.unlock()
+            for recorder in connected:
+                recorder.blocks_wavfile_sink_0.close()
+
+    def get_free_slots(self):
+        return len(self.free)
+
+    def get_free_channel_slots(self):
+        return len(self.free_channel)
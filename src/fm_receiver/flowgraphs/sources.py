@@ -0,0 +1,145 @@
+"""
+Pluggable Sources
+
+Builds the source block of a flowgraph from its device string, so rds_rx and
+fm_scanner run from recordings or a synthetic band as well as from an SDR.
+Every source returned here has the setters the flowgraphs call on
+soapy.source (set_frequency, set_sample_rate, gains...), so the generated
+setter code is unchanged.
+
+Device strings:
+
+    file=<path>[,format=cf32|cs16|cs8|cu8][,rate=<Hz>][,freq=<Hz>][,throttle=0|1]
+        Replay of a raw IQ file or SigMF recording (core.iq_file). SigMF
+        metadata gives the format, rate and centre frequency; for a raw file
+        they come from the options (the rate defaults to the flowgraph's).
+        Retunes are simulated by frequency translation when freq is known.
+    synth | synth=<band.json>
+        Synthetic FM band (flowgraphs/synth_source.py)
+    anything else
+        SoapySDR device arguments, make_source returns None and the
+        flowgraph builds its soapy.source as before
+"""
+
+import logging
+import time
+
+import numpy as np
+from gnuradio import gr
+
+from core.iq_file import IQFile, IQReplay
+from flowgraphs.synth_source import is_synth_device, synth_source
+
+logger = logging.getLogger(__name__)
+
+
+def parse_file_args(device_args):
+    """Split "file=<path>,key=value,..." into (path, options)"""
+    path, *options = device_args[len('file='):].split(',')
+    return path, dict(option.split('=', 1) for option in options)
+
+
+class file_source(gr.sync_block):
+    """Replays an IQ recording with the setters of soapy.source"""
+
+    def __init__(self, path, samp_rate, freq, fmt=None, file_rate=None, file_freq=None, throttle=True,
+                 repeat=True):
+        """
+        Args:
+            path (str): Raw IQ file or SigMF recording
+            samp_rate (float): Output sample rate in Hz
+            freq (float): Initial tuned frequency in Hz
+            fmt (str): Raw format, from the extension if None
+            file_rate (float): Sample rate of a raw file in Hz, samp_rate if None
+            file_freq (float): Centre frequency of a raw file in Hz, None to ignore retunes
+            throttle (bool): Deliver samples in real time, or as fast as the flowgraph consumes them
+            repeat (bool): Loop over the recording, or end the flowgraph at its end
+        """
+        gr.sync_block.__init__(
+            self,
+            name='IQ File Replay',
+            in_sig=None,
+            out_sig=[np.complex64]
+        )
+        iq_file = IQFile(path, fmt, file_rate or samp_rate, file_freq)
+        self.replay = IQReplay(iq_file, samp_rate, freq, repeat)
+        self.throttle = throttle
+        self._restart_clock()
+
+    def _restart_clock(self):
+        self._clock_start = time.monotonic()
+        self._produced = 0
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+        samples = self.replay.read(len(out))
+        if not len(samples):
+            return -1  # WORK_DONE, end of a non-repeating recording
+        out[:len(samples)] = samples
+
+        if self.throttle:
+            self._produced += len(samples)
+            ahead = self._produced / self.replay.samp_rate - (time.monotonic() - self._clock_start)
+            if ahead > 0:
+                time.sleep(ahead)
+        return len(samples)
+
+    def set_frequency(self, channel, freq):
+        self.replay.set_centre_freq(freq)
+
+    def set_sample_rate(self, channel, samp_rate):
+        self.replay.set_samp_rate(samp_rate)
+        self._restart_clock()
+
+    # Front-end settings of soapy.source without meaning for a recording
+    def set_gain(self, channel, *args):
+        pass
+
+    def set_gain_mode(self, channel, automatic):
+        pass
+
+    def set_bandwidth(self, channel, bandwidth):
+        pass
+
+    def set_antenna(self, channel, antenna):
+        pass
+
+    def set_frequency_correction(self, channel, ppm):
+        pass
+
+    def set_dc_offset_mode(self, channel, automatic):
+        pass
+
+    def set_dc_offset(self, channel, offset):
+        pass
+
+    def set_iq_balance(self, channel, balance):
+        pass
+
+
+def make_source(device_args, samp_rate, freq, throttle=True):
+    """Build the source selected by a device string.
+
+    Args:
+        device_args (str): Device string, see the module docstring
+        samp_rate (float): Sample rate of the flowgraph in Hz
+        freq (float): Initial tuned frequency in Hz
+        throttle (bool): Default pacing of file replay (the throttle option overrides it)
+
+    Returns:
+        gr.sync_block: A replay or synthetic source, None for a SoapySDR device
+    """
+    if device_args.startswith('file='):
+        path, options = parse_file_args(device_args)
+        logger.info(f"Using recording {path} as the source")
+        return file_source(
+            path, samp_rate, freq,
+            fmt=options.get('format'),
+            file_rate=float(options['rate']) if 'rate' in options else None,
+            file_freq=float(options['freq']) if 'freq' in options else None,
+            throttle=bool(int(options.get('throttle', throttle))),
+        )
+    if is_synth_device(device_args):
+        logger.info("Using the synthetic FM band as the source")
+        return synth_source.from_device_args(device_args, samp_rate, freq)
+    return None
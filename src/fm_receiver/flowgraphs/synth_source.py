@@ -0,0 +1,81 @@
+"""
+Synthetic Band Source - GNU Radio Python Block
+
+Streams the IQ of a synthetic FM band (core.band_synth.BandSynth) in place of
+soapy.source, so the flowgraphs run without an SDR. It exposes the setters
+the flowgraphs call on the SoapySDR source: set_frequency retunes the
+simulated front end and set_sample_rate resamples it, the others are
+accepted and ignored.
+
+Selected with the device string "synth" (DEFAULT_BAND) or
+"synth=<band.json>" (see core.band_synth.load_band).
+
+Output:
+    - Single stream of complex64 samples at samp_rate, unthrottled
+"""
+
+import numpy as np
+from gnuradio import gr
+
+from core.band_synth import BandSynth, load_band
+
+
+def is_synth_device(device_args):
+    """True when a device string selects the synthetic band"""
+    return device_args == 'synth' or device_args.startswith('synth=')
+
+
+class synth_source(gr.sync_block):
+    """Synthetic FM band with the setters of soapy.source"""
+
+    def __init__(self, carriers=None, samp_rate=2.4e6, freq=98e6, noise_level=0.01, seed=None):
+        gr.sync_block.__init__(
+            self,
+            name='Synthetic FM Band',
+            in_sig=None,
+            out_sig=[np.complex64]
+        )
+        self.synth = BandSynth(carriers, samp_rate=samp_rate, centre_freq=freq,
+                               noise_level=noise_level, seed=seed)
+
+    @classmethod
+    def from_device_args(cls, device_args, samp_rate, freq):
+        """Build the source selected by a "synth" or "synth=<band.json>" device string"""
+        path = device_args[len('synth='):]
+        return cls(load_band(path) if path else None, samp_rate=samp_rate, freq=freq)
+
+    def work(self, input_items, output_items):
+        out = output_items[0]
+        out[:] = self.synth.generate(len(out))
+        return len(out)
+
+    def set_frequency(self, channel, freq):
+        self.synth.set_centre_freq(freq)
+
+    def set_sample_rate(self, channel, samp_rate):
+        self.synth.set_samp_rate(samp_rate)
+
+    # Front-end settings of soapy.source without meaning for a synthetic band
+    def set_gain(self, channel, *args):
+        pass
+
+    def set_gain_mode(self, channel, automatic):
+        pass
+
+    def set_bandwidth(self, channel, bandwidth):
+        pass
+
+    def set_antenna(self, channel, antenna):
+        pass
+
+    def set_frequency_correction(self, channel, ppm):
+        pass
+
+    def set_dc_offset_mode(self, channel, automatic):
+        pass
+
+    def set_dc_offset(self, channel, offset):
+        pass
+
+    def set_iq_balance(self, channel, balance):
+        pass
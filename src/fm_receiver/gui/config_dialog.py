@@ -2,12 +2,25 @@
 
 from PyQt5.QtWidgets import (
     QDialog, QVBoxLayout, QHBoxLayout, QLabel,
-    QPushButton, QComboBox, QFrame
+    QPushButton, QComboBox, QFrame, QListWidget, QListWidgetItem
 )
 from PyQt5.QtCore import Qt, QTimer
 import SoapySDR
 
 
+def device_args(device):
+    """
+    Build the SoapySDR device string of an enumerated device
+
+    Args:
+        device (SoapySDRKwargs): Device object from SoapySDR enumeration
+
+    Returns:
+        str: Device string such as "driver=rtlsdr,serial=00000001"
+    """
+    return f"driver={device['driver']},serial={device['serial']}"
+
+
 class ConfigDialog(QDialog):
     """Dialog for configuring SDR devices"""
 
@@ -25,6 +38,8 @@ class ConfigDialog(QDialog):
         self.selected_device = None
         self.devices = []
         self.device_selector = None
+        self.scan_device_list = None
+        self.scan_device_label = None
         self.device_label = None
         self.status_label = None
         self.accept_button = None
@@ -64,6 +79,15 @@ class ConfigDialog(QDialog):
         self.device_selector.setMinimumHeight(30)
         layout.addWidget(self.device_selector)
 
+        # Additional devices that split band scans with the receiver's device
+        self.scan_device_label = QLabel("Additional devices for band scans:")
+        self.scan_device_label.setStyleSheet("font-weight: bold;")
+        layout.addWidget(self.scan_device_label)
+
+        self.scan_device_list = QListWidget()
+        self.scan_device_list.setMaximumHeight(90)
+        layout.addWidget(self.scan_device_list)
+
         # Status label
         self.status_label = QLabel("")
         self.status_label.setAlignment(Qt.AlignCenter)
@@ -200,6 +224,7 @@ class ConfigDialog(QDialog):
 
             # Clear and populate combo box
             self.device_selector.clear()
+            self.scan_device_list.clear()
 
             if not self.devices:
                 self.status_label.setText(
@@ -246,6 +271,11 @@ class ConfigDialog(QDialog):
                     summary = " | ".join(parts) if parts else "SDR Device"
                     self.device_selector.addItem(summary)
 
+                    item = QListWidgetItem(summary)
+                    item.setFlags(item.flags() | Qt.ItemIsUserCheckable)
+                    item.setCheckState(Qt.Unchecked)
+                    self.scan_device_list.addItem(item)
+
                 # Auto-select single device
                 if len(self.devices) == 1 and self.auto_select_single:
                     self.device_selector.setCurrentIndex(0)
@@ -272,6 +302,10 @@ class ConfigDialog(QDialog):
             self.accept_button.setEnabled(False)
 
         finally:
+            # Parallel scanning needs a second device
+            multiple = len(self.devices) > 1
+            self.scan_device_label.setVisible(multiple)
+            self.scan_device_list.setVisible(multiple)
             self.rescan_button.setEnabled(True)
             self.rescan_button.setText("Rescan Devices")
 
@@ -294,6 +328,23 @@ class ConfigDialog(QDialog):
         """
         return self.selected_device
 
+    def get_scan_devices(self):
+        """
+        Return the additional devices checked for band scans
+
+        The selected receiver device is never included, it stays with the
+        receiver flowgraph while the other devices scan.
+
+        Returns:
+            list: SoapySDR device strings
+        """
+        devices = []
+        for index, device in enumerate(self.devices):
+            item = self.scan_device_list.item(index)
+            if item.checkState() == Qt.Checked and device is not self.selected_device:
+                devices.append(device_args(device))
+        return devices
+
     def closeEvent(self, event):
         """Handle dialog close event"""
         # Stop auto-close timer
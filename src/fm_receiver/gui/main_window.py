@@ -9,10 +9,15 @@ debugging tools for SDR-based radio reception.
 from datetime import datetime
 import logging
 import os
+import time
 
 from core.config_manager import ConfigManager
+from core.scan_planner import (DEFAULT_SCAN_RATE, SUPPORTED_SCAN_RATES,
+                               plan_incremental, plan_scan, segment_key)
+from core.station_detector import CFAR, DEFAULT_THRESHOLDS
 from flowgraphs.rds_rx import rds_rx
 from flowgraphs.MultipleRecorder import MultipleRecorder
+from flowgraphs.recorder_pool import RecorderPool
 # pylint: disable=no-name-in-module
 from PyQt5.QtCore import Qt, QThread, pyqtSignal, pyqtSlot, QTimer
 from PyQt5.QtWidgets import (QButtonGroup, QCheckBox, QComboBox, QGridLayout,
@@ -22,7 +27,7 @@ from PyQt5.QtWidgets import (QButtonGroup, QCheckBox, QComboBox, QGridLayout,
                              QTabWidget, QTextEdit, QVBoxLayout, QWidget, QAction,QFileDialog, QMessageBox)
 
 from .frequency_slider import FrequencySlider
-from .scan_thread import ScannerWorker
+from .scan_thread import ParallelScanWorker, ScannerWorker
 from .volume_slider import VolumeSlider
 from .station_button import StationButton
 from .info_window import InfoWindow
@@ -55,7 +60,7 @@ class MainWindow(QMainWindow):
         current_station_index (int): Index of current station in stations list
         samp_rate (float): SDR sample rate in Hz
     """
-    def __init__(self, config_path:str, sdr_device:str):
+    def __init__(self, config_path:str, sdr_device:str, scan_devices=()):
         """Initialize the FM Radio main window.
         
         Sets up the complete FM Radio application including GNU Radio flowgraph,
@@ -64,6 +69,8 @@ class MainWindow(QMainWindow):
         Args:
             config_path (str): Path to configuration file for persistence
             sdr_device (str): Device name, Serial number/identifier for SDR device
+            scan_devices (list): Device strings of additional SDRs that scan
+                the band in parallel, leaving sdr_device to the receiver
             
         Raises:
             RuntimeError: If GNU Radio flowgraph initialization fails
@@ -85,17 +92,34 @@ class MainWindow(QMainWindow):
         self.samp_rate = self.fm_receiver.get_samp_rate()
         self.recorders = []
         self.recorders_buttons = [] # List of station buttons that are actively recording
+        # Recorders are added and removed without stopping the receiver
+        slots = self.config_manager.get('record_slots', 4)
+        self.recorder_pool = RecorderPool(
+            self.fm_receiver,
+            (self.fm_receiver.blocks_selector_0, 1),
+            self.samp_rate,
+            slots=slots,
+            channelizer=self.fm_receiver.channelizer_bank_0,
+            channel_slots=slots if self.config_manager.get('record_channelizer', False) else 0,
+        )
         self.info:InfoWindow = None
 
         # Scanning
         self.scanning_progress = ""
-        self.thread = QThread()
+        self.scan_devices = list(scan_devices)
+        self.scan_parallel = False
+        self.thread = None
         self.worker = None
 
         # FM band range (88-108 MHz)
         self.fm_min_freq = 88.0 * 10**6
         self.fm_max_freq = 108.0 * 10**6
 
+        # Background occupancy monitor; occupancy_missed (station added by the
+        # monitor -> seconds observed without it) comes from load_config
+        self.occupancy_timer = QTimer()
+        self.occupancy_timer.timeout.connect(self.update_occupancy)
+
         # Define Widget Elements
         self.home_widget = QWidget()
         self.bottom_menu_widget = QWidget()
@@ -139,10 +163,20 @@ class MainWindow(QMainWindow):
         self.l_r_debug = self.fm_receiver._qtgui_freq_sink_x_1_0_win
         self.rds_constellation_debug = self.fm_receiver._qtgui_const_sink_x_0_win
         self.audio_debug = self.fm_receiver._qtgui_time_sink_x_0_win
+        # Flowgraph sink behind each Debug tab, attached only while it is shown
+        self.debug_tab_sinks = {
+            self.fm_demod_debug: 'fm_demod',
+            self.waterfall_debug: 'waterfall',
+            self.l_r_debug: 'l_r',
+            self.rds_constellation_debug: 'rds_constellation',
+            self.audio_debug: 'audio',
+        }
 
         self.setup_ui()
         self._init_receiver()
+        self.update_debug_sinks()
         self.fm_receiver.start()
+        self._init_occupancy_monitor()
         logger.info("Modern FM Radio UI created")
 
     def setup_ui(self):
@@ -173,6 +207,7 @@ class MainWindow(QMainWindow):
         self.stacked_widget.addWidget(self.home_widget)    # ID 0 -> Home
         self.stacked_widget.addWidget(self.stations_widget) # ID 1 -> Scan
         self.stacked_widget.addWidget(self.debug_widget)    # ID 2 -> Debug
+        self.stacked_widget.currentChanged.connect(self.update_debug_sinks)
 
         self.create_bottom_menu()
         self.main_layout.addWidget(self.stacked_widget, 1)
@@ -241,6 +276,18 @@ class MainWindow(QMainWindow):
         button_id = self.menu_button_group.id(button)
         self.stacked_widget.setCurrentIndex(button_id)
 
+    def update_debug_sinks(self):
+        """Attach the qtgui sink of the visible Debug plot and detach the others.
+
+        The sinks FFT and redraw continuously while connected, so outside the
+        Debug page the receiver only pays for demodulation.
+        """
+        names = ()
+        if self.stacked_widget.currentWidget() is self.debug_widget:
+            name = self.debug_tab_sinks.get(self.debug_tabs.currentWidget())
+            names = (name,) if name else ()
+        self.fm_receiver.set_debug_sinks(names)
+
     def create_debug_widget(self):
         """Create the debug interface with controls and visualization widgets.
         
@@ -286,7 +333,7 @@ class MainWindow(QMainWindow):
         layout.addLayout(control_layout)
 
         # Tab section
-        tab = QTabWidget()
+        tab = self.debug_tabs = QTabWidget()
 
         # RF Spectrum
         # tab.addTab(self.fm_receiver._qtgui_sink_x_0_win, 'RF Band')
@@ -306,6 +353,8 @@ class MainWindow(QMainWindow):
         # Audio Plot
         tab.addTab(self.audio_debug, 'Audio')
 
+        tab.currentChanged.connect(self.update_debug_sinks)
+
         layout.addWidget(tab)
         # RDS Data
         layout.addWidget(self.rds_panel_debug)
@@ -472,30 +521,82 @@ class MainWindow(QMainWindow):
         
         Starts background scanning process across the FM band (88-108 MHz)
         to discover available stations. Switches to wideband mode for faster
-        scanning and creates a worker thread for non-blocking operation.
-        Updates UI to show scanning progress and disables controls during scan.
+        scanning, plans the windows to visit from the scan sample rate
+        (`scan_samp_rate` in the configuration) and creates a worker thread
+        for non-blocking operation. The detection rule and its threshold come
+        from `scan_method` and `scan_threshold`. With `scan_two_pass` enabled,
+        the worker confirms and refines the coarse candidates with a
+        high-resolution pass.
+
+        With `scan_incremental` enabled, only the windows whose last full scan
+        is older than `scan_max_age_hours` are swept; the stored stations
+        elsewhere are verified with targeted high-resolution dwells. Updates UI to show scanning progress and disables controls
+        during scan.
+
+        With additional scan devices configured, the whole band is split
+        across them instead and the receiver keeps playing on its own device.
         """
 
         self.stations_button.click()
 
+        scan_rate = self.config_manager.get('scan_samp_rate', DEFAULT_SCAN_RATE)
+        if scan_rate not in SUPPORTED_SCAN_RATES:
+            logger.warning(f"Unsupported scan sample rate {scan_rate}, using {DEFAULT_SCAN_RATE}")
+            scan_rate = DEFAULT_SCAN_RATE
+        plan = plan_scan(self.fm_min_freq, self.fm_max_freq, scan_rate)
+        method = self.config_manager.get('scan_method', CFAR)
+        if method not in DEFAULT_THRESHOLDS:
+            logger.warning(f"Unknown scan detection method {method}, using {CFAR}")
+            method = CFAR
+        threshold = self.config_manager.get('scan_threshold', DEFAULT_THRESHOLDS[method])
+
+        self.scanning_progress = "Scanning In Progress: "
+        self.scan_parallel = bool(self.scan_devices)
+        if self.scan_parallel:
+            self.scan_started = time.time()
+            self._start_scan_worker(
+                ParallelScanWorker(self.scan_devices, plan, scan_rate, method, threshold)
+            )
+            return
+
         if not self.mute: # If not mutted --> Mute
             self.fm_player()
 
+        verify = []
+        self.scan_started = time.time()
+        if self.config_manager.get('scan_incremental', True):
+            plan, verify = plan_incremental(
+                plan, self.config_manager.get('scan_segments', {}), self.stations or [],
+                scan_rate, self.scan_started, self.config_manager.get('scan_max_age_hours', 24) * 3600
+            )
+
         # Post scan logic
-        self.set_freq(88e6)
+        self.samp_rate = self.fm_receiver.get_samp_rate()
+        self.fm_receiver.set_samp_rate(scan_rate) # Increase bandwidth for faster scanning
+
+        self.stop_all_recordings()
         self.fm_receiver.set_mode(0)  # Scan mode
-        self.fm_receiver.set_done(0)
         self.fm_receiver.set_freq_offset(0)
+        self.fm_receiver.set_scan_method(method)
+        self.fm_receiver.set_scan_threshold(threshold)
+        self.fm_receiver.epy_block_0.reset_stations()
 
-        self.samp_rate = self.fm_receiver.get_samp_rate()
-        self.fm_receiver.set_samp_rate(2.048e6) # Increase bandwidth for faster scanning
-
-        # Debug
-        self.scanning_progress = "Scanning In Progress: "
         self.mute_button.setDisabled(True)
 
-        # Thread setup
-        self.worker = ScannerWorker(self.fm_receiver,88e6,110e6)
+        two_pass = self.config_manager.get('scan_two_pass', True)
+        self._start_scan_worker(
+            ScannerWorker(self.fm_receiver, plan, two_pass=two_pass, verify=verify)
+        )
+
+    def _start_scan_worker(self, worker):
+        """Run a scan worker on a fresh thread, reporting to the GUI.
+
+        Args:
+            worker (QObject): ScannerWorker or ParallelScanWorker
+        """
+        self.scan_btn_home.setDisabled(True)
+        self.worker = worker
+        self.thread = QThread()
         self.worker.moveToThread(self.thread)
 
         # Signals and slots - connect first
@@ -523,17 +624,30 @@ class MainWindow(QMainWindow):
         logger.info("Done Scanning")
         self.title_label.setText("Avaliable Stations")
 
-        self.stations = self.fm_receiver.epy_block_0.get_staions()
-        self.fm_receiver.set_mode(1)
-        self.fm_receiver.set_freq_offset(250e3)
-        self.fm_receiver.set_samp_rate(self.samp_rate)
+        self.stations = list(self.worker.stations)
+        # The scan vouches for its stations now, the monitor no longer ages them
+        self.occupancy_missed = {}
+        if self.worker.completed:
+            # Record when each fully swept segment was scanned
+            segments = self.config_manager.get('scan_segments', {})
+            for centre in self.worker.plan:
+                segments[segment_key(centre)] = self.scan_started
+            self.config_manager.set('scan_segments', segments)
+            self.save_config()
+
+        if not self.scan_parallel:
+            self.fm_receiver.set_mode(1)
+            self.fm_receiver.set_freq_offset(250e3)
+            self.fm_receiver.set_samp_rate(self.samp_rate)
+        # else: the receiver kept its device and mode during the scan
 
         self.update_display()
         self.scan_btn_home.setDisabled(False)
         self.mute_button.setDisabled(False)
 
         self.home_button.click()
-        self.set_freq(self.stations[0])
+        if self.stations and not self.scan_parallel:
+            self.set_freq(self.stations[0])
 
 
     def update_display(self):
@@ -555,14 +669,16 @@ class MainWindow(QMainWindow):
         """Report scanning progress updates to the user interface.
         
         Called by the scanner thread to update the scanning progress display.
-        Updates the current frequency being scanned and accumulates progress
-        information for user feedback.
+        The scanner thread has already retuned the receiver, so this only
+        updates the frequency display and accumulates progress information
+        for user feedback.
         
         Args:
             value (float): Current frequency being scanned in Hz
         """
-        self.set_freq(value)
-        self.fm_receiver.set_done(0)
+        self.freq_label.setText(f"{value/10**6:.1f} FM")
+        self.channel_slider.setValue(value/10**6)
+        self.current_station_freq = value
         self.scanning_progress +=f"{value/1e6:.1f} MHz, "
 
         self.title_label.setText(self.scanning_progress)
@@ -726,15 +842,14 @@ class MainWindow(QMainWindow):
         1. Checks if the station's frequency is within the tunable bandwidth of the SDR 
             (based on the sample rate). If it's too far from the SDR center frequency, 
             recording is not allowed.
-        2. Stops the running FM receiver flowgraph to reconfigure connections for recording.
-        3. If the station is not already recording:
-            - Creates a new MultipleRecorder instance for the station's frequency.
-            - Connects the FM receiver's output to the recorder.
+        2. If the station is not already recording:
+            - Takes a recorder for the station's frequency from the recorder pool.
             - Updates the button's state to "recording".
             If the station is already recording:
-            - Disconnects the recorder from the FM receiver.
+            - Returns the recorder to the pool, which finishes its file.
             - Updates the button's state to "not recording".
-        4. Restarts the FM receiver flowgraph after changes.
+
+        The FM receiver keeps running throughout (see `RecorderPool`).
         """
 
         # Make sure save directory exists
@@ -749,13 +864,12 @@ class MainWindow(QMainWindow):
         # Identify which station button triggered the function
         button: StationButton = self.sender()
 
-        # Calculate the frequency offset between the SDR's tuned frequency
-        # and the button's target frequency.
-        freq_off = self.get_freq() - button.get_freq()
+        # Offset of the station from the centre of the capture, which sits
+        # freq_offset below the station being listened to
+        offset = button.get_freq() - (self.get_freq() - self.fm_receiver.get_freq_offset())
 
-        # If the offset is greater than the SDR's sample rate,
-        # the target frequency is out of range for recording.
-        if abs(freq_off) > self.fm_receiver.get_samp_rate():
+        # The whole 200 kHz channel has to be inside the captured band
+        if abs(offset) + 100e3 > self.fm_receiver.get_samp_rate() / 2:
             logger.info("Cannot record this frequency")
             self.info = InfoWindow(
                 "This channel is out of your SDR center frequency proximity",
@@ -764,10 +878,6 @@ class MainWindow(QMainWindow):
             self.info.show()
             return
 
-        # Stop the FM receiver flowgraph before reconfiguring connections
-        self.fm_receiver.stop()
-        self.fm_receiver.wait()
-
         if not button.get_recording():
             # --- Start Recording ---
             # Generate timestamped filename for recording
@@ -777,21 +887,20 @@ class MainWindow(QMainWindow):
                 f"{current_time}_{int(button.get_freq())}.wav"
             )
 
-            # Create and store the recorder instance, tuned with frequency offset
-            self.recorders.append(recorder:=
-                MultipleRecorder(
-                    fname=file_name,
-                    freq=button.get_freq(),
-                    freq_offset=int(freq_off),
+            # Start a recorder tuned with frequency offset on the capture, or
+            # on the station's channel
+            endpoint, freq_offset, input_rate = self._recorder_input(offset)
+            self.recorders.append(
+                self.recorder_pool.add(
+                    file_name,
+                    button.get_freq(),
+                    int(freq_offset),
+                    self.fm_receiver.get_samp_rate(),
+                    endpoint,
+                    input_rate,
                 )
             )
 
-            # Connect FM receiver's output channel to the new recorder
-            self.fm_receiver.connect(
-                (self.fm_receiver.blocks_selector_0, 1),
-                (recorder, 0)
-            )
-
             # Update UI button state to reflect active recording
             button.set_recording_state(True)
 
@@ -816,44 +925,58 @@ class MainWindow(QMainWindow):
                 logger.error(f"Could not find active recorder")
                 return
 
-            # Disconnect the recorder from the FM receiver
-            self.fm_receiver.disconnect(
-                (self.fm_receiver.blocks_selector_0, 1),
-                (current_recorder, 0)
-            )
+            # Stop the recorder and finish its file
+            self.recorder_pool.remove(current_recorder)
+            self._release_channelizer()
 
             # Update UI button state to reflect stopped recording
             button.set_recording_state(False)
 
             self.recorders_buttons.remove(button)
 
-        # Restart the FM receiver flowgraph after connection changes
-        self.fm_receiver.start()
+    def _recorder_input(self, offset):
+        """Choose what feeds a new recorder.
+
+        Without the channelizer (`record_channelizer` in the configuration)
+        every recorder filters the full-rate capture. With it, the capture is
+        split once by the shared PFB channelizer, and the recorder only
+        filters its station's channel, at the channel rate.
+
+        Args:
+            offset (float): Station frequency minus the capture centre in Hz
+
+        Returns:
+            tuple: (flowgraph endpoint, recorder freq_offset, recorder input_rate)
+        """
+        if not self.config_manager.get('record_channelizer', False):
+            # MultipleRecorder shifts by freq_offset + 250 kHz
+            return (self.fm_receiver.blocks_selector_0, 1), offset - 250e3, 0
+
+        channelizer = self.fm_receiver.channelizer_bank_0
+        self.fm_receiver.set_channelizer_enabled(1)
+        index, residual = channelizer.channel(offset)
+        return (channelizer, index), residual - 250e3, channelizer.get_channel_rate()
 
+    def _release_channelizer(self):
+        """Take the channelizer out of the flowgraph once no recorder uses it"""
+        channelizer = self.fm_receiver.channelizer_bank_0
+        if not any(block is channelizer for block, _ in self.recorder_pool.inputs.values()):
+            self.fm_receiver.set_channelizer_enabled(0)
 
     def stop_all_recordings(self):
         """
         This function will stop any current recording streams.
         """
         if len(self.recorders) > 0:
-            # Stop the FM receiver flowgraph before making changes
-            self.fm_receiver.stop()
-            self.fm_receiver.wait()
-
             # Copy lists to avoid modification during iteration
             recorders_to_stop = self.recorders.copy()
             buttons_to_update = self.recorders_buttons.copy()
 
             # Stop all recordings
-            for recorder in recorders_to_stop:
-                # Disconnect the recorder from the FM receiver
-                try:
-                    self.fm_receiver.disconnect(
-                        (self.fm_receiver.blocks_selector_0, 1),
-                        (recorder, 0)
-                    )
-                except Exception as e:
-                    logger.warning(f"Error disconnecting recorder: {e}")
+            try:
+                self.recorder_pool.remove_all()
+            except Exception as e:
+                logger.warning(f"Error disconnecting recorders: {e}")
 
             # Update button states
             for button in buttons_to_update:
@@ -862,9 +985,7 @@ class MainWindow(QMainWindow):
             # Clear the recording lists
             self.recorders.clear()
             self.recorders_buttons.clear()
-
-            # Restart the FM receiver flowgraph
-            self.fm_receiver.start()
+            self._release_channelizer()
 
             self.info = InfoWindow(
                 "All recording stopped",
@@ -905,6 +1026,9 @@ class MainWindow(QMainWindow):
         self.stations = self.config_manager.get('stations')
         self.volume = self.config_manager.get('volume')
         self.outdir = self.config_manager.get('outdir')
+        self.occupancy_missed = {
+            float(freq): missed for freq, missed in self.config_manager.get('occupancy_missed', {}).items()
+        }
         # self.outdir = os.path.join((os.getcwd()),"downloads")
 
     def _init_receiver(self):
@@ -924,6 +1048,68 @@ class MainWindow(QMainWindow):
         self.fm_receiver.blocks_wavfile_sink_0.close()
 
 
+    def _init_occupancy_monitor(self):
+        """Start the background band-occupancy monitor if enabled.
+
+        The monitor taps the source stream at a low rate while listening
+        (`occupancy_monitor` in the configuration) and is polled every
+        `occupancy_interval` seconds.
+        """
+        if not self.config_manager.get('occupancy_monitor', False):
+            return
+        self.fm_receiver.set_monitor_enabled(1)
+        self.occupancy_timer.start(int(self.config_manager.get('occupancy_interval', 5) * 1000))
+
+    def update_occupancy(self):
+        """Sync the stations list with the occupancy monitor.
+
+        New channels of the band currently captured for listening are
+        added. A station the monitor added is removed again once the
+        monitor has observed its channel for `occupancy_max_age` seconds
+        without seeing it, unless it is the station playing. Time spent
+        tuned elsewhere does not count, and stations found by a scan are
+        left to the next scan. Nothing is done while a scan owns the
+        receiver, or while recordings hold on to the station buttons that
+        update_display() rebuilds.
+        """
+        if self.fm_receiver.get_mode() != 1 or self.recorders:
+            return
+        found = self.fm_receiver.epy_block_2.get_stations()
+        observed = self.fm_receiver.epy_block_2.get_candidates()
+        interval = self.config_manager.get('occupancy_interval', 5)
+        max_age = self.config_manager.get('occupancy_max_age', 300)
+
+        def near(freq, freqs):
+            return any(abs(freq - other) < 50e3 for other in freqs)
+
+        stale = []
+        for station, missed in list(self.occupancy_missed.items()):
+            if station not in self.stations:
+                del self.occupancy_missed[station]
+            elif near(station, found):
+                self.occupancy_missed[station] = 0
+            elif near(station, observed) and abs(station - self.current_station_freq) >= 50e3:
+                self.occupancy_missed[station] = missed + interval
+                if self.occupancy_missed[station] >= max_age:
+                    stale.append(station)
+
+        new = [
+            freq for freq in found
+            if self.fm_min_freq <= freq <= self.fm_max_freq
+            and all(abs(freq - station) > 100e3 for station in self.stations)
+        ]
+        if not new and not stale:
+            return
+        if new:
+            logger.info(f"Occupancy monitor found {[f / 1e6 for f in new]} MHz")
+        if stale:
+            logger.info(f"Occupancy monitor lost {[f / 1e6 for f in stale]} MHz")
+        for station in stale:
+            del self.occupancy_missed[station]
+        self.occupancy_missed.update((freq, 0) for freq in new)
+        self.stations = [station for station in self.stations if station not in stale] + new
+        self.update_display()
+
     def save_config(self):
         """Save current application state to persistent storage.
         
@@ -933,6 +1119,9 @@ class MainWindow(QMainWindow):
         self.config_manager.set('stations', self.stations)
         self.config_manager.set('volume',self.volume)
         self.config_manager.set('outdir',self.outdir)
+        self.config_manager.set('occupancy_missed', {
+            str(int(round(freq))): missed for freq, missed in self.occupancy_missed.items()
+        })
         self.config_manager.save()
 
     def set_mute(self,x:bool):
@@ -1,6 +1,10 @@
 import logging
+import time
 
-from PyQt5.QtCore import QObject, QThread, pyqtSignal
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from core.scan_planner import plan_refine
+from scanner_app import ParallelScanner
 
 logger = logging.getLogger(__name__)
 
@@ -8,44 +12,188 @@ class ScannerWorker(QObject):
     progress = pyqtSignal(float)      # Emitting current frequency
     finished = pyqtSignal(bool)       # Emitting stations when done
 
-    def __init__(self, fm_receiver, start_freq, end_freq):
+    # Seconds between checks of the stop flag while blocked on the detector
+    STOP_POLL_INTERVAL = 0.5
+
+    def __init__(self, fm_receiver, plan, two_pass=False, verify=()):
+        """
+        Args:
+            fm_receiver (rds_rx): Receiver flowgraph in scan mode
+            plan (list): Window centre frequencies in Hz, see core.scan_planner.plan_scan
+            two_pass (bool): Confirm and refine the coarse candidates with a
+                high-resolution pass over the windows that contain them
+            verify (list): Known station frequencies in Hz to confirm with
+                targeted high-resolution dwells instead of full windows
+        """
         super().__init__()
         self.fm_receiver = fm_receiver
         self._is_running = True
-        self.start_freq = start_freq
-        self.end_freq = end_freq
+        self.plan = list(plan)
+        self.two_pass = two_pass
+        self.verify = list(verify)
+        self.stations = []
+        self.completed = False
 
-        self.progress.emit(start_freq)
         logger.info("Initialized scanning monitor")
 
     def run(self):
+        step_overheads = []
         try:
-            freq = self.start_freq
             logger.info("Running scanning monitor")
+            coarse = []
+            if self.plan:
+                self.fm_receiver.set_scan_pass(0)
+                detector = self.fm_receiver.epy_block_0
+                if not self._run_pass(self.plan, detector, step_overheads):
+                    return
+                coarse = detector.get_staions()
 
-            while self._is_running:
-                while self.fm_receiver.get_done() == 0:
-                    if not self._is_running:
-                        return
-                    QThread.msleep(10)  # Don't hog the CPU
-                logger.info(f"Scanning {freq}")
-                freq += 1e6
-                if freq > self.end_freq:
-                    break
+            targets = coarse if self.two_pass else []
+            self.stations = sorted(set(coarse) - set(targets))
 
-                self.progress.emit(freq)
-
-                while self.fm_receiver.get_done() == 1:
-                    if not self._is_running:
-                        return
-                    QThread.msleep(10)
+            targets = sorted(set(targets) | set(self.verify))
+            if targets and self._is_running:
+                confirmed = self._refine(targets, step_overheads)
+                if confirmed is None:
+                    return
+                self.stations = sorted(set(self.stations) | set(confirmed))
+            self.completed = self._is_running
 
         except Exception as e:
             logger.exception(f"Error during scanning: {e}")
 
         finally:
+            # Disarm both detectors and gate the refine FFT off again
+            self.fm_receiver.set_scan_pass(0)
+            if step_overheads:
+                logger.info(
+                    f"Scan step overhead: mean {sum(step_overheads) / len(step_overheads) * 1e3:.3f} ms, "
+                    f"max {max(step_overheads) * 1e3:.3f} ms over {len(step_overheads)} steps"
+                )
             # Always mark scan as finished, even on error
             self.finished.emit(True)
 
+    def _refine(self, candidates, step_overheads):
+        """Visit only the windows holding candidates, at high resolution.
+
+        Returns:
+            list: Confirmed stations in Hz, None when the scan was stopped
+        """
+        refine_plan = plan_refine(candidates, self.fm_receiver.get_samp_rate())
+        detector = self.fm_receiver.epy_block_1
+        detector.reset_stations()
+
+        self.fm_receiver.set_scan_pass(1)
+        if not self._run_pass(refine_plan, detector, step_overheads):
+            return None
+        stations = detector.get_staions()
+        logger.info(f"Refine pass confirmed {len(stations)} of {len(candidates)} candidates")
+        return stations
+
+    def _arm(self, step):
+        # Retune and re-arm the detector directly from this thread,
+        # the GUI is only notified for display
+        if isinstance(step, tuple):
+            freq, targets = step
+            self.fm_receiver.set_scan_targets(targets)
+        else:
+            freq = step
+        self.fm_receiver.set_scan_freq(freq / 1e6)
+        self.fm_receiver.set_done(0)
+        return freq
+
+    def _run_pass(self, steps, detector, step_overheads):
+        """Step through one scan pass.
+
+        Args:
+            steps (list): Window centres in Hz, or (centre, targets) tuples
+            detector (blk): Detector block armed by set_done(0) in this pass
+
+        Returns:
+            bool: False when the scan was stopped while waiting on the detector
+        """
+        done_event = self.fm_receiver.done_event
+        freq = self._arm(steps[0])
+        step_start = time.perf_counter()
+        self.progress.emit(freq)
+
+        for index in range(len(steps)):
+            # Block on the detector's completion event instead of polling
+            while not done_event.wait(self.STOP_POLL_INTERVAL):
+                if not self._is_running:
+                    return False
+            detected = time.perf_counter()
+
+            dwell = detector.get_last_dwell()
+            logger.info(f"Scanned {freq / 1e6:.1f} MHz in {dwell:.2f} s")
+            if index + 1 == len(steps) or not self._is_running:
+                break
+
+            freq = self._arm(steps[index + 1])
+            retuned = time.perf_counter()
+
+            step_overheads.append(retuned - detected)
+            logger.debug(
+                f"Scan step {freq / 1e6:.1f} MHz: dwell {detected - step_start:.3f} s, "
+                f"retune overhead {(retuned - detected) * 1e3:.3f} ms"
+            )
+            step_start = retuned
+
+            self.progress.emit(freq)
+        return True
+
     def stop(self):
         self._is_running = False
+
+
+class ParallelScanWorker(QObject):
+    """Scans the band on the additional scan devices, off the receiver's SDR.
+
+    The plan is split across the devices by scanner_app.ParallelScanner, each
+    running its own fm_scanner flowgraph, while the receiver flowgraph keeps
+    its own device. Emits the same signals as ScannerWorker.
+    """
+    progress = pyqtSignal(float)      # Emitting window centres as they are captured
+    finished = pyqtSignal(bool)       # Emitting when done
+
+    def __init__(self, devices, plan, samp_rate, method, threshold):
+        """
+        Args:
+            devices (list): SoapySDR device strings of the scan devices
+            plan (list): Window centre frequencies in Hz
+            samp_rate (float): Capture sample rate in Hz
+            method (str): Detection rule, see core.station_detector
+            threshold (float): Detection threshold
+        """
+        super().__init__()
+        self.devices = list(devices)
+        self.plan = list(plan)
+        self.samp_rate = samp_rate
+        self.method = method
+        self.threshold = threshold
+        self.scanner = None
+        self.stations = []
+        self.completed = False
+
+        logger.info(f"Initialized parallel scanning on {len(self.devices)} devices")
+
+    def run(self):
+        try:
+            self.scanner = ParallelScanner(self.devices, samp_rate=self.samp_rate,
+                                           method=self.method, threshold=self.threshold)
+            self.stations = self.scanner.scan_plan(self.plan, self.progress.emit)
+            self.completed = not self.scanner.stopped
+
+        except Exception as e:
+            logger.exception(f"Error during parallel scanning: {e}")
+
+        finally:
+            if self.scanner is not None:
+                self.scanner.close()
+            self.scanner = None
+            self.finished.emit(True)
+
+    def stop(self):
+        scanner = self.scanner
+        if scanner is not None:
+            scanner.stop()
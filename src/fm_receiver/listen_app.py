@@ -0,0 +1,54 @@
+"""
+Headless Listening Application
+"""
+import logging
+import sys
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+def listen(device_args, freq, volume=-5, tau=75e-6, fname='', audio=True, seconds=None, on_rds=None):
+    """Play and/or record one station with the Qt-free receiver flowgraph.
+
+    Args:
+        device_args (str): Device string, as for main.py --source
+        freq (float): Station frequency in Hz
+        volume (float): Volume in dB
+        tau (float): De-emphasis time constant in seconds
+        fname (str): WAV file to record to, '' for none
+        audio (bool): Play through the default sound card
+        seconds (float): Stop after this many seconds, None to run until interrupted
+        on_rds (callable): Called as on_rds(field, text) for each RDS update
+
+    Returns:
+        dict: The last RDS text of each field
+    """
+    # GNU Radio is only imported here; Qt widgets are never created on this path
+    from flowgraphs.rds_rx_headless import rds_rx_headless
+
+    receiver = rds_rx_headless(device_arguments=device_args, audio_device='' if audio else None,
+                               fname=fname, rds_callback=on_rds)
+    receiver.set_freq(freq / 1e6)
+    receiver.set_volume(volume)
+    receiver.set_tau(tau)
+    receiver.set_mute(0)
+
+    logger.info(f"Listening to {freq / 1e6:.1f} MHz" + (f", recording to {fname}" if fname else ""))
+    receiver.start()
+    try:
+        # An Event wait stays interruptible by Ctrl-C, unlike top_block.wait()
+        threading.Event().wait(seconds)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        receiver.stop()
+        receiver.wait()
+        if fname:
+            receiver.stop_recording()
+    return receiver.get_rds()
+
+
+def print_rds(field, text):
+    """RDS callback writing one line per update to stdout"""
+    print(f"{field}: {text}", file=sys.stdout, flush=True)
@@ -5,13 +5,9 @@ FM Receiver Application Entry Point
 import argparse
 import sys
 
-from flowgraphs import rds_rx_epy_block_0
-sys.modules["rds_rx_epy_block_0"] = rds_rx_epy_block_0
-
-from app import FMReceiverApp
-from qtpy.QtWidgets import QApplication
+from core.scan_planner import DEFAULT_SCAN_RATE, SUPPORTED_SCAN_RATES
+from core.station_detector import CFAR, DEFAULT_THRESHOLDS
 from utils.logging_config import setup_logging
-from gui.config_dialog import ConfigDialog
 
 def parse_arguments():
     """Parse command line arguments"""
@@ -20,37 +16,164 @@ def parse_arguments():
                        help='Enable debug logging')
     parser.add_argument('--config', type=str,
                        help='Path to configuration file')
+    parser.add_argument('--source', type=str,
+                       help='Source instead of the device dialog: a SoapySDR device string, '
+                            'file=<path>[,format=cf32|cs16|cs8|cu8][,rate=Hz][,freq=Hz][,throttle=0|1] '
+                            'for a recording (raw or SigMF), or synth[=band.json]')
+
+    subparsers = parser.add_subparsers(dest='command')
+    scan = subparsers.add_parser('scan', help='Scan the FM band without the GUI and print the stations')
+    scan.add_argument('--device', type=str, action='append',
+                      help='Device string as for --source (recordings replay unthrottled); '
+                           'repeat to split the band across devices (default: --source or driver=rtlsdr)')
+    scan.add_argument('--samp-rate', type=float, default=DEFAULT_SCAN_RATE,
+                      choices=SUPPORTED_SCAN_RATES, help='Scan sample rate in Hz')
+    scan.add_argument('--start', type=float, default=88e6,
+                      help='Lowest station frequency in Hz')
+    scan.add_argument('--end', type=float, default=108e6,
+                      help='Highest station frequency in Hz')
+    scan.add_argument('--dwell', type=float, default=0.5,
+                      help='Seconds of data analysed per window')
+    scan.add_argument('--method', choices=sorted(DEFAULT_THRESHOLDS), default=CFAR,
+                      help='Station detection rule')
+    scan.add_argument('--threshold', type=float,
+                      help='Detection threshold: fraction of the strongest candidate (minmax, '
+                           'default 0.3) or standard deviations of the averaged noise above '
+                           'the floor (cfar, default 5)')
+    scan.add_argument('--format', choices=['json', 'csv'], default='json',
+                      help='Output format')
+    scan.add_argument('--output', type=str, default='-',
+                      help='Output file, - for stdout')
+
+    extract = subparsers.add_parser('extract', help='Demodulate every station of an IQ recording to audio files')
+    extract.add_argument('recording', type=str,
+                         help='Raw IQ file (cf32, cs16, cs8, cu8) or SigMF recording')
+    extract.add_argument('--iq-format', choices=['cf32', 'cs16', 'cs8', 'cu8'],
+                         help='Raw IQ format (default: from the file extension)')
+    extract.add_argument('--rate', type=float,
+                         help='Sample rate of a raw recording in Hz')
+    extract.add_argument('--freq', type=float,
+                         help='Centre frequency of a raw recording in Hz')
+    extract.add_argument('--stations', type=float, nargs='+',
+                         help='Station frequencies in Hz (default: detected from the recording)')
+    extract.add_argument('--outdir', type=str, default='.',
+                         help='Directory for the audio files')
+    extract.add_argument('--audio-format', choices=['wav', 'flac'], default='wav',
+                         help='Audio file format')
+    extract.add_argument('--workers', type=int,
+                         help='Worker processes (default: one per CPU)')
+    extract.add_argument('--engine', choices=['gnuradio', 'numpy'], default='gnuradio',
+                         help='Demodulate with the MultipleRecorder flowgraph or the NumPy engine (WAV only)')
+
+    listen = subparsers.add_parser('listen', help='Play or record a station without the GUI, printing RDS')
+    listen.add_argument('freq', type=float,
+                        help='Station frequency in Hz')
+    listen.add_argument('--volume', type=float, default=-5,
+                        help='Volume in dB')
+    listen.add_argument('--tau', type=float, default=75e-6,
+                        help='De-emphasis time constant in seconds (75e-6 Americas, 50e-6 Europe)')
+    listen.add_argument('--record', type=str, default='',
+                        help='WAV file to record the station to')
+    listen.add_argument('--no-audio', action='store_true',
+                        help='Do not open the sound card (servers)')
+    listen.add_argument('--seconds', type=float,
+                        help='Stop after this many seconds (default: until interrupted)')
     return parser.parse_args()
 
-def main():
-    """Main application entry point"""
-    args = parse_arguments()
+def run_scan(args):
+    """Run a headless band scan and write the stations"""
+    from scanner_app import HeadlessScanner, ParallelScanner, write_stations
+
+    devices = args.device or [args.source or 'driver=rtlsdr']
+    options = dict(samp_rate=args.samp_rate, dwell=args.dwell,
+                   method=args.method, threshold=args.threshold)
+    if len(devices) > 1:
+        scanner = ParallelScanner(devices, **options)
+    else:
+        scanner = HeadlessScanner(device_args=devices[0], **options)
+    try:
+        stations = scanner.scan(args.start, args.end)
+    finally:
+        scanner.close()
+
+    metadata = {'devices': devices, 'samp_rate': args.samp_rate,
+                'start': args.start, 'end': args.end, 'method': args.method}
+    if args.output == '-':
+        write_stations(stations, sys.stdout, args.format, **metadata)
+    else:
+        with open(args.output, 'w', newline='') as f:
+            write_stations(stations, f, args.format, **metadata)
+    return 0
 
-    # Setup logging
-    setup_logging(debug=args.debug)
+def run_extract(args):
+    """Extract the audio of every station of a recording"""
+    from extract_app import extract_all
 
+    files = extract_all(args.recording, args.outdir, stations=args.stations,
+                        fmt=args.iq_format, samp_rate=args.rate, centre_freq=args.freq,
+                        audio_format=args.audio_format, workers=args.workers,
+                        engine=args.engine)
+    for fname in files:
+        print(fname)
+    return 0
+
+def run_listen(args):
+    """Play or record a station with the headless receiver"""
+    from listen_app import listen, print_rds
+
+    listen(args.source or 'driver=rtlsdr', args.freq, volume=args.volume, tau=args.tau,
+           fname=args.record, audio=not args.no_audio, seconds=args.seconds,
+           on_rds=print_rds)
+    return 0
+
+def run_gui(args):
+    """Run the Qt receiver application"""
+    from app import FMReceiverApp
+    from qtpy.QtWidgets import QApplication
+    from gui.config_dialog import ConfigDialog, device_args
 
     # Create Qt application
     app = QApplication(sys.argv)
     app.setApplicationName("FM Receiver")
     app.setApplicationVersion("0.1.0")
 
-    config_dialog = ConfigDialog()
-    result = config_dialog.exec_()  # blocks until user responds
+    if args.source:
+        # Recording, synthetic band or explicit device, no dialog
+        sdr_device = args.source
+        scan_devices = []
+    else:
+        config_dialog = ConfigDialog()
+        result = config_dialog.exec_()  # blocks until user responds
 
-    if result != config_dialog.Accepted:
-        sys.exit(0)
+        if result != config_dialog.Accepted:
+            return 0
 
-    # If accepted, launch main app
-    sdr_serial = config_dialog.get_selected_device()['serial']
-    sdr_driver = config_dialog.get_selected_device()['driver']
-    sdr_device = f"driver={sdr_driver},serial={sdr_serial}"
+        # If accepted, launch main app
+        sdr_device = device_args(config_dialog.get_selected_device())
+        scan_devices = config_dialog.get_scan_devices()
 
-    fm_app = FMReceiverApp(config_path=args.config,selected_device=sdr_device)
+    fm_app = FMReceiverApp(config_path=args.config,selected_device=sdr_device,
+                           scan_devices=scan_devices)
     fm_app.show()
 
     # Run event loop
-    sys.exit(app.exec_())
+    return app.exec_()
+
+def main():
+    """Main application entry point"""
+    args = parse_arguments()
+
+    # Setup logging, keeping stdout free for scan, extract and RDS results
+    setup_logging(debug=args.debug,
+                  stream=sys.stderr if args.command in ('scan', 'extract', 'listen') else None)
+
+    # Qt and the qtgui flowgraph are only imported for the GUI
+    if args.command == 'scan':
+        sys.exit(run_scan(args))
+    if args.command == 'extract':
+        sys.exit(run_extract(args))
+    if args.command == 'listen':
+        sys.exit(run_listen(args))
+    sys.exit(run_gui(args))
 if __name__ == '__main__':
     main()
-    
\ No newline at end of file
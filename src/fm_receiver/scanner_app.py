@@ -0,0 +1,218 @@
+"""
+Headless Band Scanner Application
+"""
+import csv
+import json
+import logging
+import math
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from core.scan_pipeline import DetectionPipeline
+from core.scan_planner import DEFAULT_SCAN_RATE, merge_stations, plan_scan, split_plan
+from core.station_detector import CFAR, DEFAULT_THRESHOLDS, window_setup
+
+logger = logging.getLogger(__name__)
+
+
+class HeadlessScanner:
+    """Scans a band with the Qt-free fm_scanner flowgraph.
+
+    Each window of the scan plan is captured by retuning the source, resetting
+    the head and sink blocks and running the top block to completion. The
+    streaming sink only keeps the per-bin sums, so memory use does not grow
+    with the dwell. The averaged spectrum of the window is handed to a
+    DetectionPipeline, so detection of one window overlaps with the capture
+    of the next.
+    """
+
+    def __init__(self, device_args="driver=rtlsdr", samp_rate=DEFAULT_SCAN_RATE,
+                 dwell=0.5, settle_time=0.02, method=CFAR, threshold=None):
+        """
+        Args:
+            device_args (str): SoapySDR device string, or file=<path.cf32>
+                for a looping recording standing in for a dongle
+            samp_rate (float): Capture sample rate in Hz
+            dwell (float): Seconds of data analysed per window
+            settle_time (float): Seconds discarded after each retune
+            method (str): Detection rule, see core.station_detector
+            threshold (float): Detection threshold, the method's default if None
+        """
+        # GNU Radio is only imported here, Qt is never imported on this path
+        from flowgraphs.fm_scanner import fm_scanner
+
+        self.device_args = device_args
+        self.samp_rate = samp_rate
+        self.dwell = dwell
+        self.stopped = False
+        self.settle_time = settle_time
+        if threshold is None:
+            threshold = DEFAULT_THRESHOLDS[method]
+        self.pipeline = DetectionPipeline(threshold, pipelined=True, method=method)
+
+        self.top_block = fm_scanner(device_args=device_args, samp_rate=samp_rate)
+        self.fft_size = self.top_block.get_fft_size()
+
+        # Whole integrated batches only, with the settling guard in front of the dwell
+        batch_items = self.top_block.get_scan_batch() * self.fft_size
+        settle_batches = math.ceil(settle_time * samp_rate / batch_items)
+        dwell_batches = math.ceil(dwell * samp_rate / batch_items)
+        self.top_block.set_skip(settle_batches)
+        self.top_block.set_num_items((settle_batches + dwell_batches) * batch_items)
+
+    def scan(self, start_freq, end_freq):
+        """Scan a band and return the merged stations.
+
+        Args:
+            start_freq (float): Lowest station frequency in Hz
+            end_freq (float): Highest station frequency in Hz
+
+        Returns:
+            list: Sorted station frequencies in Hz
+        """
+        return self.scan_plan(plan_scan(start_freq, end_freq, self.samp_rate))
+
+    def scan_plan(self, plan, progress=None):
+        """Capture every window of a plan and return the merged stations.
+
+        Args:
+            plan (list): Window centre frequencies in Hz
+            progress (callable): Called with each window centre once captured
+
+        Returns:
+            list: Sorted station frequencies in Hz; the per-window detections
+            stay available in self.pipeline.detections
+        """
+        self.pipeline.reset()
+        self.stopped = False
+
+        scan_start = time.perf_counter()
+        for freq in plan:
+            if self.stopped:
+                logger.info(f"{self.device_args}: scan stopped")
+                break
+            window_start = time.perf_counter()
+            self.capture(freq)
+            logger.info(
+                f"{self.device_args}: scanned {freq / 1e6:.1f} MHz in "
+                f"{time.perf_counter() - window_start:.2f} s"
+            )
+            if progress is not None:
+                progress(freq)
+
+        stations = self.pipeline.results()
+        logger.info(
+            f"{self.device_args}: found {len(stations)} stations in {len(plan)} windows, "
+            f"{time.perf_counter() - scan_start:.2f} s"
+        )
+        return stations
+
+    def stop(self):
+        """Stop the scan after the window being captured"""
+        self.stopped = True
+
+    def close(self):
+        """Stop the detection thread once the scans are over"""
+        self.pipeline.close()
+
+    def capture(self, freq):
+        """Capture one window and queue its detection"""
+        tb = self.top_block
+        tb.set_freq(freq)
+        tb.blocks_head_0.reset()
+        tb.epy_block_0.reset()
+        tb.run()
+
+        # The sink reuses its spectrum buffer, the pipeline gets a copy
+        spectrum = tb.epy_block_0.mean_spectrum().copy()
+        candidate_freqs, _, mask = window_setup(float(round(freq)), self.samp_rate, self.fft_size)
+        self.pipeline.submit(spectrum, mask, candidate_freqs, tb.epy_block_0.get_frames())
+
+
+class ParallelScanner:
+    """Splits a band scan across several SDRs scanning at the same time.
+
+    The plan is cut into one contiguous run of windows per device, and each
+    device runs its own fm_scanner top block on a thread (the flowgraphs run
+    in GNU Radio's own threads, so the GIL is not held while capturing). The
+    detections of all devices are merged at the end, which makes the scan
+    time fall roughly linearly with the number of devices.
+    """
+
+    def __init__(self, devices, **options):
+        """
+        Args:
+            devices (list): SoapySDR device strings (or file=<path> stand-ins)
+            **options: HeadlessScanner options shared by every device
+        """
+        self.scanners = [HeadlessScanner(device_args=device, **options) for device in devices]
+        self.samp_rate = self.scanners[0].samp_rate
+
+    def scan(self, start_freq, end_freq, progress=None):
+        """Scan a band on all devices and return the merged stations"""
+        return self.scan_plan(plan_scan(start_freq, end_freq, self.samp_rate), progress)
+
+    def scan_plan(self, plan, progress=None):
+        """Scan a plan split across all devices and return the merged stations"""
+        chunks = split_plan(plan, len(self.scanners))
+        scan_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=len(chunks), thread_name_prefix="scan-device") as pool:
+            futures = [
+                pool.submit(scanner.scan_plan, chunk, progress)
+                for scanner, chunk in zip(self.scanners, chunks)
+            ]
+            for future in futures:
+                future.result()
+
+        detections = {}
+        for scanner in self.scanners[:len(chunks)]:
+            for station, power in scanner.pipeline.detections.items():
+                detections[station] = max(power, detections.get(station, 0.0))
+        stations = merge_stations(detections)
+
+        logger.info(
+            f"Found {len(stations)} stations with {len(chunks)} devices in "
+            f"{time.perf_counter() - scan_start:.2f} s"
+        )
+        return stations
+
+    @property
+    def stopped(self):
+        return any(scanner.stopped for scanner in self.scanners)
+
+    def stop(self):
+        """Stop every device after the window it is capturing"""
+        for scanner in self.scanners:
+            scanner.stop()
+
+    def close(self):
+        """Stop the detection threads of every device"""
+        for scanner in self.scanners:
+            scanner.close()
+
+
+def write_stations(stations, stream, fmt="json", **metadata):
+    """Write scan results as JSON or CSV.
+
+    Args:
+        stations (list): Station frequencies in Hz
+        stream (file): Open text stream to write to
+        fmt (str): "json" or "csv"
+        **metadata: Extra fields recorded in the JSON output
+    """
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(["freq_hz", "freq_mhz"])
+        for station in stations:
+            writer.writerow([int(station), f"{station / 1e6:.1f}"])
+        return
+
+    result = {
+        "scanned_at": datetime.now(timezone.utc).isoformat(),
+        **metadata,
+        "stations": [int(station) for station in stations],
+    }
+    json.dump(result, stream, indent=2)
+    stream.write("\n")
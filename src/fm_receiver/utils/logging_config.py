@@ -6,8 +6,12 @@ import sys
 from pathlib import Path
 
 
-def setup_logging(debug=False):
-    """Setup application logging"""
+def setup_logging(debug=False, stream=None):
+    """Setup application logging
+
+    Console output goes to stdout unless another stream is given, e.g.
+    stderr when stdout carries the scan results.
+    """
 
     # Create logs directory
     log_dir = Path.home() / '.fm_receiver' / 'logs'
@@ -22,7 +26,7 @@ def setup_logging(debug=False):
     )
 
     # Console handler
-    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler = logging.StreamHandler(stream or sys.stdout)
     console_handler.setLevel(level)
     console_handler.setFormatter(formatter)
 
@@ -0,0 +1,74 @@
+import json
+
+import numpy as np
+import pytest
+
+from core.iq_file import IQFile, IQReplay
+
+
+def test_raw_formats_scale_to_unit_range(tmp_path):
+    path = tmp_path / "capture.cu8"
+    np.array([255, 0, 127, 128], dtype=np.uint8).tofile(path)
+    samples = IQFile(str(path), samp_rate=1e6).read(0, 2)
+    np.testing.assert_allclose(samples, [1 - 1j, -0.5 / 127.5 + 0.5j / 127.5], atol=1e-6)
+
+
+def test_read_wraps_at_the_end(tmp_path):
+    path = tmp_path / "capture.cf32"
+    iq = (np.arange(10) + 1j * np.arange(10)).astype(np.complex64)
+    iq.tofile(path)
+    np.testing.assert_array_equal(IQFile(str(path)).read(8, 4), iq[[8, 9, 0, 1]])
+
+
+def test_sigmf_metadata(tmp_path):
+    np.zeros(8, dtype=np.int16).tofile(tmp_path / "rec.sigmf-data")
+    meta = {"global": {"core:datatype": "ci16_le", "core:sample_rate": 2.4e6},
+            "captures": [{"core:frequency": 98e6}]}
+    (tmp_path / "rec.sigmf-meta").write_text(json.dumps(meta))
+    iq_file = IQFile(str(tmp_path / "rec.sigmf-meta"))
+    assert (iq_file.fmt, iq_file.samp_rate, iq_file.centre_freq, len(iq_file)) == ("cs16", 2.4e6, 98e6, 4)
+
+
+def test_unknown_format(tmp_path):
+    path = tmp_path / "capture.bin"
+    path.write_bytes(b"\0" * 8)
+    with pytest.raises(ValueError):
+        IQFile(str(path))
+
+
+def test_replay_retune_translates_the_spectrum(tmp_path):
+    samp_rate, tone = 1e6, 100e3
+    path = tmp_path / "tone.cf32"
+    np.exp(2j * np.pi * tone * np.arange(2**14) / samp_rate).astype(np.complex64).tofile(path)
+
+    replay = IQReplay(IQFile(str(path), samp_rate=samp_rate, centre_freq=98e6), centre_freq=98.05e6)
+    samples = np.concatenate([replay.read(1000), replay.read(3096)])
+    freqs = np.fft.fftfreq(len(samples), 1 / samp_rate)
+    assert freqs[np.argmax(np.abs(np.fft.fft(samples)))] == pytest.approx(tone - 50e3, abs=samp_rate / len(samples))
+
+
+def test_replay_without_repeat_stops_at_the_end(tmp_path):
+    path = tmp_path / "short.cf32"
+    np.ones(100, dtype=np.complex64).tofile(path)
+    replay = IQReplay(IQFile(str(path), samp_rate=1e6), repeat=False)
+    assert len(replay.read(60)) == 60
+    assert len(replay.read(60)) == 40
+    assert len(replay.read(60)) == 0
+
+
+def test_replay_at_a_lower_rate_does_not_fold_out_of_band_stations(tmp_path):
+    file_rate, samp_rate = 3.2e6, 2.4e6
+    path = tmp_path / "band.cf32"
+    t = np.arange(2**16) / file_rate
+    # An in-band station at +200 kHz and one at +1.4 MHz, beyond the replay's Nyquist frequency
+    (np.exp(2j * np.pi * 200e3 * t) + np.exp(2j * np.pi * 1.4e6 * t)).astype(np.complex64).tofile(path)
+
+    replay = IQReplay(IQFile(str(path), samp_rate=file_rate), samp_rate=samp_rate)
+    samples = np.concatenate([replay.read(5000) for _ in range(4)])[2**12:]
+    spectrum = np.abs(np.fft.fft(samples * np.hanning(len(samples))))
+    freqs = np.fft.fftfreq(len(samples), 1 / samp_rate)
+
+    assert freqs[np.argmax(spectrum)] == pytest.approx(200e3, abs=samp_rate / len(samples))
+    # Without a filter the +1.4 MHz station would appear at -1.0 MHz
+    folded = spectrum[np.argmin(np.abs(freqs + 1.0e6))]
+    assert 20 * np.log10(folded / spectrum.max()) < -50
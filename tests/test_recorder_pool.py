@@ -0,0 +1,62 @@
+import pytest
+
+gr = pytest.importorskip("gnuradio.gr")
+blocks = pytest.importorskip("gnuradio.blocks")
+
+from flowgraphs.channelizer import channelizer_bank  # noqa: E402
+from flowgraphs.recorder_pool import RecorderPool  # noqa: E402
+
+SAMP_RATE = 1920000
+
+
+class counting_top_block(gr.top_block):
+    """top_block that counts reconfigurations"""
+
+    def __init__(self):
+        gr.top_block.__init__(self, "Recorder Pool Test")
+        self.locks = 0
+
+    def lock(self):
+        self.locks += 1
+        gr.top_block.lock(self)
+
+
+@pytest.fixture
+def receiver():
+    tb = counting_top_block()
+    tb.source = blocks.null_source(gr.sizeof_gr_complex*1)
+    tb.channelizer = channelizer_bank(samp_rate=SAMP_RATE)
+    tb.connect((tb.source, 0), (tb.channelizer, 0))
+    for i in range(tb.channelizer.numchans):
+        tb.connect((tb.channelizer, i), (blocks.null_sink(gr.sizeof_gr_complex*1), 0))
+    return tb
+
+
+def test_slots_start_and_stop_without_locking(receiver, tmp_path):
+    pool = RecorderPool(receiver, (receiver.source, 0), SAMP_RATE, slots=2,
+                        channelizer=receiver.channelizer, channel_slots=2)
+    channel_rate = receiver.channelizer.get_channel_rate()
+
+    for _ in range(3):
+        direct = pool.add(str(tmp_path / "direct.wav"), 98.3e6, 50e3, SAMP_RATE)
+        index, residual = receiver.channelizer.channel(-400e3)
+        channel = pool.add(str(tmp_path / "channel.wav"), 97.6e6, residual - 250e3, SAMP_RATE,
+                           (receiver.channelizer, index), channel_rate)
+        assert pool.valves[channel].input_index() == index
+        pool.remove(direct)
+        pool.remove_all()
+
+    assert receiver.locks == 0
+    assert pool.get_free_slots() == 2
+    assert pool.get_free_channel_slots() == 2
+
+
+def test_falls_back_to_locking_without_a_free_slot(receiver, tmp_path):
+    pool = RecorderPool(receiver, (receiver.source, 0), SAMP_RATE, slots=1)
+
+    pool.add(str(tmp_path / "first.wav"), 98.3e6, 50e3, SAMP_RATE)
+    assert receiver.locks == 0
+    extra = pool.add(str(tmp_path / "second.wav"), 98.5e6, 250e3, SAMP_RATE)
+    assert receiver.locks == 1
+    pool.remove(extra)
+    assert receiver.locks == 2
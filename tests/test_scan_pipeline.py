@@ -0,0 +1,56 @@
+import threading
+
+import numpy as np
+
+from core.scan_pipeline import DetectionPipeline
+from core.station_detector import CFAR
+
+
+def window(station):
+    """A window of 10 candidates with one station, as (bin_power, mask, candidate_freqs, frames)"""
+    power = np.ones(10)
+    power[station] = 100.0
+    return power, np.eye(10), 98e6 + np.arange(10) * 200e3, 1000
+
+
+def test_inline_and_pipelined_agree():
+    inline = DetectionPipeline(3.0, pipelined=False, method=CFAR)
+    pipelined = DetectionPipeline(3.0, pipelined=True, method=CFAR)
+    for station in (1, 4, 8):
+        inline.submit(*window(station))
+        pipelined.submit(*window(station))
+    assert pipelined.results() == inline.results() == [98.2e6, 98.8e6, 99.6e6]
+    pipelined.close()
+
+
+def test_no_window_is_lost_while_collecting_results():
+    pipeline = DetectionPipeline(3.0, pipelined=True, method=CFAR)
+    started = threading.Event()
+
+    def capture():
+        started.set()
+        for i in range(200):
+            pipeline.submit(*window(i % 10))
+
+    thread = threading.Thread(target=capture)
+    thread.start()
+    started.wait()
+    while thread.is_alive():
+        pipeline.results()
+    thread.join()
+    assert len(pipeline.results()) == 10
+    pipeline.close()
+
+
+def test_close_stops_the_worker_and_a_new_job_restarts_it():
+    pipeline = DetectionPipeline(3.0, pipelined=True, method=CFAR)
+    pipeline.submit(*window(2))
+    pipeline.close()
+    assert pipeline._executor is None
+    assert not any(t.name.startswith("scan-detect") for t in threading.enumerate())
+    assert pipeline.results() == [98.4e6]
+
+    pipeline.submit(*window(5))
+    assert pipeline.results() == [98.4e6, 99.0e6]
+    pipeline.close()
+    pipeline.close()
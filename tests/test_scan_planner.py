@@ -0,0 +1,58 @@
+import pytest
+
+from core.scan_planner import merge_stations, plan_refine, plan_scan, split_plan
+from core.station_detector import CHANNEL_STEP, FM_BANDWIDTH, candidate_span
+
+
+@pytest.mark.parametrize("samp_rate", [2.048e6, 2.4e6, 3.2e6])
+def test_plan_covers_every_channel_with_overlap(samp_rate):
+    start, end = 87.5e6, 108e6
+    plan = plan_scan(start, end, samp_rate)
+    span = candidate_span(samp_rate)
+
+    # Trusted ranges of adjacent windows overlap by at least one channel step
+    for left, right in zip(plan, plan[1:]):
+        assert (left + span) - (right - span) >= CHANNEL_STEP - 1
+
+    # Every raster channel of the band lies entirely inside one window's trusted range
+    channels = [start + i * CHANNEL_STEP for i in range(round((end - start) / CHANNEL_STEP) + 1)]
+    for channel in channels:
+        assert any(abs(channel - centre) <= span + 1 for centre in plan)
+        assert any(abs(channel - centre) + FM_BANDWIDTH / 2 <= samp_rate / 2 for centre in plan)
+
+
+def test_plan_is_on_the_channel_raster():
+    for centre in plan_scan(87.5e6, 108e6, 2.4e6):
+        assert centre / CHANNEL_STEP == pytest.approx(round(centre / CHANNEL_STEP))
+
+
+def test_refine_windows_keep_the_search_margin():
+    candidates = [88.1e6, 88.5e6, 90.2e6, 95.0e6, 95.1e6]
+    windows = plan_refine(candidates, 2.4e6)
+    span = candidate_span(2.4e6)
+    assert sorted(f for _, targets in windows for f in targets) == candidates
+    for centre, targets in windows:
+        assert all(abs(f - centre) + CHANNEL_STEP <= span + 1 for f in targets)
+
+
+def test_split_plan_is_contiguous_and_balanced():
+    plan = list(range(10))
+    chunks = split_plan(plan, 3)
+    assert [len(c) for c in chunks] == [4, 3, 3]
+    assert sum(chunks, []) == plan
+    assert split_plan([1, 2], 4) == [[1], [2]]
+
+
+def test_merge_keeps_the_strongest_duplicate():
+    detections = {98.0e6: 2.0, 98.1e6: 5.0, 99.0e6: 1.0}
+    assert merge_stations(detections) == [98.1e6, 99.0e6]
+
+
+def test_merge_does_not_chain_distinct_stations():
+    # 98.1 MHz duplicates both neighbours, which are 200 kHz apart and both real
+    detections = {98.0e6: 5.0, 98.1e6: 1.0, 98.2e6: 4.0}
+    assert merge_stations(detections) == [98.0e6, 98.2e6]
+
+    # A run of raster points spaced one step apart is not merged end to end
+    run = {98.0e6 + i * CHANNEL_STEP: 1.0 + (i % 2) for i in range(6)}
+    assert merge_stations(run) == [98.1e6, 98.3e6, 98.5e6]
@@ -0,0 +1,107 @@
+import numpy as np
+import pytest
+
+from core.band_synth import BandSynth, Carrier
+from core.station_detector import (CFAR, DEFAULT_THRESHOLDS, MINMAX, PowerAccumulator,
+                                   candidate_grid, detect_stations, frame_power,
+                                   local_maxima, psd_frames, refine_stations, station_mask,
+                                   window_setup)
+
+FREQ = 98e6
+SAMP_RATE = 2.4e6
+FFT_SIZE = 2**7
+
+
+def detect(carriers, seconds, method, seed=0):
+    """Stations found by a rule, at its default threshold, in one window of the synthetic band"""
+    synth = BandSynth(carriers, samp_rate=SAMP_RATE, centre_freq=FREQ, noise_level=1.0, seed=seed)
+    accumulator = PowerAccumulator(FFT_SIZE)
+    accumulator.add(psd_frames(synth.generate(int(SAMP_RATE * seconds)), FFT_SIZE))
+    candidate_freqs, _, mask = window_setup(FREQ, SAMP_RATE, FFT_SIZE)
+    return detect_stations(mask @ accumulator.bin_power, candidate_freqs, DEFAULT_THRESHOLDS[method], method,
+                           accumulator.frames, mask.sum(axis=1))
+
+
+def test_accumulator_does_not_depend_on_chunk_size():
+    samples = np.random.default_rng(1).random(FFT_SIZE * 50 + 17).astype(np.float32)
+    expected, frames = frame_power(samples, FFT_SIZE)
+
+    accumulator = PowerAccumulator(FFT_SIZE)
+    for chunk in np.array_split(samples, [5, 300, 301, 2000, 4096]):
+        accumulator.add(chunk)
+
+    assert accumulator.frames == frames
+    assert accumulator.items == len(samples)
+    np.testing.assert_allclose(accumulator.bin_power, expected, rtol=1e-6)
+
+
+def test_station_mask_covers_one_station_per_row():
+    _, candidate_bins = candidate_grid(FREQ, SAMP_RATE, FFT_SIZE, span=500e3)
+    mask = station_mask(candidate_bins, 6, FFT_SIZE)
+    assert mask.shape == (len(candidate_bins), FFT_SIZE)
+    assert np.all(mask.sum(axis=1) == 12)
+    assert np.all(mask[np.arange(len(candidate_bins)), candidate_bins] == 1)
+
+
+def test_window_setup_is_cached_and_read_only():
+    first = window_setup(FREQ, SAMP_RATE, FFT_SIZE)
+    assert window_setup(FREQ, SAMP_RATE, FFT_SIZE) is first
+    with pytest.raises(ValueError):
+        first[2][0, 0] = 1
+
+
+def test_local_maxima_keeps_first_of_plateau():
+    values = np.array([1.0, 3.0, 3.0, 2.0, 5.0])
+    assert local_maxima(values).tolist() == [False, True, False, False, True]
+
+
+@pytest.mark.parametrize("method", [MINMAX, CFAR])
+def test_detects_strong_stations(method):
+    stations = [FREQ - 600e3, FREQ + 300e3]
+    assert detect([Carrier(f, 30.0) for f in stations], 0.02, method) == stations
+
+
+def test_cfar_finds_weak_station_next_to_strong_one():
+    # minmax measures against the 40 dB station and misses the 10 dB one
+    stations = [FREQ - 200e3, FREQ + 400e3]
+    carriers = [Carrier(stations[0], 40.0), Carrier(stations[1], 10.0)]
+    assert detect(carriers, 0.02, CFAR) == stations
+    assert detect(carriers, 0.02, MINMAX) == stations[:1]
+
+
+def test_cfar_finds_weak_station_with_enough_averaging():
+    # The crowded window of scripts/bench_detection_rate.py, with the 4 dB carrier at 98.2 MHz
+    carriers = [Carrier(FREQ + offset, snr) for offset, snr in
+                ((-700e3, 40.0), (-300e3, 6.0), (200e3, 4.0), (600e3, 10.0))]
+    for seed in range(3):
+        assert FREQ + 200e3 in detect(carriers, 0.02, CFAR, seed=seed)
+
+
+def test_cfar_needs_the_averaging():
+    with pytest.raises(ValueError):
+        detect_stations(np.ones(5), np.arange(5), 5.0, CFAR)
+
+
+def test_cfar_has_no_false_alarms_on_noise():
+    for seed in range(5):
+        assert detect([], 0.02, CFAR, seed=seed) == []
+
+
+def test_refine_confirms_what_the_coarse_pass_found():
+    station, noise_only = FREQ + 300e3, FREQ - 500e3
+    for seed in range(3):
+        synth = BandSynth([Carrier(station, -6.0)], samp_rate=SAMP_RATE, centre_freq=FREQ, seed=seed)
+        iq = synth.generate(int(SAMP_RATE * 0.02))
+        accumulator = PowerAccumulator(FFT_SIZE)
+        accumulator.add(psd_frames(iq, FFT_SIZE))
+        candidate_freqs, _, mask = window_setup(FREQ, SAMP_RATE, FFT_SIZE)
+        assert station in detect_stations(mask @ accumulator.bin_power, candidate_freqs, DEFAULT_THRESHOLDS[CFAR],
+                                          CFAR, accumulator.frames, mask.sum(axis=1))
+
+        fine = PowerAccumulator(2**10)
+        fine.add(psd_frames(iq, 2**10))
+        confirmed = refine_stations(fine.bin_power, FREQ, SAMP_RATE, [station, noise_only],
+                                    DEFAULT_THRESHOLDS[CFAR], fine.frames)
+        # Only the station's target, snapped to the raster next to it at this SNR
+        assert len(confirmed) == 1
+        assert abs(next(iter(confirmed)) - station) <= 100e3